@@ -0,0 +1,133 @@
+# admission.py
+"""
+FILE: admission.py
+DESCRIPTION:
+  Admission gate for new devices (admission_min_sightings / admission_min_rssi).
+  - A device ID seen for the first time is only a candidate; its packets are
+    held back (no discovery, no state) until it was decoded
+    admission_min_sightings times within admission_window seconds, or once
+    with an RSSI of at least admission_min_rssi.
+  - Passing TPMS sensors, neighbours heard once and corrupted IDs therefore
+    never create retained entities in Home Assistant.
+  - Candidates live in a bounded LRU of (first_seen, sightings); candidates
+    that expire or are pushed out count as rejected.
+  - Admitted IDs live in a bounded LRU as well (MAX_ADMITTED), so the set
+    cannot grow forever when device_ttl/device_max never evict anything; an
+    ID pushed out has to qualify again.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+import config
+
+# Admitted IDs kept without a device registry eviction (least recently heard dropped first).
+MAX_ADMITTED = 10000
+
+
+class AdmissionGate:
+    """Promotes device IDs to 'admitted' after enough sightings (thread-safe)."""
+
+    def __init__(
+        self,
+        min_sightings: int = 1,
+        window: float = 600.0,
+        min_rssi: float = 0.0,
+        max_candidates: int = 10000,
+        max_admitted: int = MAX_ADMITTED,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.min_sightings = max(1, int(min_sightings or 1))
+        self.window = max(0.0, float(window or 0))
+        self.min_rssi = float(min_rssi or 0)
+        self.max_candidates = max(1, int(max_candidates or 1))
+        self.max_admitted = max(1, int(max_admitted or 1))
+        self._clock = clock
+        self._lock = threading.Lock()
+        # admitted clean_ids, least recently seen first
+        self.admitted: OrderedDict[str, None] = OrderedDict()
+        # clean_id -> [first_seen, sightings], least recently seen first
+        self._candidates: OrderedDict[str, list] = OrderedDict()
+        self._registry = None
+        self.promoted = 0
+        self.rejected = 0
+        self.held = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.min_sightings > 1 or self.min_rssi < 0
+
+    def admit(self, clean_id: str, rssi: Optional[float] = None) -> bool:
+        """Record a sighting; True once the device may publish."""
+        if not self.enabled:
+            return True
+        now = self._clock()
+        with self._lock:
+            if clean_id in self.admitted:
+                self.admitted.move_to_end(clean_id)
+                return True
+            cand = self._candidates.get(clean_id)
+            if cand is None or (self.window and now - cand[0] > self.window):
+                if cand is not None:
+                    self.rejected += 1
+                cand = [now, 0]
+            cand[1] += 1
+            self._candidates[clean_id] = cand
+            self._candidates.move_to_end(clean_id)
+
+            strong = self.min_rssi < 0 and isinstance(rssi, (int, float)) and rssi >= self.min_rssi
+            if strong or cand[1] >= self.min_sightings:
+                del self._candidates[clean_id]
+                self.admitted[clean_id] = None
+                while len(self.admitted) > self.max_admitted:
+                    self.admitted.popitem(last=False)
+                self.promoted += 1
+                return True
+
+            while len(self._candidates) > self.max_candidates:
+                self._candidates.popitem(last=False)
+                self.rejected += 1
+            self.held += 1
+            return False
+
+    def forget(self, clean_id: str, device_name: Optional[str] = None) -> None:
+        """Device evicted by the device registry: it has to qualify again."""
+        with self._lock:
+            self.admitted.pop(clean_id, None)
+            self._candidates.pop(clean_id, None)
+
+    def bind(self, registry) -> None:
+        """Follow evictions of a DeviceRegistry (idempotent)."""
+        if registry is None or registry is self._registry:
+            return
+        self._registry = registry
+        registry.add_listener(self.forget)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "pending": len(self._candidates),
+                "promoted": self.promoted,
+                "rejected": self.rejected,
+                "held": self.held,
+            }
+
+
+# Module-level singleton instance
+_gate: Optional[AdmissionGate] = None
+
+
+def get_admission_gate() -> AdmissionGate:
+    """Get the shared admission gate (configured from config on first use)."""
+    global _gate
+    if _gate is None:
+        _gate = AdmissionGate(
+            min_sightings=getattr(config, "ADMISSION_MIN_SIGHTINGS", 1),
+            window=getattr(config, "ADMISSION_WINDOW", 600),
+            min_rssi=getattr(config, "ADMISSION_MIN_RSSI", 0),
+            max_candidates=getattr(config, "ADMISSION_MAX_CANDIDATES", 10000),
+        )
+    return _gate
@@ -65,6 +65,94 @@ class Settings(BaseSettings):
     mqtt_user: str = Field(default="")
     mqtt_pass: str = Field(default="")
     mqtt_keepalive: int = Field(default=0)
+    mqtt_protocol: str = Field(
+        default="3.1.1",
+        description="MQTT protocol version: '3.1.1' (default) or '5' (topic aliases, message expiry, user properties).",
+    )
+    mqtt_topic_alias_maximum: int = Field(
+        default=64,
+        description="MQTT 5: topic aliases to use for device state topics (capped by the broker's limit; 0 disables).",
+    )
+    mqtt_receive_maximum: int = Field(
+        default=0,
+        description="MQTT 5: Receive Maximum sent to the broker (0 = client default).",
+    )
+    mqtt_max_inflight: int = Field(
+        default=0,
+        description="Maximum QoS>0 messages in flight (0 = paho default of 20).",
+    )
+    mqtt_connect_retry: bool = Field(
+        default=False,
+        description="Keep running and retry in the background when the broker is unreachable at startup (default: exit).",
+    )
+    mqtt_spool: bool = Field(
+        default=False,
+        description="Store device states on disk while the broker is unreachable and replay them after reconnecting.",
+    )
+    mqtt_spool_path: str = Field(
+        default="/data/rtl_mqtt_spool.db",
+        description="SQLite file for the MQTT spool (the spool is disabled if the directory does not exist).",
+    )
+    mqtt_spool_max_messages: int = Field(
+        default=20000,
+        description="Maximum spooled messages; the oldest are dropped first.",
+    )
+    mqtt_spool_counter_history: bool = Field(
+        default=False,
+        description="Spool every reading of meter totals (state_class total_increasing) instead of only the latest.",
+    )
+    mqtt_spool_drain_rate: float = Field(
+        default=50.0,
+        description="Messages per second when replaying the spool after reconnecting (0 = unlimited).",
+    )
+    mqtt_resync: bool = Field(
+        default=False,
+        description="After a reconnect, re-publish the last discovery configs and states (broker restarted without persistence).",
+    )
+    mqtt_resync_rate: float = Field(
+        default=20.0,
+        description="Messages per second for the reconnect resync (0 = unlimited).",
+    )
+    mqtt_rate_limit: float = Field(
+        default=0.0,
+        description=(
+            "Global publish budget in messages per second (0 = unlimited). Queued publishes are sent by "
+            "priority: binary sensor events, states, discovery, diagnostics."
+        ),
+    )
+    mqtt_rate_limit_bytes: float = Field(
+        default=0.0,
+        description="Additional publish budget in bytes per second, topic + payload (0 = unlimited). Needs mqtt_rate_limit.",
+    )
+    mqtt_discovery_mode: str = Field(
+        default="entity",
+        description=(
+            "Home Assistant MQTT discovery layout: 'entity' publishes one config topic per entity, "
+            "'device' publishes one homeassistant/device/<id>/config payload per device (HA 2024.11+)."
+        ),
+    )
+    mqtt_device_discovery_delay: float = Field(
+        default=1.0,
+        description=(
+            "Device discovery only: seconds to collect newly seen fields of a device before re-publishing "
+            "its device config (0 = publish on every new field)."
+        ),
+    )
+
+    mqtt_discovery_compact: bool = Field(
+        default=False,
+        description=(
+            "Publish discovery configs with Home Assistant's key abbreviations (stat_t, uniq_id, dev, ...), "
+            "a '~' base topic and without default-valued keys."
+        ),
+    )
+    mqtt_state_mode: str = Field(
+        default="field",
+        description=(
+            "How rtl_433 device states are published: 'field' = one retained topic per field, "
+            "'json' = one home/rtl_devices/<id>/state JSON document per packet (entities use value_template)."
+        ),
+    )
 
     # --- RTL-SDR / Radios ---
     # Each radio config supports:
@@ -149,6 +237,29 @@ class Settings(BaseSettings):
     rtl_publish_timestamps: bool = Field(default=False)
     device_blacklist: list[str] = Field(default_factory=lambda: ["SimpliSafe*", "EezTire*"])
     device_whitelist: list[str] = Field(default_factory=list)
+    rtl_min_snr: float = Field(
+        default=0.0,
+        description="Drop packets with an SNR below this many dB (needs -M level; 0 = off). Per radio: min_snr.",
+    )
+    rtl_min_rssi: float = Field(
+        default=0.0,
+        description="Drop packets with an RSSI below this many dB, e.g. -20 (needs -M level; 0 = off). Per radio: min_rssi.",
+    )
+    rtl_signal_thresholds: list[str] = Field(
+        default_factory=list,
+        description="Per-model thresholds overriding the radio/global ones, e.g. 'Acurite*: snr=6, rssi=-20'.",
+    )
+    device_fields: list[str] = Field(
+        default_factory=list,
+        description=(
+            "Per-model/per-device field selection, e.g. 'Acurite-Tower*: temperature, humidity' (only these) "
+            "or 'Fineoffset*: -battery_ok, -channel' (all but these)."
+        ),
+    )
+    rtl_model_prefilter: bool = Field(
+        default=True,
+        description="Drop packets whose model matches device_blacklist from the raw line, before JSON decoding.",
+    )
 
     # --- Main vs diagnostic sensors ---
     main_sensors: list[str] = Field(
@@ -208,6 +319,34 @@ class Settings(BaseSettings):
 
     # --- Publishing / processing ---
     rtl_expire_after: int = Field(default=600)
+    device_ttl: int = Field(
+        default=604800,
+        description="Forget devices not heard from for this many seconds (0 = never). Bounds memory near busy roads (TPMS).",
+    )
+    device_max: int = Field(
+        default=5000,
+        description="Maximum number of devices kept in memory; the least recently heard are forgotten first (0 = unlimited).",
+    )
+    admission_min_sightings: int = Field(
+        default=1,
+        description="Sightings of a new device ID within admission_window before it gets entities (1 = immediately).",
+    )
+    admission_window: int = Field(
+        default=600,
+        description="Seconds in which a candidate device must reach admission_min_sightings.",
+    )
+    admission_min_rssi: float = Field(
+        default=0.0,
+        description="Admit a new device on its first packet if its RSSI (dB, needs -M level) is at least this (0 = off).",
+    )
+    admission_max_candidates: int = Field(
+        default=10000,
+        description="Candidate devices tracked at most; the least recently seen are rejected first.",
+    )
+    device_ttl_cleanup: bool = Field(
+        default=False,
+        description="Also clear the retained discovery configs and states of forgotten devices (removes them from HA).",
+    )
     force_new_ids: bool = Field(default=False)
 
     # --- Utility meters ---
@@ -216,6 +355,50 @@ class Settings(BaseSettings):
     gas_unit: str = Field(default="ft3")
     debug_raw_json: bool = Field(default=False)
     rtl_throttle_interval: int = Field(default=30)
+    rtl_throttle_event_lane: bool = Field(
+        default=True,
+        description="While throttling, publish state changes of binary sensors (door, leak, tamper, ...) immediately.",
+    )
+    rtl_throttle_event_fields: list[str] = Field(
+        default_factory=list,
+        description="Extra fields whose changes bypass rtl_throttle_interval (e.g. button, event, code).",
+    )
+    rtl_derived_metrics: bool = Field(
+        default=False,
+        description="Publish rates derived from counters: rain rate, power from kWh totals, flow from volume totals.",
+    )
+    field_meta_overlay: str = Field(
+        default="/share/rtl-haos/field_meta.json",
+        description="Optional field metadata database merged over the bundled field_meta.json (skipped if missing).",
+    )
+    rtl_outlier_filter: bool = Field(
+        default=False,
+        description="Drop spikes and impossible values of temperature/humidity/moisture/pressure fields (Hampel filter).",
+    )
+    rtl_outlier_window: int = Field(
+        default=7,
+        description="Recent values per entity the outlier filter compares against (median of the window).",
+    )
+    rtl_outlier_threshold: float = Field(
+        default=3.5,
+        description="Reject values more than this many scaled MADs from the window median.",
+    )
+    rtl_stats_windows: list[str] = Field(
+        default_factory=list,
+        description="Rolling statistics windows published as entity attributes, e.g. ['1h', '24h'] (empty = off).",
+    )
+    rtl_stats_fields: list[str] = Field(
+        default_factory=list,
+        description="Fields (globs) that get rolling statistics (opt-in; empty = none).",
+    )
+    metrics_port: int = Field(
+        default=0,
+        description="Serve OpenMetrics pipeline counters on this TCP port at /metrics (0 = off).",
+    )
+    metrics_bind: str = Field(
+        default="0.0.0.0",
+        description="Address the metrics endpoint listens on.",
+    )
 
     # --- Battery alert behavior (battery_ok -> Battery Low binary_sensor) ---
     # 0 disables latching and clears low immediately on the next OK.
@@ -237,6 +420,95 @@ class Settings(BaseSettings):
         default=900,
         description="Seconds without data to trigger health alert (default: 15 min).",
     )
+    sdr_health_degradation_threshold: int = Field(
+        default=10,
+        description="Sample-drop/PLL/async events within the restart window to trigger health alert (0 disables).",
+    )
+
+    # --- rtl_433 supervision (watchdog + restart policy) ---
+    rtl_watchdog_enabled: bool = Field(
+        default=True,
+        description="Restart rtl_433 when it stays alive but stops producing output.",
+    )
+    rtl_watchdog_factor: float = Field(
+        default=8.0,
+        description="Stall threshold as a multiple of the radio's learned packet interval.",
+    )
+    rtl_watchdog_min_timeout: int = Field(default=60, description="Lower bound for the stall threshold (seconds).")
+    rtl_watchdog_max_timeout: int = Field(default=900, description="Upper bound for the stall threshold (seconds).")
+    rtl_restart_backoff_base: float = Field(default=5.0, description="First restart delay (seconds); doubles per failure.")
+    rtl_restart_backoff_max: float = Field(default=300.0, description="Maximum restart delay (seconds).")
+    rtl_restart_jitter: float = Field(default=0.2, description="Random +/- fraction applied to restart delays.")
+    rtl_restart_budget: int = Field(
+        default=10,
+        description="Restarts allowed within rtl_restart_budget_window before cooling down (0 disables).",
+    )
+    rtl_restart_budget_window: int = Field(default=600, description="Window in seconds for the restart budget.")
+    rtl_restart_budget_cooldown: int = Field(default=600, description="Delay in seconds once the budget is exhausted.")
+
+    # --- Decoder learning (rtl_433 -R pruning) ---
+    rtl_protocol_learning: bool = Field(
+        default=False,
+        description="Record which rtl_433 decoders produce packets per radio and log a recommended -R set.",
+    )
+    rtl_protocol_autoprune: bool = Field(
+        default=False,
+        description="Apply the learned -R set on restart (radios without protocols/-R/config file only).",
+    )
+    rtl_protocol_learn_min_packets: int = Field(
+        default=200,
+        description="Packets a radio must decode before its learned -R set is trusted.",
+    )
+    rtl_protocol_min_count: int = Field(
+        default=2,
+        description="Times a decoder must be seen to be kept in the learned -R set.",
+    )
+    rtl_protocol_probe_interval: int = Field(
+        default=86400,
+        description="Seconds of pruned operation between full-decoder probe windows (0 disables probing).",
+    )
+    rtl_protocol_probe_duration: int = Field(
+        default=1800,
+        description="Length in seconds of a full-decoder probe window.",
+    )
+    rtl_protocol_profile_path: str = Field(
+        default="/data/rtl_protocol_profile.json",
+        description="Where learned decoder profiles are stored (skipped if the directory does not exist).",
+    )
+
+    # --- SDR enumeration ---
+    rtl_sdr_cache_path: str = Field(
+        default="/data/rtl_sdr_cache.json",
+        description="Cache of the dongle index<->serial mapping, reused while the attached dongles are unchanged.",
+    )
+
+    rtl_hotplug: bool = Field(
+        default=False,
+        description="Start/stop radios when RTL-SDR dongles are plugged in or removed (polls /sys/bus/usb).",
+    )
+    rtl_hotplug_poll_interval: int = Field(default=5, description="Seconds between USB hotplug checks.")
+
+    # --- Adaptive hopping (multi-frequency radios) ---
+    rtl_hop_adaptive: bool = Field(
+        default=False,
+        description="Repeat productive frequencies in a hopping radio's -f list based on decoded packets.",
+    )
+    rtl_hop_adaptive_interval: int = Field(
+        default=3600,
+        description="Minimum seconds between hop re-plans (each applied plan restarts rtl_433).",
+    )
+    rtl_hop_adaptive_min_packets: int = Field(
+        default=50,
+        description="Packets needed since the last plan before re-planning.",
+    )
+    rtl_hop_adaptive_min_gain: float = Field(
+        default=0.25,
+        description="Minimum expected packet-yield improvement (fraction) to apply a new plan.",
+    )
+    rtl_hop_adaptive_max_slots: int = Field(
+        default=12,
+        description="Total -f entries in an adaptive hop plan (max 32; every frequency keeps one).",
+    )
 
     @property
     def id_suffix(self) -> str:
@@ -255,6 +527,24 @@ MQTT_SETTINGS = {
     "pass": settings.mqtt_pass,
     "keepalive": settings.mqtt_keepalive,
 }
+MQTT_PROTOCOL = settings.mqtt_protocol
+MQTT_TOPIC_ALIAS_MAXIMUM = settings.mqtt_topic_alias_maximum
+MQTT_RECEIVE_MAXIMUM = settings.mqtt_receive_maximum
+MQTT_MAX_INFLIGHT = settings.mqtt_max_inflight
+MQTT_CONNECT_RETRY = settings.mqtt_connect_retry
+MQTT_SPOOL = settings.mqtt_spool
+MQTT_SPOOL_PATH = settings.mqtt_spool_path
+MQTT_SPOOL_MAX_MESSAGES = settings.mqtt_spool_max_messages
+MQTT_SPOOL_COUNTER_HISTORY = settings.mqtt_spool_counter_history
+MQTT_SPOOL_DRAIN_RATE = settings.mqtt_spool_drain_rate
+MQTT_RESYNC = settings.mqtt_resync
+MQTT_RESYNC_RATE = settings.mqtt_resync_rate
+MQTT_RATE_LIMIT = settings.mqtt_rate_limit
+MQTT_RATE_LIMIT_BYTES = settings.mqtt_rate_limit_bytes
+MQTT_DISCOVERY_MODE = settings.mqtt_discovery_mode
+MQTT_DEVICE_DISCOVERY_DELAY = settings.mqtt_device_discovery_delay
+MQTT_DISCOVERY_COMPACT = settings.mqtt_discovery_compact
+MQTT_STATE_MODE = settings.mqtt_state_mode
 
 RTL_CONFIG = settings.rtl_config
 
@@ -289,15 +579,38 @@ SKIP_KEYS = _skip_keys
 
 RTL_PUBLISH_TIMESTAMPS = settings.rtl_publish_timestamps
 DEVICE_BLACKLIST = settings.device_blacklist
+RTL_MODEL_PREFILTER = settings.rtl_model_prefilter
+DEVICE_FIELDS = settings.device_fields
+RTL_MIN_SNR = settings.rtl_min_snr
+RTL_MIN_RSSI = settings.rtl_min_rssi
+RTL_SIGNAL_THRESHOLDS = settings.rtl_signal_thresholds
 DEVICE_WHITELIST = settings.device_whitelist
 MAIN_SENSORS = settings.main_sensors
 
 RTL_EXPIRE_AFTER = settings.rtl_expire_after
+DEVICE_TTL = settings.device_ttl
+DEVICE_MAX = settings.device_max
+DEVICE_TTL_CLEANUP = settings.device_ttl_cleanup
+ADMISSION_MIN_SIGHTINGS = settings.admission_min_sightings
+ADMISSION_WINDOW = settings.admission_window
+ADMISSION_MIN_RSSI = settings.admission_min_rssi
+ADMISSION_MAX_CANDIDATES = settings.admission_max_candidates
 FORCE_NEW_IDS = settings.force_new_ids
 ID_SUFFIX = settings.id_suffix
 
 DEBUG_RAW_JSON = settings.debug_raw_json
 RTL_THROTTLE_INTERVAL = settings.rtl_throttle_interval
+RTL_THROTTLE_EVENT_LANE = settings.rtl_throttle_event_lane
+RTL_THROTTLE_EVENT_FIELDS = settings.rtl_throttle_event_fields
+RTL_DERIVED_METRICS = settings.rtl_derived_metrics
+FIELD_META_OVERLAY = settings.field_meta_overlay
+RTL_OUTLIER_FILTER = settings.rtl_outlier_filter
+RTL_OUTLIER_WINDOW = settings.rtl_outlier_window
+RTL_OUTLIER_THRESHOLD = settings.rtl_outlier_threshold
+RTL_STATS_WINDOWS = settings.rtl_stats_windows
+RTL_STATS_FIELDS = settings.rtl_stats_fields
+METRICS_PORT = settings.metrics_port
+METRICS_BIND = settings.metrics_bind
 RTL_SHOW_TIMESTAMPS = settings.rtl_show_timestamps
 
 VERBOSE_TRANSMISSIONS = settings.verbose_transmissions
@@ -309,3 +622,37 @@ BATTERY_OK_CLEAR_AFTER = settings.battery_ok_clear_after
 SDR_HEALTH_RESTART_THRESHOLD = settings.sdr_health_restart_threshold
 SDR_HEALTH_RESTART_WINDOW = settings.sdr_health_restart_window
 SDR_HEALTH_NO_DATA_TIMEOUT = settings.sdr_health_no_data_timeout
+SDR_HEALTH_DEGRADATION_THRESHOLD = settings.sdr_health_degradation_threshold
+
+# rtl_433 supervision
+RTL_WATCHDOG_ENABLED = settings.rtl_watchdog_enabled
+RTL_WATCHDOG_FACTOR = settings.rtl_watchdog_factor
+RTL_WATCHDOG_MIN_TIMEOUT = settings.rtl_watchdog_min_timeout
+RTL_WATCHDOG_MAX_TIMEOUT = settings.rtl_watchdog_max_timeout
+RTL_RESTART_BACKOFF_BASE = settings.rtl_restart_backoff_base
+RTL_RESTART_BACKOFF_MAX = settings.rtl_restart_backoff_max
+RTL_RESTART_JITTER = settings.rtl_restart_jitter
+RTL_RESTART_BUDGET = settings.rtl_restart_budget
+RTL_RESTART_BUDGET_WINDOW = settings.rtl_restart_budget_window
+RTL_RESTART_BUDGET_COOLDOWN = settings.rtl_restart_budget_cooldown
+
+# Decoder learning
+RTL_PROTOCOL_LEARNING = settings.rtl_protocol_learning
+RTL_PROTOCOL_AUTOPRUNE = settings.rtl_protocol_autoprune
+RTL_PROTOCOL_LEARN_MIN_PACKETS = settings.rtl_protocol_learn_min_packets
+RTL_PROTOCOL_MIN_COUNT = settings.rtl_protocol_min_count
+RTL_PROTOCOL_PROBE_INTERVAL = settings.rtl_protocol_probe_interval
+RTL_PROTOCOL_PROBE_DURATION = settings.rtl_protocol_probe_duration
+RTL_PROTOCOL_PROFILE_PATH = settings.rtl_protocol_profile_path
+
+# SDR enumeration
+RTL_SDR_CACHE_PATH = settings.rtl_sdr_cache_path
+RTL_HOTPLUG = settings.rtl_hotplug
+RTL_HOTPLUG_POLL_INTERVAL = settings.rtl_hotplug_poll_interval
+
+# Adaptive hopping
+RTL_HOP_ADAPTIVE = settings.rtl_hop_adaptive
+RTL_HOP_ADAPTIVE_INTERVAL = settings.rtl_hop_adaptive_interval
+RTL_HOP_ADAPTIVE_MIN_PACKETS = settings.rtl_hop_adaptive_min_packets
+RTL_HOP_ADAPTIVE_MIN_GAIN = settings.rtl_hop_adaptive_min_gain
+RTL_HOP_ADAPTIVE_MAX_SLOTS = settings.rtl_hop_adaptive_max_slots
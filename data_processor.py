@@ -6,24 +6,60 @@ DESCRIPTION:
   - dispatch_reading(): Adds data to buffer or sends immediately if throttling is 0.
   - start_throttle_loop(): Runs in a background thread to flush averages.
   - UPDATED: Now accepts and logs 'radio_freq'.
+  - end_packet(): With mqtt_state_mode=json, publishes the device's staged JSON
+    state document once per packet (or once per device per throttle flush).
+  - Outlier filter (rtl_outlier_filter): spikes and impossible values of
+    temperature/humidity/pressure fields are dropped before buffering.
+  - Derived metrics (rtl_derived_metrics): counter fields also produce rate
+    fields (rain rate, power, flow), dispatched like any other reading.
+  - Windowed statistics (rtl_stats_windows): published numeric values feed
+    per-entity ring buffers; rolling min/max/mean/stddev go out as attributes.
+  - forget_device(): registry listener, drops the buffer of an evicted device.
+  - Event lane: while throttling, a changed value of a binary sensor field
+    (door, leak, tamper, ...) is published immediately instead of buffered.
 """
 import threading
 import time
 import statistics
 import config
+from mqtt_handler import BINARY_SENSOR_FIELDS
+from derived_metrics import DerivedMetrics
+from window_stats import get_window_stats
+from outlier_filter import get_outlier_filter
+import metrics
 
 
 # Numeric fields that should NOT be averaged during throttling.
 # Instead, we publish the last valid value observed during the interval.
 NON_AVERAGED_NUMERIC_FIELDS = {
     "battery_ok",
+    "outliers_rejected",
 }
 
+def _is_event_field(field):
+    """Fields whose state changes bypass the throttle (rtl_throttle_event_lane / _event_fields)."""
+    if field in BINARY_SENSOR_FIELDS and getattr(config, "RTL_THROTTLE_EVENT_LANE", True):
+        return True
+    return field in (getattr(config, "RTL_THROTTLE_EVENT_FIELDS", None) or ())
+
+
+def _json_state_enabled():
+    return str(getattr(config, "MQTT_STATE_MODE", "field") or "field").strip().lower() == "json"
+
+
 class DataProcessor:
     def __init__(self, mqtt_handler):
         self.mqtt_handler = mqtt_handler
         self.buffer = {}
         self.lock = threading.Lock()
+        # (clean_id, field) -> last value seen on the event lane
+        self.last_event = {}
+        self.derived = DerivedMetrics()
+        metrics.register_collector("throttle_buffer_readings", self.buffered_readings)
+
+        registry = getattr(mqtt_handler, "device_registry", None)
+        if registry is not None:
+            registry.add_listener(self.forget_device)
 
     # --- FIX 1: Add radio_freq to arguments ---
     def dispatch_reading(self, clean_id, field, value, dev_name, model, radio_name="Unknown", radio_freq="Unknown"):
@@ -32,18 +68,53 @@ class DataProcessor:
         If throttling is disabled (interval <= 0), sends immediately.
         Otherwise, stores it in the buffer.
         """
-        interval = getattr(config, "RTL_THROTTLE_INTERVAL", 0)
-
         # Skip null readings; they shouldn't influence averages or "last known" decisions.
         if value is None:
             return
-        
+        metrics.inc("dispatch_readings")
+
+        if getattr(config, "RTL_OUTLIER_FILTER", False):
+            outliers = get_outlier_filter()
+            if outliers.reject(clean_id, field, value, model):
+                print(f"[FILTER] Rejected outlier {dev_name} [{field}]: {value}")
+                # Regular (throttled, JSON-state aware) publish of the per-device counter.
+                self._ingest(
+                    clean_id, "outliers_rejected", outliers.rejected_by_device.get(clean_id, 0),
+                    dev_name, model, radio_name, radio_freq,
+                )
+                return
+
+        self._ingest(clean_id, field, value, dev_name, model, radio_name, radio_freq)
+
+        if getattr(config, "RTL_DERIVED_METRICS", False):
+            for d_field, d_value in self.derived.update(clean_id, field, value, time.monotonic()):
+                self._ingest(clean_id, d_field, d_value, dev_name, model, radio_name, radio_freq)
+
+    def _ingest(self, clean_id, field, value, dev_name, model, radio_name, radio_freq):
+        interval = getattr(config, "RTL_THROTTLE_INTERVAL", 0)
+
         # 1. Immediate Dispatch (No Throttling)
         if interval <= 0:
-            self.mqtt_handler.send_sensor(clean_id, field, value, dev_name, model, is_rtl=True)
+            self._note_radio(clean_id, radio_name, radio_freq)
+            self._send(clean_id, field, value, dev_name, model)
             return
 
-        # 2. Buffered Dispatch
+        # 2. Event Lane: state changes of binary sensors skip the throttle
+        if _is_event_field(field):
+            key = (clean_id, field)
+            with self.lock:
+                changed = key not in self.last_event or self.last_event[key] != value
+                self.last_event[key] = value
+                if changed:
+                    # Older buffered samples must not be flushed after the new state.
+                    self.buffer.get(clean_id, {}).pop(field, None)
+            if changed:
+                self._note_radio(clean_id, radio_name, radio_freq)
+                self._send(clean_id, field, value, dev_name, model)
+                self._flush_state(clean_id)
+                return
+
+        # 3. Buffered Dispatch
         with self.lock:
             if clean_id not in self.buffer:
                 self.buffer[clean_id] = {}
@@ -65,6 +136,54 @@ class DataProcessor:
             
             self.buffer[clean_id][field].append(value)
 
+    def buffered_readings(self):
+        """Readings waiting for the next throttle flush (metrics gauge)."""
+        with self.lock:
+            return sum(
+                len(values) for fields in self.buffer.values() for f, values in fields.items() if f != "__meta__"
+            )
+
+    def forget_device(self, clean_id, device_name=None):
+        """Drop buffered readings of a device evicted by the device registry."""
+        with self.lock:
+            self.buffer.pop(clean_id, None)
+            for key in [k for k in self.last_event if k[0] == clean_id]:
+                del self.last_event[key]
+        self.derived.forget(clean_id)
+        get_window_stats().forget(clean_id)
+        get_outlier_filter().forget(clean_id)
+
+    def _send(self, clean_id, field, value, dev_name, model):
+        # Sample first, so the entity's discovery already carries its attributes topic.
+        stats = get_window_stats()
+        attributes = None
+        if stats.enabled and field not in BINARY_SENSOR_FIELDS and field not in NON_AVERAGED_NUMERIC_FIELDS:
+            attributes = stats.add(clean_id, field, value, time.monotonic())
+
+        if _json_state_enabled():
+            self.mqtt_handler.send_sensor(clean_id, field, value, dev_name, model, is_rtl=True, defer_state=True)
+        else:
+            self.mqtt_handler.send_sensor(clean_id, field, value, dev_name, model, is_rtl=True)
+
+        send_attributes = getattr(self.mqtt_handler, "send_attributes", None)
+        if attributes and send_attributes is not None:
+            send_attributes(clean_id, field, attributes)
+
+    def _note_radio(self, clean_id, radio_name, radio_freq):
+        note = getattr(self.mqtt_handler, "set_device_radio", None)
+        if note is not None:
+            note(clean_id, radio_name, radio_freq)
+
+    def _flush_state(self, clean_id):
+        flush = getattr(self.mqtt_handler, "flush_device_state", None)
+        if flush is not None and _json_state_enabled():
+            flush(clean_id)
+
+    def end_packet(self, clean_id):
+        """Called after all fields of one decoded packet were dispatched."""
+        if getattr(config, "RTL_THROTTLE_INTERVAL", 0) <= 0:
+            self._flush_state(clean_id)
+
     def start_throttle_loop(self):
         """
         Thread loop that wakes up every RTL_THROTTLE_INTERVAL seconds,
@@ -96,6 +215,7 @@ class DataProcessor:
                 model = meta.get("model", "Unknown")
                 r_name = meta.get("radio", "Unknown")
                 r_freq = meta.get("freq", "")
+                self._note_radio(clean_id, r_name, r_freq)
 
                 for field, values in device_data.items():
                     if field == "__meta__": 
@@ -118,7 +238,7 @@ class DataProcessor:
                     except:
                         final_val = values[-1]
 
-                    self.mqtt_handler.send_sensor(clean_id, field, final_val, dev_name, model, is_rtl=True)
+                    self._send(clean_id, field, final_val, dev_name, model)
                     count_sent += 1
                     
                     # --- FIX 3: Group by Radio + Frequency for the log ---
@@ -127,6 +247,8 @@ class DataProcessor:
                         key = f"{r_name}[{r_freq}]"
                         
                     stats_by_radio[key] = stats_by_radio.get(key, 0) + 1
+
+                self._flush_state(clean_id)
             
             # --- Consolidated Heartbeat Log ---
             if count_sent > 0:
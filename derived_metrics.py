@@ -0,0 +1,102 @@
+# derived_metrics.py
+"""
+FILE: derived_metrics.py
+DESCRIPTION:
+  Incremental rates from monotonic counters (rtl_derived_metrics).
+  - rain_mm -> rain_rate_mm_h, rain_in -> rain_rate_in_h
+  - total_kWh / energy_kWh -> power_W
+  - total_m3 / volume_m3 -> flow_m3_h, Consumption -> consumption_rate
+  - O(1) state per (device, counter): the last baseline value and time. A rate
+    is computed once at least MIN_INTERVAL seconds have passed, so the
+    repeated transmissions of one packet do not produce spikes.
+  - A counter that decreases is either a wraparound of a 16/24/32-bit counter
+    (previous value near the top, new value near zero) or a reset (battery
+    change, meter replacement): the baseline restarts and nothing is published.
+  - A device that reports the target field itself (e.g. rain_rate_mm_h) keeps
+    its own value; nothing is derived for it.
+"""
+from __future__ import annotations
+
+import threading
+from typing import Optional
+
+# counter field -> (derived field, factor applied to delta-per-second)
+DERIVED_RATES = {
+    "rain_mm": ("rain_rate_mm_h", 3600.0),
+    "rain_in": ("rain_rate_in_h", 3600.0),
+    "total_kWh": ("power_W", 3600.0 * 1000.0),
+    "energy_kWh": ("power_W", 3600.0 * 1000.0),
+    "total_m3": ("flow_m3_h", 3600.0),
+    "volume_m3": ("flow_m3_h", 3600.0),
+    "Consumption": ("consumption_rate", 3600.0),
+}
+
+DERIVED_FIELDS = frozenset(target for target, _factor in DERIVED_RATES.values())
+
+# Minimum seconds between baseline and reading for a rate.
+MIN_INTERVAL = 60.0
+
+# Integer counter widths considered for wraparound detection.
+WRAP_MODULI = (2**16, 2**24, 2**32)
+WRAP_MARGIN = 0.1
+
+
+def _wrapped_delta(last: float, value: float) -> Optional[float]:
+    """Delta across a counter wraparound, or None if the decrease looks like a reset."""
+    for mod in WRAP_MODULI:
+        if last < mod:
+            if last >= (1 - WRAP_MARGIN) * mod and value <= WRAP_MARGIN * mod:
+                return value + mod - last
+            return None
+    return None
+
+
+class DerivedMetrics:
+    """Per-device counter baselines -> rate fields (thread-safe)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # (clean_id, counter field) -> [baseline value, baseline time]
+        self._baseline: dict[tuple[str, str], list] = {}
+        # (clean_id, derived field) reported natively by the device
+        self._native: set[tuple[str, str]] = set()
+        self.resets = 0
+
+    def update(self, clean_id: str, field: str, value, now: float) -> list[tuple[str, float]]:
+        """Feed one reading; returns [(derived_field, value)] to publish (usually empty)."""
+        if field in DERIVED_FIELDS:
+            self._native.add((clean_id, field))
+            return []
+        rule = DERIVED_RATES.get(field)
+        if rule is None or isinstance(value, bool) or not isinstance(value, (int, float)):
+            return []
+        target, factor = rule
+        if (clean_id, target) in self._native:
+            return []
+
+        key = (clean_id, field)
+        with self._lock:
+            base = self._baseline.get(key)
+            if base is None:
+                self._baseline[key] = [value, now]
+                return []
+            last, since = base
+            dt = now - since
+            if value < last:
+                delta = _wrapped_delta(last, value)
+                if delta is None:
+                    self.resets += 1
+                    self._baseline[key] = [value, now]
+                    return []
+            else:
+                delta = value - last
+            if dt < MIN_INTERVAL:
+                return []
+            self._baseline[key] = [value, now]
+        return [(target, round(delta / dt * factor, 3))]
+
+    def forget(self, clean_id: str, device_name: Optional[str] = None) -> None:
+        with self._lock:
+            for key in [k for k in self._baseline if k[0] == clean_id]:
+                del self._baseline[key]
+            self._native.difference_update([k for k in self._native if k[0] == clean_id])
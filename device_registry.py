@@ -0,0 +1,87 @@
+# device_registry.py
+"""
+FILE: device_registry.py
+DESCRIPTION:
+  Device lifecycle for the per-device caches (device_ttl / device_max).
+  - touch() records when a device (clean_id) was last heard, least recent first.
+  - Devices silent for longer than the TTL, or the least recently heard ones
+    beyond the cap, are evicted: every registered listener is called with
+    (clean_id, device_name) so HomeNodeMQTT and DataProcessor drop their state.
+  - TTL expiry is checked from touch() at most once per SWEEP_INTERVAL.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+SWEEP_INTERVAL = 60.0
+
+
+class DeviceRegistry:
+    """Last-seen time per device with TTL + LRU eviction (thread-safe)."""
+
+    def __init__(self, ttl: float = 0, max_devices: int = 0, clock: Callable[[], float] = time.monotonic) -> None:
+        self.ttl = max(0.0, float(ttl or 0))
+        self.max_devices = max(0, int(max_devices or 0))
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._seen: OrderedDict[str, float] = OrderedDict()
+        self._names: dict[str, str] = {}
+        self._listeners: list[Callable[[str, Optional[str]], None]] = []
+        self._last_sweep = clock()
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def __contains__(self, clean_id) -> bool:
+        return clean_id in self._seen
+
+    def add_listener(self, callback: Callable[[str, Optional[str]], None]) -> None:
+        self._listeners.append(callback)
+
+    def touch(self, clean_id: str, name: Optional[str] = None) -> list[str]:
+        """Mark a device as heard now. Returns the devices evicted as a side effect."""
+        now = self._clock()
+        with self._lock:
+            self._seen[clean_id] = now
+            self._seen.move_to_end(clean_id)
+            if name is not None:
+                self._names[clean_id] = name
+            victims = []
+            if self.max_devices and len(self._seen) > self.max_devices:
+                victims.extend(list(self._seen)[: len(self._seen) - self.max_devices])
+            if self.ttl and now - self._last_sweep >= SWEEP_INTERVAL:
+                self._last_sweep = now
+                victims.extend(cid for cid, ts in self._seen.items() if now - ts > self.ttl and cid not in victims)
+            evicted = self._pop(victims)
+        return self._notify(evicted)
+
+    def sweep(self) -> list[str]:
+        """Evict every device not heard within the TTL now."""
+        if not self.ttl:
+            return []
+        now = self._clock()
+        with self._lock:
+            self._last_sweep = now
+            evicted = self._pop([cid for cid, ts in self._seen.items() if now - ts > self.ttl])
+        return self._notify(evicted)
+
+    def _pop(self, ids) -> list[tuple[str, Optional[str]]]:
+        out = []
+        for cid in ids:
+            if self._seen.pop(cid, None) is not None:
+                out.append((cid, self._names.pop(cid, None)))
+        self.evicted += len(out)
+        return out
+
+    def _notify(self, evicted) -> list[str]:
+        for cid, name in evicted:
+            for callback in self._listeners:
+                try:
+                    callback(cid, name)
+                except Exception as e:
+                    print(f"[DEVICES] Eviction of {cid} failed: {e}")
+        return [cid for cid, _name in evicted]
@@ -0,0 +1,140 @@
+# discovery_payload.py
+"""
+FILE: discovery_payload.py
+DESCRIPTION:
+  Serializers for Home Assistant MQTT discovery payloads.
+  - encode(): deterministic JSON (sorted keys, no whitespace when compact).
+  - compact(): rewrites a payload with HA's documented discovery abbreviations
+    (stat_t, uniq_id, dev, avty_t, ...), drops keys that equal HA's defaults and
+    moves a shared topic prefix into the "~" base topic.
+  - Works for per-entity configs and device-based configs (cmps/o/dev).
+"""
+from __future__ import annotations
+
+import json
+
+# Entity-level keys (subset of homeassistant/components/mqtt/abbreviations.py).
+ABBREVIATIONS = {
+    "availability_topic": "avty_t",
+    "command_topic": "cmd_t",
+    "components": "cmps",
+    "device": "dev",
+    "device_class": "dev_cla",
+    "entity_category": "ent_cat",
+    "expire_after": "exp_aft",
+    "icon": "ic",
+    "json_attributes_topic": "json_attr_t",
+    "object_id": "obj_id",
+    "origin": "o",
+    "payload_off": "pl_off",
+    "payload_on": "pl_on",
+    "payload_press": "pl_prs",
+    "platform": "p",
+    "state_class": "stat_cla",
+    "state_topic": "stat_t",
+    "unique_id": "uniq_id",
+    "unit_of_measurement": "unit_of_meas",
+    "value_template": "val_tpl",
+}
+
+DEVICE_ABBREVIATIONS = {
+    "configuration_url": "cu",
+    "connections": "cns",
+    "hw_version": "hw",
+    "identifiers": "ids",
+    "manufacturer": "mf",
+    "model": "mdl",
+    "model_id": "mdl_id",
+    "serial_number": "sn",
+    "suggested_area": "sa",
+    "sw_version": "sw",
+}
+
+ORIGIN_ABBREVIATIONS = {
+    "support_url": "url",
+    "sw_version": "sw",
+}
+
+# Values Home Assistant assumes when the key is absent.
+DEFAULTS = {
+    "payload_on": "ON",
+    "payload_off": "OFF",
+    "payload_press": "PRESS",
+    "payload_available": "online",
+    "payload_not_available": "offline",
+    "expire_after": 0,
+    "qos": 0,
+    "retain": False,
+    "enabled_by_default": True,
+}
+
+# Topic keys that may use the "~" base topic. The base is chosen from the entity's
+# own topics; the shared availability topic only uses it when it happens to match.
+BASE_TOPIC_KEYS = ("state_topic", "json_attributes_topic", "command_topic")
+TOPIC_KEYS = BASE_TOPIC_KEYS + ("availability_topic",)
+
+
+def encode(payload: dict, compact: bool = False) -> str:
+    """Deterministic JSON for a discovery payload (byte-identical for equal content)."""
+    if compact:
+        return json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return json.dumps(payload, sort_keys=True)
+
+
+def _drop_defaults(payload: dict) -> dict:
+    out = {}
+    for key, value in payload.items():
+        if value is None or value == "" or value == [] or value == {}:
+            continue
+        if key in DEFAULTS and value == DEFAULTS[key] and type(value) is type(DEFAULTS[key]):
+            continue
+        out[key] = value
+    return out
+
+
+def _under(topic: str, base: str) -> bool:
+    return topic == base or topic.startswith(base + "/")
+
+
+def _apply_base_topic(payload: dict) -> dict:
+    """Move the common prefix of the entity's topics into "~" when that saves bytes."""
+    own = [payload[k] for k in BASE_TOPIC_KEYS if isinstance(payload.get(k), str)]
+    if not own or "~" in payload:
+        return payload
+
+    base = own[0]
+    for topic in own[1:]:
+        while base and not _under(topic, base):
+            base = base.rsplit("/", 1)[0] if "/" in base else ""
+    if not base:
+        return payload
+
+    keys = [k for k in TOPIC_KEYS if isinstance(payload.get(k), str) and _under(payload[k], base)]
+    # '"~":"<base>",' costs len(base) + 6; each rewritten topic saves len(base) - 1.
+    if (len(base) - 1) * len(keys) <= len(base) + 6:
+        return payload
+
+    out = dict(payload)
+    out["~"] = base
+    for key in keys:
+        out[key] = "~" + out[key][len(base):]
+    return out
+
+
+def _abbreviate(payload: dict, table: dict) -> dict:
+    return {table.get(k, k): v for k, v in payload.items()}
+
+
+def compact(payload: dict) -> dict:
+    """Return the abbreviated, default-free form of an entity or device discovery payload."""
+    out = _apply_base_topic(_drop_defaults(payload))
+
+    if isinstance(out.get("device"), dict):
+        out["device"] = _abbreviate(_drop_defaults(out["device"]), DEVICE_ABBREVIATIONS)
+    if isinstance(out.get("origin"), dict):
+        out["origin"] = _abbreviate(_drop_defaults(out["origin"]), ORIGIN_ABBREVIATIONS)
+    if isinstance(out.get("components"), dict):
+        out["components"] = {uid: compact(comp) for uid, comp in out["components"].items()}
+
+    return _abbreviate(out, ABBREVIATIONS)
+
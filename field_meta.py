@@ -1,276 +1,305 @@
 # field_meta.py
 """
 FILE: field_meta.py
+DESCRIPTION:
+  Discovery metadata per field, loaded from the field_meta.json database.
+  - FIELD_META: field -> (Unit, Device Class, Icon, Friendly Name)
+  - MODEL_FIELD_META: lowercase model prefix -> {field: meta} overrides
+  - The bundled database and an optional user overlay (field_meta_overlay,
+    same format, its entries win) are validated and compiled once at import
+    into read-only mappings.
+  - SUFFIX_RULES infer the unit and class of fields missing from FIELD_META
+    from their rtl_433 unit suffix (e.g. "_C", "_kWh", "_mi_h"). Model prefixes
+    and suffix rules are compiled once and memoized per (model, field).
+  - Check a database (and time loading/lookups) with:
+      python field_meta.py [--bench] [path ...]
 """
-# Format: (Unit, Device Class, Icon, Friendly Name)
+import json
+import os
+import re
+import sys
+import time
+from functools import lru_cache
+from types import MappingProxyType
+
+import config
+
+# Database format version this module understands.
+DB_VERSION = 1
+BUNDLED_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "field_meta.json")
+
+
+def _check_meta(meta):
+    """Problem with one [Unit, Device Class, Icon, Friendly Name] entry, or None."""
+    if not isinstance(meta, list) or len(meta) != 4:
+        return "expected [unit, device_class, icon, name]"
+    unit, device_class, icon, name = meta
+    if unit is not None and not isinstance(unit, str):
+        return "unit must be a string or null"
+    if not isinstance(device_class, str) or not device_class:
+        return 'device_class must be a string ("none" for no class)'
+    if not isinstance(icon, str) or not icon.startswith("mdi:"):
+        return 'icon must be an "mdi:" icon'
+    if not isinstance(name, str) or not name:
+        return "name must be a non-empty string"
+    return None
+
+
+def validate_field_db(doc) -> list:
+    """List of problems in a parsed field database (empty when valid)."""
+    if not isinstance(doc, dict):
+        return ["top level must be an object"]
+    errors = []
+    version = doc.get("version")
+    if not isinstance(version, int) or not 1 <= version <= DB_VERSION:
+        errors.append(f"version must be an integer from 1 to {DB_VERSION}")
+
+    groups = doc.get("fields", [])
+    if not isinstance(groups, list):
+        errors.append("fields must be a list of groups")
+        groups = []
+    seen = {}
+    for i, group in enumerate(groups):
+        if not isinstance(group, dict) or not isinstance(group.get("entries"), dict):
+            errors.append(f"fields[{i}]: group needs an \"entries\" object")
+            continue
+        where = f"fields[{i}] ({group.get('group', '?')})"
+        for field, meta in group["entries"].items():
+            problem = _check_meta(meta)
+            if problem:
+                errors.append(f"{where} {field}: {problem}")
+            if field in seen:
+                errors.append(f"{where} {field}: already defined in {seen[field]}")
+            seen.setdefault(field, where)
+
+    models = doc.get("models", {})
+    if not isinstance(models, dict):
+        errors.append("models must be an object")
+        models = {}
+    for prefix, group in models.items():
+        where = f"models[{prefix}]"
+        if not prefix or prefix != prefix.strip().lower():
+            errors.append(f"{where}: model prefixes must be lowercase")
+        if not isinstance(group, dict) or not isinstance(group.get("entries"), dict):
+            errors.append(f"{where}: needs an \"entries\" object")
+            continue
+        for field, meta in group["entries"].items():
+            problem = _check_meta(meta)
+            if problem:
+                errors.append(f"{where} {field}: {problem}")
+    return errors
 
-FIELD_META = {
-    # --- System Diagnostics (NEW: Configuration) ---
-    # "sys_cfg_blacklist":    ("", "none", "mdi:playlist-remove", "Blacklist"),
-    # "sys_cfg_whitelist":    ("", "none", "mdi:playlist-check", "Whitelist"),
-    # "sys_cfg_sensors":      ("", "none", "mdi:eye-settings", "Main Sensors"),
-
-    # --- SDR Health Monitoring ---
-    "sdr_health_alert":     (None, "problem", "mdi:alert-octagon", "SDR Health Alert"),
-    "sdr_health_reason":    (None, "none", "mdi:information", "Health Alert Reason"),
-
-    # --- System Diagnostics (Existing) ---
-    "sys_device_count":     ("dev", "none", "mdi:counter", "Active Devices"),
-    # "sys_device_list":      ("", "none", "mdi:format-list-bulleted", "Device List"),
-
-    "sys_ip":               ("", "none", "mdi:ip-network", "IP Address"),
-    "sys_os_version":       ("", "none", "mdi:linux", "Linux Kernel"),
-    "sys_rtl_433_version": ("", "none", "mdi:radio", "rtl_433 Version"),
-    "sys_model":            ("", "none", "mdi:chip", "Device Model"),
-    "sys_script_mem":       ("MB", "data_size", "mdi:memory", "Script RAM Usage"),
-    "sys_cpu":              ("%", "none", "mdi:cpu-64-bit", "CPU Load"),
-    "sys_mem":              ("%", "none", "mdi:memory", "RAM Usage"),
-    "sys_disk":             ("%", "none", "mdi:harddisk", "Disk Usage"),
-    "sys_temp":             ("°C", "temperature", "mdi:thermometer-lines", "CPU Temp"),
-    "sys_uptime":           ("s", "duration", "mdi:clock-start", "System Uptime"),
-    "model":                ("", "none", "mdi:tag", "Model"),
-
-    # --- Magnetometer ---
-    "mag_uT":               ("uT", "none", "mdi:magnet", "Mag Field Strength"),
-    "geomag_index":         ("idx", "none", "mdi:waveform", "Mag Disturbance"),
-    "status":               ("", "enum", "mdi:list-status", "Device Status"),
-
-    # --- Temperature ---
-    "temperature":          ("°F", "temperature", "mdi:thermometer", "Temperature"),
-    "temperature_C":        ("°C", "temperature", "mdi:thermometer", "Temperature (C)"),
-    "temperature_F":        ("°F", "temperature", "mdi:thermometer", "Temperature"),
-    "setpoint_C":          ("°C", "temperature", "mdi:thermostat", "Setpoint (C)"),
-    "setpoint_F":          ("°F", "temperature", "mdi:thermostat", "Setpoint"),
-    "temperature_1_C":     ("°C", "temperature", "mdi:thermometer", "Temperature 1 (C)"),
-    "temperature_2_C":     ("°C", "temperature", "mdi:thermometer", "Temperature 2 (C)"),
-    "temperature_3_C":     ("°C", "temperature", "mdi:thermometer", "Temperature 3 (C)"),
-    "temperature_4_C":     ("°C", "temperature", "mdi:thermometer", "Temperature 4 (C)"),
-    "temperature_1_F":     ("°F", "temperature", "mdi:thermometer", "Temperature 1"),
-    "temperature_2_F":     ("°F", "temperature", "mdi:thermometer", "Temperature 2"),
-    "temperature_2":       ("°F", "temperature", "mdi:thermometer", "Temperature 2"),
-    "dew_point":            ("°F", "temperature", "mdi:weather-fog", "Dew Point"),
-
-    # --- Humidity ---
-    "humidity":             ("%", "humidity", "mdi:water-percent", "Humidity"),
-    "humidity_1":          ("%", "humidity", "mdi:water-percent", "Humidity 1"),
-    "humidity_2":          ("%", "humidity", "mdi:water-percent", "Humidity 2"),
-
-    # --- Air Quality ---
-    "co2":                  ("ppm", "carbon_dioxide", "mdi:molecule-co2", "CO2 Level"),
-    "co2_ppm":             ("ppm", "carbon_dioxide", "mdi:molecule-co2", "CO₂ Level"),
-    "pm2_5_ug_m3":          ("µg/m³", "pm25", "mdi:blur", "PM2.5"),
-    "pm10_ug_m3":           ("µg/m³", "pm10", "mdi:blur", "PM10"),
-    "pm10_0_ug_m3":         ("µg/m³", "pm10", "mdi:blur", "PM10"),
-    "estimated_pm10_0_ug_m3": ("µg/m³", "pm10", "mdi:blur", "PM10 (Estimated)"),
-    "pm1_ug_m3":            ("µg/m³", "none", "mdi:blur", "PM1.0"),
-    "pm4_ug_m3":            ("µg/m³", "none", "mdi:blur", "PM4.0"),
-
-    # --- Pressure ---
-    "pressure_hpa":         ("hPa", "pressure", "mdi:gauge", "Pressure"),
-    "pressure_inhg":        ("inHg", "pressure", "mdi:gauge", "Pressure"),
-    "pressure_PSI":         ("psi", "pressure", "mdi:gauge", "Pressure"),
-    "pressure_hPa":        ("hPa", "pressure", "mdi:gauge", "Pressure"),
-    "pressure_kPa":        ("kPa", "pressure", "mdi:gauge", "Pressure"),
-    "pressure_psi":        ("psi", "pressure", "mdi:gauge", "Pressure"),
-
-    # --- Wind ---
-    "wind_avg_km_h":        ("km/h", "wind_speed", "mdi:weather-windy", "Wind Speed"),
-    "wind_avg_mi_h":        ("mph", "wind_speed", "mdi:weather-windy", "Wind Speed"),
-    "wind_avg_m_s":        ("m/s", "wind_speed", "mdi:weather-windy", "Wind Speed"),
-    "wind_speed":           ("km/h", "wind_speed", "mdi:weather-windy", "Wind Speed"),
-    "wind_speed_km_h":      ("km/h", "wind_speed", "mdi:weather-windy", "Wind Speed"),
-    "wind_speed_m_s":       ("m/s", "wind_speed", "mdi:weather-windy", "Wind Speed"),
-    "wind_speed_mi_h":      ("mph", "wind_speed", "mdi:weather-windy", "Wind Speed"),
-    "wind_gust_km_h":       ("km/h", "wind_speed", "mdi:weather-windy-variant", "Wind Gust"),
-    "wind_gust_mi_h":       ("mph", "wind_speed", "mdi:weather-windy-variant", "Wind Gust"),
-    "wind_gust_m_s":        ("m/s", "wind_speed", "mdi:weather-windy-variant", "Wind Gust"),
-    "gust_speed_km_h":      ("km/h", "wind_speed", "mdi:weather-windy-variant", "Wind Gust"),
-    "gust_speed_m_s":       ("m/s", "wind_speed", "mdi:weather-windy-variant", "Wind Gust"),
-    "wind_max_m_s":        ("m/s", "wind_speed", "mdi:weather-windy-variant", "Wind Gust"),
-    "wind_max_km_h":       ("km/h", "wind_speed", "mdi:weather-windy-variant", "Wind Gust"),
-    "wind_max_mi_h":       ("mph", "wind_speed", "mdi:weather-windy-variant", "Wind Gust"),
-    "wind_dir_deg":         ("°", "wind_direction", "mdi:compass", "Wind Direction"),
-    "wind_dir":             ("°", "wind_direction", "mdi:compass", "Wind Direction"),
-    "wind_dev_deg":         ("°", "none", "mdi:compass-rose", "Wind Deviation"),
-
-    # --- Rain ---
-    "rain_mm":              ("mm", "precipitation", "mdi:weather-rainy", "Rain Total"),
-    "rain_in":              ("in", "precipitation", "mdi:weather-rainy", "Rain Total"),
-    "rain_rate_mm_h":       ("mm/h", "precipitation_intensity", "mdi:weather-pouring", "Rain Rate"),
-    "rain_rate_in_h":       ("in/h", "precipitation_intensity", "mdi:weather-pouring", "Rain Rate"),
-    "rain_start":           (None, "none", "mdi:weather-rainy", "Rain Detected"),
-    "rain2_mm":             ("mm", "precipitation", "mdi:weather-rainy", "Rain Total 2"),
-    "rain_raw":             ("count", "none", "mdi:weather-rainy", "Rain Raw Count"),
-    "rain":                 ("count", "none", "mdi:weather-rainy", "Rain Count"),
-    "rain1":                ("count", "none", "mdi:weather-rainy", "Rain Count 1"),
-    "rain2":                ("count", "none", "mdi:weather-rainy", "Rain Count 2"),
-
-    # --- Light ---
-    "lux":                  ("lx", "illuminance", "mdi:brightness-5", "Light Level"),
-    "light_lux":           ("lx", "illuminance", "mdi:brightness-5", "Light Level"),
-    "uvi":                 ("UV Index", "none", "mdi:sunglasses", "UV Index"),
-    "uv_index":            ("UV Index", "none", "mdi:sunglasses", "UV Index"),
-    "full_lux":             ("cnt", "none", "mdi:brightness-7", "Raw Full Spectrum"),
-    "ir_lux":               ("cnt", "none", "mdi:cctv", "Raw IR"),
-    "uv":                   ("UV Index", "none", "mdi:sunglasses", "UV Index"),
-    "wm":                   ("W/m²", "irradiance", "mdi:white-balance-sunny", "Solar Radiation"),
-    "uv_sensor_id":         (None, "none", "mdi:identifier", "UV Sensor ID"),
-    "uv_status":            (None, "none", "mdi:check-circle", "UV Sensor Status"),
-    "exposure_mins":        ("min", "duration", "mdi:sun-clock", "UV Exposure Time"),
-
-    # --- Lightning ---
-    "strikes":              ("count", "none", "mdi:flash", "Lightning Strikes"),
-    "strike_distance":      ("km", "distance", "mdi:flash-alert", "Storm Distance"),
-    "storm_dist":           ("km", "distance", "mdi:flash-alert", "Storm Distance"),
-    "storm_distance":       ("km", "distance", "mdi:flash-alert", "Storm Distance"),
-    "storm_dist_km":        ("km", "distance", "mdi:flash-alert", "Storm Distance"),
-    "strike_count":         (None, "none", "mdi:lightning-bolt", "Strike Count"),
-    "active":               (None, "none", "mdi:flash", "Lightning Active"),
-
-    # --- Soil Moisture ---
-    "moisture":            ("%", "moisture", "mdi:water-percent", "Soil Moisture"),
-
-    # --- Leak Detection (Acurite 1190/1192) ---
-    "leak_detected":       (None, "moisture", "mdi:water-alert", "Leak Detected"),
-    "water":               (None, "moisture", "mdi:water", "Water Detected"),
-    
-
-    # --- Radio Diagnostics ---
-    "freq":                 ("MHz", "frequency", "mdi:sine-wave", "Frequency"),
-    "freq1":                ("MHz", "frequency", "mdi:sine-wave", "Frequency"),
-    "freq2":                ("MHz", "frequency", "mdi:sine-wave", "Frequency"),
-    "mod":                  ("", "none", "mdi:waveform", "Modulation"),
-    "modulation":           ("", "none", "mdi:waveform", "Modulation"),
-    "rssi":                 ("dB", "signal_strength", "mdi:wifi", "Signal (RSSI)"),
-    "snr":                  ("dB", "signal_strength", "mdi:signal-distance-variant", "Signal (SNR)"),
-    "noise":                ("dB", "signal_strength", "mdi:volume-high", "Noise Floor"),
-    "rssi_dB":             ("dB", "signal_strength", "mdi:wifi", "Signal (RSSI)"),
-    "snr_dB":              ("dB", "signal_strength", "mdi:signal-distance-variant", "Signal (SNR)"),
-    "noise_dB":            ("dB", "signal_strength", "mdi:volume-high", "Noise Floor"),
-    "flags":               (None, "none", "mdi:flag", "Flags"),
-    "button":              (None, "none", "mdi:button-pointer", "Button"),
-    "code":                (None, "none", "mdi:remote", "Code"),
-    "state":               (None, "none", "mdi:toggle-switch", "State"),
-    "counter":             ("count", "none", "mdi:counter", "Counter"),
-    "sequence":            ("count", "none", "mdi:counter", "Sequence"),
-    "version":             (None, "none", "mdi:tag", "Version"),
-    "type":                (None, "none", "mdi:tag-outline", "Type"),
-    "subtype":             (None, "none", "mdi:tag-outline", "Subtype"),
-    "id":                   ("", "none", "mdi:identifier", "Device ID"),
-    "channel":              ("", "none", "mdi:radio-tower", "Channel"),
-    "mic":                  ("", "none", "mdi:check-network", "Integrity Check"),
-    "radio_status":         ("", "none", "mdi:radio-tower", "Radio Status"),
-    "rfi":                  (None, "none", "mdi:radio-tower", "RFI"),
-    "radio_clock":          (None, "timestamp", "mdi:radio-tower", "Radio Clock"),
-    "signal":               (None, "none", "mdi:signal", "Signal Type"),
-    "firmware":             (None, "none", "mdi:chip", "Firmware"),
-    "sensitivity":          (None, "none", "mdi:tune", "Sensitivity"),
-    "raw_value":            (None, "none", "mdi:numeric", "Raw Value"),
-    "ad_raw":               (None, "none", "mdi:numeric", "ADC Raw"),
-    "boost":                (None, "none", "mdi:signal-cellular-3", "Boost Mode"),
-    "msg_type":             (None, "none", "mdi:message-text", "Message Type"),
-    "data":                 (None, "none", "mdi:code-braces", "Extra Data"),
-    "ptemp_raw":            (None, "none", "mdi:thermometer", "Raw Temperature"),
-    "phumidity":            (None, "none", "mdi:water-percent", "Raw Humidity"),
-
-    # --- Raw Data ---
-    # Raw hex message from rtl_433, useful for debugging or protocol analysis.
-    "raw_msg":              (None, "none", "mdi:code-tags", "Raw Message"),
-
-    # --- Timestamp ---
-    # rtl_433 outputs a "time" field when run with -M time or -M utc.
-    # This is useful to see when a device last transmitted, even if values didn't change.
-    "time":                 (None, "timestamp", "mdi:clock-in", "Last Seen"),
-    "sequence_num":         (None, "none", "mdi:counter", "Sequence"),
-    "message_type":         (None, "none", "mdi:message-text", "Message Type"),
-    "exception":            (None, "none", "mdi:alert-circle", "Exception"),
-    "seq":                  (None, "none", "mdi:counter", "Sequence"),
-    "startup":              (None, "none", "mdi:power", "Startup"),
-    "test":                 (None, "none", "mdi:test-tube", "Test Mode"),
-
-    # --- Depth / Level ---
-    "depth_cm":             ("cm", "distance", "mdi:arrow-collapse-down", "Depth"),
-    "depth_mm":             ("mm", "distance", "mdi:arrow-collapse-down", "Depth"),
-    "depth_in":             ("in", "distance", "mdi:arrow-collapse-down", "Depth"),
-
-    # --- Utility Meters ---
-    "Consumption":          ("ft³", "gas", "mdi:fire", "Gas Usage"),
-    "consumption":          ("ft³", "gas", "mdi:fire", "Gas Usage"),
-    "consumption_data":     ("ft³", "gas", "mdi:fire", "Gas Usage"),
-    "meter_reading":        ("ft³", "water", "mdi:water-pump", "Water Reading"),
-    # Common rtl_433 water meter fields
-    # - Badger ORION emits volume_gal
-    # - Many wireless meter protocols expose volume in common units
-    "volume_gal":           ("gal", "water", "mdi:water-pump", "Water Usage"),
-    "volume_ft3":           ("ft³", "water", "mdi:water-pump", "Water Usage"),
-    "volume_m3":            ("m³", "water", "mdi:water-pump", "Water Usage"),
-    "total_m3":             ("m³", "water", "mdi:water-pump", "Water Total"),
-    "total_l":              ("L",  "water", "mdi:water-pump", "Water Total"),
-    "consumption_at_set_date_m3": ("m³", "water", "mdi:water-pump", "Water @ Set Date"),
-
-    # --- Power / Energy ---
-    "power_W":             ("W", "power", "mdi:flash", "Power"),
-    "power0_W":            ("W", "power", "mdi:flash", "Power 0"),
-    "power1_W":            ("W", "power", "mdi:flash", "Power 1"),
-    "power2_W":            ("W", "power", "mdi:flash", "Power 2"),
-    "power3_W":            ("W", "power", "mdi:flash", "Power 3"),
-    "energy_kWh":          ("kWh", "energy", "mdi:counter", "Energy"),
-    "total_kWh":           ("kWh", "energy", "mdi:counter", "Energy Total"),
-    "voltage_V":           ("V", "voltage", "mdi:sine-wave", "Voltage"),
-    "current_A":           ("A", "current", "mdi:current-ac", "Current"),
-
-
-    # --- Security / Binary Sensors ---
-    # These fields are published as binary_sensors with appropriate device classes.
-    # The actual binary_sensor logic is in mqtt_handler.py BINARY_SENSOR_FIELDS.
-    "tamper":               (None, "tamper", "mdi:alert-circle", "Tamper"),
-    "alarm":                (None, "safety", "mdi:alarm-light", "Alarm"),
-    "contact_open":         (None, "door", "mdi:door", "Door"),
-    "reed_open":            (None, "door", "mdi:door", "Door"),
-    "detect_wet":           (None, "moisture", "mdi:water-alert", "Water Detected"),
-    "ext_power":            (None, "plug", "mdi:power-plug", "External Power"),
-
-    # --- Battery ---
-    # Many decoders emit battery_ok where 1/True means battery is OK and 0/False
-    # means battery is LOW. We publish this as a binary sensor (device_class: battery)
-    # and invert it in mqtt_handler so ON means LOW battery.
-    "battery_ok":           (None, "battery", "mdi:battery", "Battery Low"),
-    "battery_pct":         ("%", "battery", "mdi:battery", "Battery"),
-    "battery_V":           ("V", "voltage", "mdi:battery", "Battery Voltage"),
-    "battery_mV":          ("mV", "voltage", "mdi:battery", "Battery Voltage"),
-    "battery_low":         (None, "none", "mdi:battery-alert", "Battery Low (Raw)"),
-    "battery_raw":         ("cnt", "none", "mdi:battery", "Battery Raw"),
-    "battery_level":       (None, "none", "mdi:battery", "Battery Level"),
-    "supercap_V":          ("V", "voltage", "mdi:solar-power", "Supercapacitor"),
-    "newbattery":          (None, "none", "mdi:battery-plus", "New Battery"),
 
+def load_field_db(path: str) -> dict:
+    """Parse and validate one database file (ValueError lists the problems)."""
+    with open(path, "r", encoding="utf-8") as f:
+        doc = json.load(f)
+    errors = validate_field_db(doc)
+    if errors:
+        raise ValueError(f"{path}: {len(errors)} problem(s)\n  " + "\n  ".join(errors))
+    return doc
+
+
+def compile_field_db(*docs):
+    """Merge databases (later ones win per field) into read-only (FIELD_META, MODEL_FIELD_META)."""
+    fields, models = {}, {}
+    for doc in docs:
+        for group in doc.get("fields", []):
+            for field, meta in group["entries"].items():
+                fields[field] = tuple(meta)
+        for prefix, group in doc.get("models", {}).items():
+            merged = models.setdefault(prefix, {})
+            for field, meta in group["entries"].items():
+                merged[field] = tuple(meta)
+    return (
+        MappingProxyType(fields),
+        MappingProxyType({prefix: MappingProxyType(m) for prefix, m in models.items()}),
+    )
+
+
+def _load_databases():
+    docs = [load_field_db(BUNDLED_DB_PATH)]
+    overlay = str(getattr(config, "FIELD_META_OVERLAY", "") or "").strip()
+    if overlay and os.path.exists(overlay):
+        try:
+            docs.append(load_field_db(overlay))
+            print(f"[STARTUP] Loaded field metadata overlay {overlay}")
+        except (OSError, ValueError) as e:
+            print(f"[STARTUP] Ignoring field metadata overlay: {e}")
+    return compile_field_db(*docs)
+
+
+# Format: (Unit, Device Class, Icon, Friendly Name)
+# Per-model overrides keep FIELD_META as conservative defaults while allowing correct
+# units/names for specific devices. Keys are lowercase model prefixes (e.g. "neptune-r900").
+FIELD_META, MODEL_FIELD_META = _load_databases()
+
+# rtl_433 unit suffix -> (Unit, Device Class, Icon, friendly name suffix) for fields
+# missing from FIELD_META, e.g. "temperature_3_C" -> ("°C", "temperature", ..., "Temperature 3 (C)").
+# Temperatures name their scale so C and F variants of one reading stay apart.
+SUFFIX_RULES = {
+    "C":      ("°C", "temperature", "mdi:thermometer", " (C)"),
+    "F":      ("°F", "temperature", "mdi:thermometer", " (F)"),
+    "V":      ("V", "voltage", "mdi:flash", ""),
+    "mV":     ("mV", "voltage", "mdi:flash", ""),
+    "A":      ("A", "current", "mdi:current-ac", ""),
+    "mA":     ("mA", "current", "mdi:current-ac", ""),
+    "W":      ("W", "power", "mdi:flash", ""),
+    "kW":     ("kW", "power", "mdi:flash", ""),
+    "Wh":     ("Wh", "energy", "mdi:lightning-bolt", ""),
+    "kWh":    ("kWh", "energy", "mdi:lightning-bolt", ""),
+    "m3":     ("m³", "water", "mdi:water-pump", ""),
+    "gal":    ("gal", "water", "mdi:water-pump", ""),
+    "hPa":    ("hPa", "pressure", "mdi:gauge", ""),
+    "kPa":    ("kPa", "pressure", "mdi:gauge", ""),
+    "PSI":    ("psi", "pressure", "mdi:gauge", ""),
+    "psi":    ("psi", "pressure", "mdi:gauge", ""),
+    "bar":    ("bar", "pressure", "mdi:gauge", ""),
+    "inHg":   ("inHg", "pressure", "mdi:gauge", ""),
+    "km_h":   ("km/h", "wind_speed", "mdi:weather-windy", ""),
+    "mi_h":   ("mph", "wind_speed", "mdi:weather-windy", ""),
+    "m_s":    ("m/s", "wind_speed", "mdi:weather-windy", ""),
+    "mm_h":   ("mm/h", "precipitation_intensity", "mdi:weather-pouring", ""),
+    "in_h":   ("in/h", "precipitation_intensity", "mdi:weather-pouring", ""),
+    "mm":     ("mm", "distance", "mdi:ruler", ""),
+    "deg":    ("°", "wind_direction", "mdi:compass", ""),
+    "lux":    ("lx", "illuminance", "mdi:brightness-5", ""),
+    "Hz":     ("Hz", "frequency", "mdi:sine-wave", ""),
+    "dB":     ("dB", "signal_strength", "mdi:signal", ""),
+    "pct":    ("%", "none", "mdi:percent", ""),
 }
 
-# Per-model overrides for MQTT discovery metadata.
-# This keeps FIELD_META as conservative defaults while allowing correct units/names for specific devices.
-#
-# Keys are lowercase model prefixes (e.g. "neptune-r900") matched with startswith() after stripping.
-MODEL_FIELD_META = {
-    "neptune-r900": {
-        # Neptune-R900 readings are normalized to gallons upstream (often tenths-of-gallon).
-        "meter_reading": ("gal", "water", "mdi:water-pump", "Water Usage"),
-    },
+# One-letter suffixes are too ambiguous on their own ("button_A", "sensor_C"): they
+# only apply when the base names the quantity. Matched against the base from the
+# start or after an underscore.
+SUFFIX_BASES = {
+    "C": re.compile(r"(?:^|_)(?:temp|setpoint|dew|heat_?index|wind_?chill|feels_?like)", re.IGNORECASE),
+    "F": re.compile(r"(?:^|_)(?:temp|setpoint|dew|heat_?index|wind_?chill|feels_?like)", re.IGNORECASE),
+    "V": re.compile(r"(?:^|_)(?:volt|batt|supply|solar|cell|mains|bus|vcc)", re.IGNORECASE),
+    "A": re.compile(r"(?:^|_)(?:current|curr|amp|ct\d*(?:_|$)|phase|mains|load)", re.IGNORECASE),
+    "W": re.compile(r"(?:^|_)(?:power|watt|load|solar|grid|import|export|ct\d*(?:_|$)|phase|mains)", re.IGNORECASE),
 }
 
-def get_field_meta(field: str, device_model: str | None = None, base_meta: dict | None = None):
+# (suffix, base pattern) -> rule that replaces SUFFIX_RULES[suffix] for matching bases.
+# Only rain totals are precipitation counters (total_increasing); other "_mm" fields
+# (snow depth, tank level) are plain distances that go up and down.
+SUFFIX_BASE_RULES = (
+    ("mm", re.compile(r"(?:^|_)rain", re.IGNORECASE), ("mm", "precipitation", "mdi:weather-rainy", "")),
+)
+
+# Longest suffix first; the non-greedy base makes "rain_mm_h" match "mm_h", not "h".
+_SUFFIX_RE = re.compile(
+    r"^(?P<base>.+?)_(?P<suffix>%s)$" % "|".join(re.escape(s) for s in sorted(SUFFIX_RULES, key=len, reverse=True))
+)
+
+
+def _build_model_trie(overrides: dict) -> dict:
+    """Character trie of MODEL_FIELD_META prefixes; a node's None key holds its mapping."""
+    root: dict = {}
+    for prefix, mapping in overrides.items():
+        node = root
+        for ch in prefix:
+            node = node.setdefault(ch, {})
+        node[None] = mapping
+    return root
+
+
+_MODEL_TRIE = _build_model_trie(MODEL_FIELD_META)
+
+
+@lru_cache(maxsize=1024)
+def _model_overrides(model_norm: str) -> tuple:
+    """Mappings of every MODEL_FIELD_META prefix of the model, longest (most specific) first."""
+    found = []
+    node = _MODEL_TRIE
+    for ch in model_norm:
+        node = node.get(ch)
+        if node is None:
+            break
+        if None in node:
+            found.append(node[None])
+    return tuple(reversed(found))
+
+
+@lru_cache(maxsize=4096)
+def infer_field_meta(field: str):
+    """Metadata from the field's unit suffix (SUFFIX_RULES), or None."""
+    m = _SUFFIX_RE.match(field)
+    if m is None:
+        return None
+    suffix, base = m.group("suffix"), m.group("base")
+    required = SUFFIX_BASES.get(suffix)
+    if required is not None and not required.search(base):
+        return None
+    rule = SUFFIX_RULES[suffix]
+    for rule_suffix, pattern, base_rule in SUFFIX_BASE_RULES:
+        if rule_suffix == suffix and pattern.search(base):
+            rule = base_rule
+            break
+    unit, device_class, icon, name_suffix = rule
+    friendly = base.replace("_", " ").strip().title() + name_suffix
+    return (unit, device_class, icon, friendly)
+
+
+def get_field_meta(field: str, device_model: str | None = None, base_meta: dict | None = None, infer: bool = True):
     """Return (unit, device_class, icon, friendly_name) for a field, optionally model-aware.
 
     This is designed to be *backwards compatible* with existing code/tests that monkeypatch
     the `FIELD_META` dict from other modules (e.g., mqtt_handler.FIELD_META). Pass the dict
-    you want to consult via `base_meta`.
+    you want to consult via `base_meta`. That dict is always read directly (never memoized);
+    fields it lacks fall back to infer_field_meta() unless infer=False.
     """
     if device_model:
-        model_norm = str(device_model).strip().lower()
-        for prefix, mapping in MODEL_FIELD_META.items():
-            if model_norm.startswith(prefix):
-                meta = mapping.get(field)
-                if meta is not None:
-                    return meta
+        for mapping in _model_overrides(str(device_model).strip().lower()):
+            meta = mapping.get(field)
+            if meta is not None:
+                return meta
 
     meta_source = base_meta if base_meta is not None else FIELD_META
-    return meta_source.get(field)
+    meta = meta_source.get(field)
+    if meta is None and infer:
+        meta = infer_field_meta(field)
+    return meta
+
+
+def benchmark(rounds: int = 20, lookups: int = 100000) -> dict:
+    """Cost of loading + compiling the bundled database (ms) and of one get_field_meta() call (ns)."""
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        compile_field_db(load_field_db(BUNDLED_DB_PATH))
+    load_ms = (time.perf_counter() - t0) * 1000.0 / rounds
+
+    sample = list(FIELD_META)[:50] + ["temperature_9_C", "unknown_field"]
+    done = 0
+    t0 = time.perf_counter()
+    while done < lookups:
+        for field in sample:
+            get_field_meta(field, "Neptune-R900")
+        done += len(sample)
+    lookup_ns = (time.perf_counter() - t0) * 1e9 / done
+    return {"load_ms": round(load_ms, 3), "lookup_ns": round(lookup_ns, 1)}
+
+
+def main(argv=None) -> int:
+    """Validate field metadata databases; exit status 1 if any is invalid."""
+    args = list(sys.argv[1:] if argv is None else argv)
+    bench = "--bench" in args
+    paths = [a for a in args if a != "--bench"] or [BUNDLED_DB_PATH]
+    status = 0
+    for path in paths:
+        try:
+            doc = load_field_db(path)
+        except (OSError, ValueError) as e:
+            print(f"INVALID {e}")
+            status = 1
+            continue
+        count = sum(len(group["entries"]) for group in doc.get("fields", []))
+        print(f"OK {path}: {count} fields, {len(doc.get('models', {}))} model overrides")
+    if bench:
+        result = benchmark()
+        print(f"load+compile: {result['load_ms']} ms, get_field_meta: {result['lookup_ns']} ns/call")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+# field_projection.py
+"""
+FILE: field_projection.py
+DESCRIPTION:
+  Per-model / per-device field selection (device_fields).
+  - Each entry is "<device pattern>: <field>, <field>, -<field>, ...". The
+    device pattern is matched like device_blacklist (model or id, glob,
+    case-insensitive). Plain fields form an allowlist, "-field" a denylist;
+    field names may be globs too.
+  - rtl_loop drops unwanted keys before flatten(), so they never reach
+    DataProcessor, discovery or MQTT.
+  - Rules are compiled once; the merged rule per (model, id) and each field
+    decision are cached.
+"""
+from __future__ import annotations
+
+import fnmatch
+import re
+from typing import Iterable, Optional
+
+import config
+
+# Raw rtl_433 keys that are published under another field name.
+FIELD_ALIASES = {
+    "temperature_C": "temperature",
+    "temp_C": "temperature",
+    "temperature_F": "temperature",
+    "temp_F": "temperature",
+}
+
+# Cap for the per-device rule cache (cleared when exceeded).
+MAX_CACHED_DEVICES = 4096
+
+
+def _compile(patterns: list[str]) -> Optional[re.Pattern]:
+    if not patterns:
+        return None
+    return re.compile("|".join(fnmatch.translate(p) for p in patterns), re.IGNORECASE)
+
+
+class FieldRule:
+    """Field decision for one device (allowlist and/or denylist)."""
+
+    __slots__ = ("allow", "deny", "_cache")
+
+    def __init__(self, allow: Optional[re.Pattern], deny: Optional[re.Pattern]) -> None:
+        self.allow = allow
+        self.deny = deny
+        self._cache: dict[str, bool] = {}
+
+    def keeps(self, field: str) -> bool:
+        hit = self._cache.get(field)
+        if hit is None:
+            hit = (self.allow is None or self.allow.match(field) is not None) and not (
+                self.deny is not None and self.deny.match(field)
+            )
+            self._cache[field] = hit
+        return hit
+
+    def keeps_key(self, key: str) -> bool:
+        """Raw rtl_433 key: kept if it or the field it is published as is kept."""
+        alias = FIELD_ALIASES.get(key)
+        return self.keeps(key) or (alias is not None and self.keeps(alias))
+
+
+class FieldProjection:
+    """Compiled device_fields entries."""
+
+    def __init__(self, entries: Iterable[object]) -> None:
+        self.rules: list[tuple[re.Pattern, list[str], list[str]]] = []
+        for entry in entries or ():
+            device, sep, fields = str(entry).partition(":")
+            device = device.strip()
+            if not sep or not device:
+                print(f"[CONFIG] Ignoring device_fields entry {entry!r} (expected '<device>: <fields>').")
+                continue
+            allow, deny = [], []
+            for f in fields.split(","):
+                f = f.strip()
+                if f.startswith("-") and f[1:].strip():
+                    deny.append(f[1:].strip())
+                elif f:
+                    allow.append(f)
+            self.rules.append((re.compile(fnmatch.translate(device), re.IGNORECASE), allow, deny))
+        self._by_device: dict[tuple[str, str], Optional[FieldRule]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.rules)
+
+    def rule_for(self, model: str, clean_id: str) -> Optional[FieldRule]:
+        """Merged rule of every entry matching the device, or None when all fields are kept."""
+        key = (str(model), str(clean_id))
+        try:
+            return self._by_device[key]
+        except KeyError:
+            pass
+        allow, deny = [], []
+        for device, a, d in self.rules:
+            if device.match(key[0]) or device.match(key[1]):
+                allow.extend(a)
+                deny.extend(d)
+        rule = FieldRule(_compile(allow), _compile(deny)) if (allow or deny) else None
+        if len(self._by_device) >= MAX_CACHED_DEVICES:
+            self._by_device.clear()
+        self._by_device[key] = rule
+        return rule
+
+
+# Module-level singleton instance (rebuilt when device_fields changes)
+_projection: Optional[FieldProjection] = None
+_projection_key: Optional[tuple] = None
+
+
+def get_field_projection() -> FieldProjection:
+    """Get the shared projection for the current DEVICE_FIELDS."""
+    global _projection, _projection_key
+    key = tuple(str(e) for e in getattr(config, "DEVICE_FIELDS", None) or ())
+    if _projection is None or key != _projection_key:
+        _projection = FieldProjection(key)
+        _projection_key = key
+    return _projection
@@ -0,0 +1,167 @@
+# hop_scheduler.py
+"""
+FILE: hop_scheduler.py
+DESCRIPTION:
+  Adaptive dwell planning for hopping radios (multi-frequency 'freq').
+  - record(): attributes each decoded packet to the nearest configured frequency
+    using rtl_433's 'freq' metadata (MHz, from -M level).
+  - maybe_replan(): re-weights the hop list so productive frequencies are repeated
+    in the -f list (rtl_433 hops through -f entries in order with a fixed -H dwell).
+    Every frequency keeps at least one slot so quiet bands are still sampled.
+  - A new plan is only adopted when the expected packet yield improves by at
+    least rtl_hop_adaptive_min_gain, since applying it restarts rtl_433.
+"""
+from __future__ import annotations
+
+import re
+import time
+from typing import Optional
+
+import config
+
+# rtl_433 accepts at most 32 -f entries.
+MAX_HOP_SLOTS = 32
+
+# Seconds between plan evaluations once the replan interval has passed.
+CHECK_INTERVAL = 60.0
+
+# A packet further than this from every configured frequency is not attributed.
+MATCH_TOLERANCE_MHZ = 1.5
+
+_FREQ_RE = re.compile(r"^\s*([0-9]*\.?[0-9]+)\s*([kKmMgG]?)\s*$")
+_FREQ_SCALE = {"": 1.0, "k": 1e3, "m": 1e6, "g": 1e9}
+
+
+def parse_freq_mhz(value) -> Optional[float]:
+    """Parse an rtl_433 style frequency ('433.92M', '915000000', '1.2G') into MHz."""
+    m = _FREQ_RE.match(str(value or ""))
+    if not m:
+        return None
+    hz = float(m.group(1)) * _FREQ_SCALE[m.group(2).lower()]
+    return hz / 1e6
+
+
+def allocate_slots(rates: list[float], total_slots: int) -> list[int]:
+    """Split total_slots proportionally to rates (largest remainder), at least 1 each."""
+    n = len(rates)
+    total_slots = max(n, int(total_slots))
+    spare = total_slots - n
+    rate_sum = sum(rates)
+    if spare <= 0 or rate_sum <= 0:
+        return [1] * n
+
+    shares = [spare * r / rate_sum for r in rates]
+    slots = [1 + int(s) for s in shares]
+    leftover = total_slots - sum(slots)
+    order = sorted(range(n), key=lambda i: (shares[i] - int(shares[i]), rates[i]), reverse=True)
+    for i in order[:leftover]:
+        slots[i] += 1
+    return slots
+
+
+def interleave(weights: list[int]) -> list[int]:
+    """Smooth weighted round-robin: spread repeated slots across the hop cycle."""
+    total = sum(weights)
+    current = [0] * len(weights)
+    out: list[int] = []
+    for _ in range(total):
+        for i, w in enumerate(weights):
+            current[i] += w
+        best = max(range(len(weights)), key=lambda i: current[i])
+        current[best] -= total
+        out.append(best)
+    return out
+
+
+class HopScheduler:
+    """Per-radio yield tracker and hop-list planner."""
+
+    def __init__(self, frequencies: list[str], radio_name: str = "Unknown", *, clock=time.time) -> None:
+        self.radio_name = radio_name
+        self.frequencies = list(frequencies)
+        self._mhz = [parse_freq_mhz(f) for f in self.frequencies]
+        self._clock = clock
+        self.weights = [1] * len(self.frequencies)
+        self.counts = [0] * len(self.frequencies)
+        self.unmatched = 0
+        self.last_plan = clock()
+        self._last_check = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return len(self.frequencies) > 1 and all(m is not None for m in self._mhz)
+
+    def freq_arg(self) -> str:
+        """Comma-separated -f list for the current plan."""
+        return ",".join(self.frequencies[i] for i in interleave(self.weights))
+
+    def record(self, freq_mhz) -> None:
+        """Attribute one decoded packet to the nearest configured frequency."""
+        try:
+            f = float(freq_mhz)
+        except (TypeError, ValueError):
+            return
+        best, best_d = None, MATCH_TOLERANCE_MHZ
+        for i, m in enumerate(self._mhz):
+            if m is None:
+                continue
+            d = abs(f - m)
+            if d <= best_d:
+                best, best_d = i, d
+        if best is None:
+            self.unmatched += 1
+            return
+        self.counts[best] += 1
+
+    def _rates(self) -> list[float]:
+        # Packets per slot: a frequency with more slots had more listening time.
+        return [c / w for c, w in zip(self.counts, self.weights)]
+
+    @staticmethod
+    def _expected_yield(rates: list[float], weights: list[int]) -> float:
+        total = sum(weights)
+        return sum(r * w for r, w in zip(rates, weights)) / total if total else 0.0
+
+    def propose(self) -> tuple[Optional[list[int]], float]:
+        """Return (new_weights, expected_gain); weights is None when not worth a restart."""
+        if not self.enabled:
+            return None, 0.0
+        min_packets = int(getattr(config, "RTL_HOP_ADAPTIVE_MIN_PACKETS", 50) or 0)
+        if sum(self.counts) < max(1, min_packets):
+            return None, 0.0
+
+        max_slots = int(getattr(config, "RTL_HOP_ADAPTIVE_MAX_SLOTS", 12) or 0)
+        max_slots = min(MAX_HOP_SLOTS, max(len(self.frequencies), max_slots))
+        rates = self._rates()
+        new = allocate_slots(rates, max_slots)
+        if new == self.weights:
+            return None, 0.0
+
+        current = self._expected_yield(rates, self.weights)
+        proposed = self._expected_yield(rates, new)
+        gain = (proposed / current - 1.0) if current > 0 else 0.0
+        min_gain = float(getattr(config, "RTL_HOP_ADAPTIVE_MIN_GAIN", 0.25) or 0.0)
+        if gain < min_gain:
+            return None, gain
+        return new, gain
+
+    def maybe_replan(self) -> bool:
+        """Adopt a better plan if one is due; True means rtl_433 should be restarted."""
+        interval = float(getattr(config, "RTL_HOP_ADAPTIVE_INTERVAL", 3600) or 0)
+        now = self._clock()
+        if (now - self.last_plan) < interval or (now - self._last_check) < CHECK_INTERVAL:
+            return False
+        if sum(self.counts) < int(getattr(config, "RTL_HOP_ADAPTIVE_MIN_PACKETS", 50) or 0):
+            return False
+        self._last_check = now
+        new, gain = self.propose()
+        if new is None:
+            return False
+
+        summary = ", ".join(f"{f}x{w}" for f, w in zip(self.frequencies, new))
+        print(f"[RTL] Hop plan for {self.radio_name}: {summary} (expected +{gain * 100:.0f}% packets)")
+        self.weights = new
+        self.counts = [0] * len(self.frequencies)
+        self.unmatched = 0
+        self.last_plan = now
+        return True
@@ -134,6 +134,8 @@ from utils import (
 from system_monitor import system_stats_loop
 from data_processor import DataProcessor
 from rtl_manager import rtl_loop, discover_rtl_devices
+from radio_manager import RadioManager
+from metrics import start_metrics_server
 
 def get_version():
     """Return display version for logs/device info.
@@ -175,26 +177,9 @@ def show_logo(version):
     sys.stdout.write(f"\n{c_cyan}>>> RTL-SDR Bridge for Home Assistant ({c_reset}{c_yellow}{version}{c_reset}{c_cyan}) <<<{c_reset}\n\n\n")
     sys.stdout.flush()
 
-def main():
-    check_dependencies()
-    ver = get_version()
-    show_logo(ver)
-    time.sleep(3)
-
-    mqtt_handler = HomeNodeMQTT(version=ver)
-    mqtt_handler.start()
-
-    processor = DataProcessor(mqtt_handler)
-    threading.Thread(target=processor.start_throttle_loop, daemon=True).start()
-
-    sys_id = get_system_mac().replace(":", "").lower() 
-    sys_model = config.BRIDGE_NAME
-    
-    print("[STARTUP] Scanning USB bus for RTL-SDR devices...")
-    detected_devices = discover_rtl_devices()
-    
-    # If multiple dongles share the same USB serial (e.g., '00000001'), append index
-    # (e.g., '00000001-1') so they don't overwrite each other in the hardware map.
+def _dedupe_usb_serials(detected_devices: list[dict]) -> list[dict]:
+    """If multiple dongles share the same USB serial (e.g., '00000001'), append index
+    (e.g., '00000001-1') so they don't overwrite each other in the hardware map."""
     _seen_usb = {}
     for d in detected_devices:
         # Preserve the raw dongle-reported serial separately
@@ -212,7 +197,347 @@ def main():
             d["id"] = usb
 
         _seen_usb[usb] = True
+    return detected_devices
+
+
+def _plan_primary_radio(detected_devices: list[dict]) -> dict:
+    """Unconfigured single-radio plan: the first dongle on the default frequency."""
+    dev = detected_devices[0]
+
+    # 1. SMART DEFAULT LOGIC
+    def_freqs = config.RTL_DEFAULT_FREQ.split(",")
+    def_hop = config.RTL_DEFAULT_HOP_INTERVAL
+    if len(def_freqs) < 2:
+        def_hop = 0
+
+    radio_setup = {
+        "slot": 0,
+        "hop_interval": def_hop,
+        "rate": config.RTL_DEFAULT_RATE,
+        "freq": config.RTL_DEFAULT_FREQ
+    }
+
+    radio_setup.update(dev)
+    return radio_setup
+
+
+def _plan_fallback_radio() -> dict:
+    """No hardware detected and no rtl_config: try device '0' on the default frequency."""
+    # 1. SMART DEFAULT LOGIC
+    def_freqs = config.RTL_DEFAULT_FREQ.split(",")
+    def_hop = config.RTL_DEFAULT_HOP_INTERVAL
+
+    # If only 1 frequency is set, disable hopping to prevent the warning
+    if len(def_freqs) < 2:
+        def_hop = 0
+
+    return {
+        "slot": 0,
+        "name": "RTL_auto", "id": "0",
+        "freq": config.RTL_DEFAULT_FREQ,
+        "hop_interval": def_hop,
+        "rate": config.RTL_DEFAULT_RATE
+    }
+
+
+def _warn_radio_config(radio: dict, label: str = "CONFIG WARNING", name=None) -> None:
+    """Print validate_radio_config() warnings for a planned radio."""
+    r_name = name or radio.get("name", "Unknown")
+    for w in validate_radio_config(radio):
+        print(f"[STARTUP] {label}: [Radio: {r_name}] {w}")
+
+
+def _unique_config_radios(rtl_config: list[dict]) -> list[dict]:
+    """Manual rtl_config radios with their slot set; a repeated id is reported and skipped."""
+    radios = []
+    seen_config_ids = set()
+    for slot, radio in enumerate(rtl_config):
+        radio.setdefault("slot", slot)  # fallback when 'id' is missing
+
+        r_name = radio.get("name", "Unknown")
+        _warn_radio_config(radio)
+
+        target_id = str(radio.get("id") or "").strip()
+        if target_id and target_id in seen_config_ids:
+            print(f"[STARTUP] CONFIG ERROR: [Radio: {r_name}] Duplicate ID '{target_id}' found in settings. Skipping this radio to prevent conflicts.")
+            continue
+        if target_id:
+            seen_config_ids.add(target_id)
+        radios.append(radio)
+    return radios
+
+
+def _plan_hotplug_radios(detected_devices: list[dict]) -> list[dict]:
+    """Radios to run for the currently attached dongles (hotplug RadioManager planner).
+
+    Manual rtl_config: USB radios run only while their serial is attached; radios
+    without an id, rtl_tcp radios and explicit `device` selectors always run.
+    Auto mode: the same plan as at startup (multi-radio or primary only); no
+    radio runs until a dongle is detected. Radios get the same config warnings
+    as at startup.
+    """
+    rtl_config = getattr(config, "RTL_CONFIG", None)
+    if rtl_config:
+        serial_to_index = {
+            str(d["id"]): d["index"] for d in detected_devices if "id" in d and "index" in d
+        }
+        radios = []
+        for radio in _unique_config_radios(rtl_config):
+            r = dict(radio)
+            target_id = str(r.get("id") or "").strip()
+            if target_id in serial_to_index:
+                r["index"] = serial_to_index[target_id]
+            elif target_id and not (r.get("tcp_host") or r.get("device")):
+                # Waiting for this dongle to be plugged in.
+                continue
+            radios.append(r)
+        return radios
+
+    if not detected_devices:
+        # Wait for a dongle instead of restarting a default radio that cannot open.
+        return []
+    if getattr(config, "RTL_AUTO_MULTI", False) and len(detected_devices) > 1:
+        radios = _plan_auto_multi_radios(detected_devices)
+    else:
+        radios = [_plan_primary_radio(detected_devices)]
+    for r in radios:
+        _warn_radio_config(r, "DEFAULT CONFIG WARNING", r.get("name", "Auto"))
+    return radios
+
+
+def _plan_auto_multi_radios(detected_devices: list[dict]) -> list[dict]:
+    """Auto Multi-Radio plan (rtl_config empty, 2+ dongles): Primary / Secondary / Hopper radios."""
+    max_radios_cfg = getattr(config, "RTL_AUTO_MAX_RADIOS", 0)
+    try:
+        max_radios_cfg = int(max_radios_cfg)
+    except Exception:
+        max_radios_cfg = 0
+
+    # rtl_auto_max_radios:
+    #   0 -> use detected count (bounded by RTL_AUTO_HARD_CAP)
+    #  >0 -> start that many (bounded by available dongles)
+    if max_radios_cfg <= 0:
+        hard_cap = getattr(config, "RTL_AUTO_HARD_CAP", 3)
+        try:
+            hard_cap = int(hard_cap)
+        except Exception:
+            hard_cap = 3
+        if hard_cap < 1:
+            hard_cap = 1
+        max_radios = min(len(detected_devices), hard_cap)
+    else:
+        max_radios = min(max_radios_cfg, len(detected_devices))
 
+    if max_radios_cfg <= 0:
+        try:
+            hard_cap_disp = int(getattr(config, "RTL_AUTO_HARD_CAP", 3) or 3)
+        except Exception:
+            hard_cap_disp = 3
+        print(
+            f"[STARTUP]: Auto Multi-Radio: rtl_auto_max_radios=0 -> starting {max_radios} radio(s) (cap={hard_cap_disp})."
+        )
+    else:
+        print(
+            f"[STARTUP]: Auto Multi-Radio: rtl_auto_max_radios={max_radios_cfg} -> starting {max_radios} radio(s)."
+        )
+
+
+    country = get_homeassistant_country_code()
+    plan = getattr(config, "RTL_AUTO_BAND_PLAN", "auto")
+    sec_override = str(getattr(config, "RTL_AUTO_SECONDARY_FREQ", "") or "").strip()
+    sec_freq, sec_hop = choose_secondary_band_defaults(
+        plan=plan,
+        country_code=country,
+        secondary_override=sec_override,
+    )
+
+    # PRIMARY uses RTL_DEFAULT_FREQ; SECONDARY uses region-aware defaults.
+    print("[STARTUP] Unconfigured Mode: Auto Multi-Radio enabled.")
+    if country:
+        print(f"[STARTUP] Auto Multi-Radio: HA country={country}, band_plan={plan} -> secondary={sec_freq}")
+    else:
+        print(f"[STARTUP] Auto Multi-Radio: HA country=unknown, band_plan={plan} -> secondary={sec_freq}")
+
+    radios = []
+
+    # --- Radio #1 (Primary) ---
+    dev1 = detected_devices[0]
+    name1 = dev1.get("name", "Primary")
+
+    def_freqs = str(config.RTL_DEFAULT_FREQ).split(",")
+    def_hop = int(getattr(config, "RTL_DEFAULT_HOP_INTERVAL", 0) or 0)
+    if len(def_freqs) < 2:
+        def_hop = 0
+    elif def_hop <= 0:
+        def_hop = 60
+
+    radio1 = {
+        "slot": 0,
+        "hop_interval": def_hop,
+        "rate": getattr(config, "RTL_AUTO_PRIMARY_RATE", config.RTL_DEFAULT_RATE),
+        "freq": config.RTL_DEFAULT_FREQ,
+    }
+    radio1.update(dev1)
+    rid1 = str(radio1.get("id") or "").strip() or "unknown"
+    radio1["name"] = f"{name1} (Auto 1, ID {rid1})"
+    radios.append(radio1)
+
+    # --- Radio #2 (Secondary) ---
+    if max_radios >= 2:
+        dev2 = detected_devices[1]
+        name2 = dev2.get("name", "Secondary")
+
+        sec_list = [s.strip() for s in str(sec_freq).split(",") if s.strip()]
+
+        # If we have 3+ radios available and the plan contains multiple freqs,
+        # split them across Radio #2 and #3 to avoid hopping.
+        freq2 = sec_freq
+        hop2 = 0
+        freq3 = None
+
+        if max_radios >= 3 and len(detected_devices) >= 3 and len(sec_list) >= 2:
+            freq2 = sec_list[0]
+            freq3 = sec_list[1]
+            hop2 = 0
+        else:
+            if len(sec_list) >= 2:
+                hop2 = int(sec_hop or 0)
+                if hop2 <= 0:
+                    hop2 = 15
+
+        radio2 = {
+            "slot": 1,
+            "hop_interval": hop2,
+            "rate": getattr(config, "RTL_AUTO_SECONDARY_RATE", "1024k"),
+            "freq": freq2,
+        }
+        radio2.update(dev2)
+        rid2 = str(radio2.get("id") or "").strip() or "unknown"
+        radio2["name"] = f"{name2} (Auto 2, ID {rid2})"
+        radios.append(radio2)
+
+        # --- Radio #3 (Tertiary) ---
+        if max_radios >= 3 and len(detected_devices) >= 3:
+            dev3 = detected_devices[2]
+            name3 = dev3.get("name", "Tertiary")
+
+            # If Radio #3 wasn't already assigned by splitting a multi-freq secondary plan,
+            # use it as a regional "hopper" (when we know the region). This is intentionally
+            # opportunistic and may miss bursts while tuned elsewhere.
+            if not freq3:
+                hopper_override = str(getattr(config, "RTL_AUTO_HOPPER_FREQS", "") or "").strip()
+                hopper_hop = int(getattr(config, "RTL_AUTO_HOPPER_HOP_INTERVAL", 20) or 20)
+                hopper_rate = getattr(config, "RTL_AUTO_HOPPER_RATE", getattr(config, "RTL_AUTO_SECONDARY_RATE", "1024k"))
+
+                # Only auto-derive hopper freqs if we actually know the country.
+                if hopper_override:
+                    hopper_freq = hopper_override
+                elif country:
+                    # Derive a regional hopper plan that does NOT overlap with the
+                    # primary/secondary radios.
+                    used = {
+                        s.strip().lower()
+                        for s in str(radio1.get("freq", "")).split(",")
+                        if s.strip()
+                    }
+                    used.update({s.strip().lower() for s in str(freq2).split(",") if s.strip()})
+                    hopper_freq = choose_hopper_band_defaults(country_code=country, used_freqs=used)
+                else:
+                    hopper_freq = None
+
+                # If we don't have a hopper plan (unknown country and no override),
+                # fall back to the "other" band to maximize coverage.
+                if not hopper_freq:
+                    f2 = str(freq2).strip().lower()
+                    if f2.startswith("868"):
+                        hopper_freq = "915M"
+                    elif f2.startswith("915"):
+                        hopper_freq = "868M"
+                    else:
+                        hopper_freq = "915M"
+                    hopper_hop = 0
+                    hopper_rate = getattr(config, "RTL_AUTO_SECONDARY_RATE", "1024k")
+
+                # If only one frequency remains, disable hopping.
+                hopper_list = [s.strip() for s in str(hopper_freq).split(",") if s.strip()]
+
+                # Avoid hopping onto a band we already cover with Radio #1/#2.
+                used_freqs = {
+                    s.strip().lower() for s in str(radio1.get("freq", "")).split(",") if s.strip()
+                }
+                used_freqs.update(
+                    {s.strip().lower() for s in str(freq2).split(",") if s.strip()}
+                )
+                filtered = [f for f in hopper_list if f.strip().lower() not in used_freqs]
+                hopper_list = filtered
+
+                # If nothing remains after filtering, we refuse to overlap.
+                if not hopper_list:
+                    print(
+                        "[STARTUP] Auto Multi-Radio: Radio #3 hopper has no non-overlapping bands remaining; skipping Radio #3. "
+                        "(Override rtl_auto_hopper_freqs or adjust band plan.)"
+                    )
+                    freq3 = None
+                    hop3 = 0
+                    rate3 = hopper_rate
+                    # Skip creating Radio #3 entirely.
+                    dev3 = None
+
+                if len(hopper_list) < 2:
+                    hopper_hop = 0
+                else:
+                    # Don't hop too aggressively; make the cycle predictable.
+                    if hopper_hop < 5:
+                        hopper_hop = 5
+
+                freq3 = ",".join(hopper_list)
+                hop3 = hopper_hop
+                rate3 = hopper_rate
+            else:
+                hop3 = 0
+                rate3 = getattr(config, "RTL_AUTO_SECONDARY_RATE", "1024k")
+
+            if not dev3 or not freq3:
+                # Nothing to start for Radio #3.
+                pass
+            else:
+                radio3 = {
+                    "slot": 2,
+                    "hop_interval": hop3,
+                    "rate": rate3,
+                    "freq": freq3,
+                }
+                radio3.update(dev3)
+                rid3 = str(radio3.get("id") or "").strip() or "unknown"
+                radio3["name"] = f"{name3} (Auto 3, ID {rid3})"
+                radios.append(radio3)
+
+    return radios
+
+
+def main():
+    check_dependencies()
+    ver = get_version()
+    show_logo(ver)
+    time.sleep(3)
+
+    mqtt_handler = HomeNodeMQTT(version=ver)
+    mqtt_handler.start()
+
+    processor = DataProcessor(mqtt_handler)
+    threading.Thread(target=processor.start_throttle_loop, daemon=True).start()
+
+    metrics_port = int(getattr(config, "METRICS_PORT", 0) or 0)
+    if metrics_port > 0:
+        start_metrics_server(metrics_port, getattr(config, "METRICS_BIND", "0.0.0.0"))
+
+    sys_id = get_system_mac().replace(":", "").lower() 
+    sys_model = config.BRIDGE_NAME
+    
+    print("[STARTUP] Scanning USB bus for RTL-SDR devices...")
+    detected_devices = discover_rtl_devices()
+    
+    _dedupe_usb_serials(detected_devices)
 
     for d in detected_devices:
         print(
@@ -246,31 +571,27 @@ def main():
 
     rtl_config = getattr(config, "RTL_CONFIG", None)
 
-    if rtl_config:
+    if getattr(config, "RTL_HOTPLUG", False):
+        # --- HOTPLUG MODE: radios follow the attached dongles ---
+        print("[STARTUP] Hotplug mode: radios start/stop as RTL-SDR dongles are plugged in or removed.")
+        manager = RadioManager(
+            planner=_plan_hotplug_radios,
+            discover=lambda: _dedupe_usb_serials(discover_rtl_devices()),
+            run_radio=lambda radio, stop_event: rtl_loop(
+                radio, mqtt_handler, processor, sys_id, sys_model, stop_event=stop_event
+            ),
+        )
+        manager.start(detected_devices)
+
+    elif rtl_config:
         # --- A. MANUAL CONFIGURATION MODE ---
         print(f"[STARTUP] Loading {len(rtl_config)} radios from manual config.")
         configured_ids = set()
-        seen_config_ids = set()
-
-        for slot, radio in enumerate(rtl_config):
-            radio.setdefault("slot", slot)  # fallback when 'id' is missing
 
+        for radio in _unique_config_radios(rtl_config):
             r_name = radio.get("name", "Unknown")
-            
-            warns = validate_radio_config(radio)
-            for w in warns:
-                print(f"[STARTUP] CONFIG WARNING: [Radio: {r_name}] {w}")
+            target_id = str(radio.get("id") or "").strip()
 
-            target_id = radio.get("id") 
-            if target_id: target_id = str(target_id).strip()
-            
-            if target_id and target_id in seen_config_ids:
-                print(f"[STARTUP] CONFIG ERROR: [Radio: {r_name}] Duplicate ID '{target_id}' found in settings. Skipping this radio to prevent conflicts.")
-                continue 
-            
-            if target_id:
-                seen_config_ids.add(target_id)
-            
             if target_id and target_id in serial_to_index:
                 idx = serial_to_index[target_id]
                 radio['index'] = idx
@@ -300,216 +621,10 @@ def main():
 
             # Auto Multi-Radio: if a 2nd dongle is present, start a second rtl_433 instance automatically.
             if getattr(config, "RTL_AUTO_MULTI", False) and len(detected_devices) > 1:
-                max_radios_cfg = getattr(config, "RTL_AUTO_MAX_RADIOS", 0)
-                try:
-                    max_radios_cfg = int(max_radios_cfg)
-                except Exception:
-                    max_radios_cfg = 0
-
-                # rtl_auto_max_radios:
-                #   0 -> use detected count (bounded by RTL_AUTO_HARD_CAP)
-                #  >0 -> start that many (bounded by available dongles)
-                if max_radios_cfg <= 0:
-                    hard_cap = getattr(config, "RTL_AUTO_HARD_CAP", 3)
-                    try:
-                        hard_cap = int(hard_cap)
-                    except Exception:
-                        hard_cap = 3
-                    if hard_cap < 1:
-                        hard_cap = 1
-                    max_radios = min(len(detected_devices), hard_cap)
-                else:
-                    max_radios = min(max_radios_cfg, len(detected_devices))
-
-                if max_radios_cfg <= 0:
-                    try:
-                        hard_cap_disp = int(getattr(config, "RTL_AUTO_HARD_CAP", 3) or 3)
-                    except Exception:
-                        hard_cap_disp = 3
-                    print(
-                        f"[STARTUP]: Auto Multi-Radio: rtl_auto_max_radios=0 -> starting {max_radios} radio(s) (cap={hard_cap_disp})."
-                    )
-                else:
-                    print(
-                        f"[STARTUP]: Auto Multi-Radio: rtl_auto_max_radios={max_radios_cfg} -> starting {max_radios} radio(s)."
-                    )
-
-
-                country = get_homeassistant_country_code()
-                plan = getattr(config, "RTL_AUTO_BAND_PLAN", "auto")
-                sec_override = str(getattr(config, "RTL_AUTO_SECONDARY_FREQ", "") or "").strip()
-                sec_freq, sec_hop = choose_secondary_band_defaults(
-                    plan=plan,
-                    country_code=country,
-                    secondary_override=sec_override,
-                )
-
-                # PRIMARY uses RTL_DEFAULT_FREQ; SECONDARY uses region-aware defaults.
-                print("[STARTUP] Unconfigured Mode: Auto Multi-Radio enabled.")
-                if country:
-                    print(f"[STARTUP] Auto Multi-Radio: HA country={country}, band_plan={plan} -> secondary={sec_freq}")
-                else:
-                    print(f"[STARTUP] Auto Multi-Radio: HA country=unknown, band_plan={plan} -> secondary={sec_freq}")
-
-                radios = []
-
-                # --- Radio #1 (Primary) ---
-                dev1 = detected_devices[0]
-                name1 = dev1.get("name", "Primary")
-
-                def_freqs = str(config.RTL_DEFAULT_FREQ).split(",")
-                def_hop = int(getattr(config, "RTL_DEFAULT_HOP_INTERVAL", 0) or 0)
-                if len(def_freqs) < 2:
-                    def_hop = 0
-                elif def_hop <= 0:
-                    def_hop = 60
-
-                radio1 = {
-                    "slot": 0,
-                    "hop_interval": def_hop,
-                    "rate": getattr(config, "RTL_AUTO_PRIMARY_RATE", config.RTL_DEFAULT_RATE),
-                    "freq": config.RTL_DEFAULT_FREQ,
-                }
-                radio1.update(dev1)
-                rid1 = str(radio1.get("id") or "").strip() or "unknown"
-                radio1["name"] = f"{name1} (Auto 1, ID {rid1})"
-                radios.append(radio1)
-
-                # --- Radio #2 (Secondary) ---
-                if max_radios >= 2:
-                    dev2 = detected_devices[1]
-                    name2 = dev2.get("name", "Secondary")
-
-                    sec_list = [s.strip() for s in str(sec_freq).split(",") if s.strip()]
-
-                    # If we have 3+ radios available and the plan contains multiple freqs,
-                    # split them across Radio #2 and #3 to avoid hopping.
-                    freq2 = sec_freq
-                    hop2 = 0
-                    freq3 = None
-
-                    if max_radios >= 3 and len(detected_devices) >= 3 and len(sec_list) >= 2:
-                        freq2 = sec_list[0]
-                        freq3 = sec_list[1]
-                        hop2 = 0
-                    else:
-                        if len(sec_list) >= 2:
-                            hop2 = int(sec_hop or 0)
-                            if hop2 <= 0:
-                                hop2 = 15
-
-                    radio2 = {
-                        "slot": 1,
-                        "hop_interval": hop2,
-                        "rate": getattr(config, "RTL_AUTO_SECONDARY_RATE", "1024k"),
-                        "freq": freq2,
-                    }
-                    radio2.update(dev2)
-                    rid2 = str(radio2.get("id") or "").strip() or "unknown"
-                    radio2["name"] = f"{name2} (Auto 2, ID {rid2})"
-                    radios.append(radio2)
-
-                    # --- Radio #3 (Tertiary) ---
-                    if max_radios >= 3 and len(detected_devices) >= 3:
-                        dev3 = detected_devices[2]
-                        name3 = dev3.get("name", "Tertiary")
-
-                        # If Radio #3 wasn't already assigned by splitting a multi-freq secondary plan,
-                        # use it as a regional "hopper" (when we know the region). This is intentionally
-                        # opportunistic and may miss bursts while tuned elsewhere.
-                        if not freq3:
-                            hopper_override = str(getattr(config, "RTL_AUTO_HOPPER_FREQS", "") or "").strip()
-                            hopper_hop = int(getattr(config, "RTL_AUTO_HOPPER_HOP_INTERVAL", 20) or 20)
-                            hopper_rate = getattr(config, "RTL_AUTO_HOPPER_RATE", getattr(config, "RTL_AUTO_SECONDARY_RATE", "1024k"))
-
-                            # Only auto-derive hopper freqs if we actually know the country.
-                            if hopper_override:
-                                hopper_freq = hopper_override
-                            elif country:
-                                # Derive a regional hopper plan that does NOT overlap with the
-                                # primary/secondary radios.
-                                used = {
-                                    s.strip().lower()
-                                    for s in str(radio1.get("freq", "")).split(",")
-                                    if s.strip()
-                                }
-                                used.update({s.strip().lower() for s in str(freq2).split(",") if s.strip()})
-                                hopper_freq = choose_hopper_band_defaults(country_code=country, used_freqs=used)
-                            else:
-                                hopper_freq = None
-
-                            # If we don't have a hopper plan (unknown country and no override),
-                            # fall back to the "other" band to maximize coverage.
-                            if not hopper_freq:
-                                f2 = str(freq2).strip().lower()
-                                if f2.startswith("868"):
-                                    hopper_freq = "915M"
-                                elif f2.startswith("915"):
-                                    hopper_freq = "868M"
-                                else:
-                                    hopper_freq = "915M"
-                                hopper_hop = 0
-                                hopper_rate = getattr(config, "RTL_AUTO_SECONDARY_RATE", "1024k")
-
-                            # If only one frequency remains, disable hopping.
-                            hopper_list = [s.strip() for s in str(hopper_freq).split(",") if s.strip()]
-
-                            # Avoid hopping onto a band we already cover with Radio #1/#2.
-                            used_freqs = {
-                                s.strip().lower() for s in str(radio1.get("freq", "")).split(",") if s.strip()
-                            }
-                            used_freqs.update(
-                                {s.strip().lower() for s in str(freq2).split(",") if s.strip()}
-                            )
-                            filtered = [f for f in hopper_list if f.strip().lower() not in used_freqs]
-                            hopper_list = filtered
-
-                            # If nothing remains after filtering, we refuse to overlap.
-                            if not hopper_list:
-                                print(
-                                    "[STARTUP] Auto Multi-Radio: Radio #3 hopper has no non-overlapping bands remaining; skipping Radio #3. "
-                                    "(Override rtl_auto_hopper_freqs or adjust band plan.)"
-                                )
-                                freq3 = None
-                                hop3 = 0
-                                rate3 = hopper_rate
-                                # Skip creating Radio #3 entirely.
-                                dev3 = None
-
-                            if len(hopper_list) < 2:
-                                hopper_hop = 0
-                            else:
-                                # Don't hop too aggressively; make the cycle predictable.
-                                if hopper_hop < 5:
-                                    hopper_hop = 5
-
-                            freq3 = ",".join(hopper_list)
-                            hop3 = hopper_hop
-                            rate3 = hopper_rate
-                        else:
-                            hop3 = 0
-                            rate3 = getattr(config, "RTL_AUTO_SECONDARY_RATE", "1024k")
-
-                        if not dev3 or not freq3:
-                            # Nothing to start for Radio #3.
-                            pass
-                        else:
-                            radio3 = {
-                                "slot": 2,
-                                "hop_interval": hop3,
-                                "rate": rate3,
-                                "freq": freq3,
-                            }
-                            radio3.update(dev3)
-                            rid3 = str(radio3.get("id") or "").strip() or "unknown"
-                            radio3["name"] = f"{name3} (Auto 3, ID {rid3})"
-                            radios.append(radio3)
+                radios = _plan_auto_multi_radios(detected_devices)
 
                 for r in radios:
-                    dev_name = r.get("name", "Auto")
-                    warns = validate_radio_config(r)
-                    for w in warns:
-                        print(f"[STARTUP] DEFAULT CONFIG WARNING: [Radio: {dev_name}] {w}")
+                    _warn_radio_config(r, "DEFAULT CONFIG WARNING", r.get("name", "Auto"))
 
                     slot = int(r.get("slot", 0) or 0)
                     role = {0: "Primary", 1: "Secondary", 2: "Hopper"}.get(slot, "Radio")
@@ -540,24 +655,8 @@ def main():
                 dev = detected_devices[0]
                 dev_name = dev.get("name", "Primary")
 
-                # 1. SMART DEFAULT LOGIC
-                def_freqs = config.RTL_DEFAULT_FREQ.split(",")
-                def_hop = config.RTL_DEFAULT_HOP_INTERVAL
-                if len(def_freqs) < 2:
-                    def_hop = 0
-
-                radio_setup = {
-                    "slot": 0,
-                    "hop_interval": def_hop,
-                    "rate": config.RTL_DEFAULT_RATE,
-                    "freq": config.RTL_DEFAULT_FREQ
-                }
-
-                radio_setup.update(dev)
-
-                warns = validate_radio_config(radio_setup)
-                for w in warns:
-                    print(f"[STARTUP] DEFAULT CONFIG WARNING: [Radio: {dev_name}] {w}")
+                radio_setup = _plan_primary_radio(detected_devices)
+                _warn_radio_config(radio_setup, "DEFAULT CONFIG WARNING", dev_name)
 
                 print(f"[STARTUP] Radio #1 ({dev['name']}) -> Defaulting to {radio_setup['freq']}")
 
@@ -573,26 +672,9 @@ def main():
         else:
             # --- UPDATED: Warning for Fallback Mode ---
             print("[STARTUP] WARNING: [System] No hardware detected and no configuration provided. Attempting to start default device '0' (this will likely fail).")
-            
-            # 1. SMART DEFAULT LOGIC
-            def_freqs = config.RTL_DEFAULT_FREQ.split(",")
-            def_hop = config.RTL_DEFAULT_HOP_INTERVAL
-            
-            # If only 1 frequency is set, disable hopping to prevent the warning
-            if len(def_freqs) < 2: 
-                def_hop = 0
-
-            auto_radio = {
-                "slot": 0,
-                "name": "RTL_auto", "id": "0",
-                "freq": config.RTL_DEFAULT_FREQ,             
-                "hop_interval": def_hop,   # <--- UPDATED: Use the calculated variable, not the config!
-                "rate": config.RTL_DEFAULT_RATE
-            }
-            
-            warns = validate_radio_config(auto_radio)
-            for w in warns:
-                print(f"[STARTUP] CONFIG WARNING: [Radio: RTL_auto] {w}")
+
+            auto_radio = _plan_fallback_radio()
+            _warn_radio_config(auto_radio)
 
             threading.Thread(
                 target=rtl_loop,
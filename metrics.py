@@ -0,0 +1,198 @@
+# metrics.py
+"""
+FILE: metrics.py
+DESCRIPTION:
+  Pipeline instrumentation and an optional OpenMetrics HTTP endpoint (metrics_port).
+  - inc() / observe() write to dicts owned by the calling thread, so the hot
+    path takes no lock; a scrape sums the per-thread shards.
+  - Gauges are callbacks evaluated at scrape time (throttle buffer size, SDR
+    health state, ...).
+  - METRICS lists every family with its type and help text; names are
+    exported with the "rtl_haos_" prefix (counters get "_total").
+  - start_metrics_server() serves GET /metrics from a daemon thread.
+"""
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional
+
+PREFIX = "rtl_haos_"
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# Latency buckets in seconds (upper bounds; +Inf is implicit).
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# family -> (type, help)
+METRICS = {
+    "rtl_lines": ("counter", "Lines read from rtl_433 output."),
+    "rtl_json_errors": ("counter", "Lines that were not valid JSON (rtl_433/librtlsdr log output)."),
+    "rtl_packets": ("counter", "Decoded rtl_433 packets."),
+    "rtl_packets_filtered": ("counter", "Packets dropped before dispatch, by reason."),
+    "dispatch_readings": ("counter", "Readings passed to the data processor."),
+    "throttle_buffer_readings": ("gauge", "Readings waiting in the throttle buffer."),
+    "mqtt_publishes": ("counter", "Messages handed to the MQTT client, by priority class."),
+    "mqtt_publish_latency_seconds": ("histogram", "Time from a publish request until the MQTT client accepted it."),
+    "sdr_health_problem": ("gauge", "1 while the SDR health alert is active."),
+    "sdr_radio_error": ("gauge", "1 while a radio reports an error."),
+    "sdr_radio_degradation_events": ("counter", "rtl_433 performance-degradation events per radio and kind."),
+}
+
+_local = threading.local()
+_shards_lock = threading.Lock()
+# One (counters, histograms) pair per thread that recorded something.
+_shards: list[tuple[dict, dict]] = []
+_gauges: dict[str, Callable[[], object]] = {}
+
+
+def _shard() -> tuple[dict, dict]:
+    try:
+        return _local.shard
+    except AttributeError:
+        shard = ({}, {})
+        with _shards_lock:
+            _shards.append(shard)
+        _local.shard = shard
+        return shard
+
+
+def _key(name: str, labels: dict) -> tuple:
+    return (name, tuple(sorted(labels.items())) if labels else ())
+
+
+def inc(name: str, n: float = 1, **labels) -> None:
+    """Add n to a counter (per-thread, lock-free)."""
+    counters = _shard()[0]
+    key = _key(name, labels)
+    counters[key] = counters.get(key, 0) + n
+
+
+def observe(name: str, value: float, **labels) -> None:
+    """Record one histogram sample (per-thread, lock-free)."""
+    hists = _shard()[1]
+    key = _key(name, labels)
+    h = hists.get(key)
+    if h is None:
+        # bucket counts (+Inf last), then sum
+        h = hists[key] = [0] * (len(LATENCY_BUCKETS) + 1) + [0.0]
+    h[bisect_left(LATENCY_BUCKETS, value)] += 1
+    h[-1] += value
+
+
+def register_collector(name: str, fn: Callable[[], object]) -> None:
+    """Scrape-time source of a gauge or counter family: returns a number, or a list of (labels dict, number)."""
+    _gauges[name] = fn
+
+
+def reset() -> None:
+    """Drop all recorded counter and histogram values (tests)."""
+    with _shards_lock:
+        for counters, hists in _shards:
+            counters.clear()
+            hists.clear()
+
+
+def snapshot() -> tuple[dict, dict]:
+    """Summed counters and histograms of all threads."""
+    with _shards_lock:
+        shards = list(_shards)
+    counters: dict[tuple, float] = {}
+    hists: dict[tuple, list] = {}
+    for c, h in shards:
+        # dict.copy() is atomic, so owners may keep writing while we read.
+        for key, v in c.copy().items():
+            counters[key] = counters.get(key, 0) + v
+        for key, buckets in h.copy().items():
+            acc = hists.setdefault(key, [0] * len(buckets[:-1]) + [0.0])
+            for i, v in enumerate(list(buckets)):
+                acc[i] += v
+    return counters, hists
+
+
+def _labels(pairs, extra: str = "") -> str:
+    parts = [f'{k}="{_escape(v)}"' for k, v in pairs]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt(v) -> str:
+    if isinstance(v, float) and v.is_integer():
+        return str(int(v))
+    return repr(v) if isinstance(v, float) else str(v)
+
+
+def _gauge_samples(fn) -> list:
+    try:
+        value = fn()
+    except Exception as e:
+        print(f"[METRICS] Gauge callback failed: {e}")
+        return []
+    if isinstance(value, (int, float)):
+        return [((), value)]
+    return [(tuple(sorted(labels.items())), v) for labels, v in value or ()]
+
+
+def render() -> str:
+    """OpenMetrics text exposition of everything recorded so far."""
+    counters, hists = snapshot()
+    lines = []
+    for name, (mtype, help_text) in METRICS.items():
+        family = PREFIX + name
+        if mtype == "histogram":
+            series = sorted((k[1], v) for k, v in hists.items() if k[0] == name)
+        elif name in _gauges:
+            series = sorted(_gauge_samples(_gauges[name]))
+        else:
+            series = sorted((k[1], v) for k, v in counters.items() if k[0] == name)
+        lines.append(f"# TYPE {family} {mtype}")
+        lines.append(f"# HELP {family} {help_text}")
+        for labels, value in series:
+            if mtype == "counter":
+                lines.append(f"{family}_total{_labels(labels)} {_fmt(value)}")
+            elif mtype == "gauge":
+                lines.append(f"{family}{_labels(labels)} {_fmt(value)}")
+            else:
+                cumulative = 0
+                for bound, n in zip(LATENCY_BUCKETS + (float("inf"),), value[:-1]):
+                    cumulative += n
+                    le = 'le="%s"' % ("+Inf" if bound == float("inf") else repr(bound))
+                    lines.append(f"{family}_bucket{_labels(labels, le)} {cumulative}")
+                lines.append(f"{family}_count{_labels(labels)} {cumulative}")
+                lines.append(f"{family}_sum{_labels(labels)} {_fmt(value[-1])}")
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):  # noqa: N802 (http.server API)
+        if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # noqa: A002 - keep scrapes out of the log
+        pass
+
+
+def start_metrics_server(port: int, host: str = "0.0.0.0") -> Optional[ThreadingHTTPServer]:
+    """Serve /metrics on host:port from a daemon thread (None if the port is unavailable)."""
+    try:
+        server = ThreadingHTTPServer((host, int(port)), _Handler)
+    except OSError as e:
+        print(f"[METRICS] Could not listen on {host}:{port}: {e}")
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    print(f"[METRICS] OpenMetrics endpoint on http://{host}:{server.server_address[1]}/metrics")
+    return server
@@ -0,0 +1,69 @@
+# model_prefilter.py
+"""
+FILE: model_prefilter.py
+DESCRIPTION:
+  Drops rtl_433 packets of blacklisted models before JSON decoding (rtl_model_prefilter).
+  - DEVICE_BLACKLIST patterns are compiled once into a single case-insensitive
+    regex (fnmatch.translate), the same matching rule is_blocked_device()
+    applies to the model after parsing.
+  - The raw line is only scanned for its "model" : "<name>" token; lines
+    without one, or with escaped characters in the name, take the normal path.
+  - Counts packets and bytes rejected this way for the bridge diagnostics.
+"""
+from __future__ import annotations
+
+import fnmatch
+import re
+import threading
+from typing import Iterable, Optional
+
+import config
+
+MODEL_TOKEN = re.compile(r'"model"\s*:\s*"([^"\\]*)"')
+
+
+class ModelPrefilter:
+    """Precompiled blacklist matcher for the raw rtl_433 JSON line."""
+
+    def __init__(self, patterns: Iterable[object]) -> None:
+        regexes = [fnmatch.translate(str(p)) for p in patterns or () if str(p)]
+        self._match = re.compile("|".join(regexes), re.IGNORECASE).match if regexes else None
+        self._lock = threading.Lock()
+        self.packets = 0
+        self.bytes = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._match is not None
+
+    def blocked(self, line: str) -> bool:
+        """True if the line is a packet of a blacklisted model (and count it)."""
+        if self._match is None:
+            return False
+        token = MODEL_TOKEN.search(line)
+        if token is None or not self._match(token.group(1)):
+            return False
+        with self._lock:
+            self.packets += 1
+            self.bytes += len(line)
+        return True
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"packets": self.packets, "bytes": self.bytes}
+
+
+# Module-level singleton instance (rebuilt when the blacklist changes)
+_prefilter: Optional[ModelPrefilter] = None
+_prefilter_key: Optional[tuple] = None
+
+
+def get_model_prefilter() -> ModelPrefilter:
+    """Get the shared prefilter for the current DEVICE_BLACKLIST."""
+    global _prefilter, _prefilter_key
+    patterns = getattr(config, "DEVICE_BLACKLIST", []) if getattr(config, "RTL_MODEL_PREFILTER", True) else []
+    key = tuple(str(p) for p in patterns or ())
+    if _prefilter is None or key != _prefilter_key:
+        _prefilter = ModelPrefilter(key)
+        _prefilter_key = key
+    return _prefilter
@@ -6,14 +6,21 @@ DESCRIPTION:
   - UPDATED: Removed legacy gas normalization. Now reports RAW meter values (ft3).
 """
 import json
+import re
 import threading
 import sys
 import time
+from collections import OrderedDict
 # MQTT client (optional during unit tests)
 try:
     import paho.mqtt.client as mqtt
     from paho.mqtt.enums import CallbackAPIVersion
+    from paho.mqtt.packettypes import PacketTypes
+    from paho.mqtt.properties import Properties
 except ModuleNotFoundError:  # pragma: no cover
+    PacketTypes = None
+    Properties = None
+
     class CallbackAPIVersion:  # minimal shim
         VERSION2 = 2
 
@@ -57,6 +64,33 @@ import config
 from utils import clean_mac, get_system_mac
 from field_meta import FIELD_META, get_field_meta
 from rtl_manager import trigger_radio_restart
+from rtl_log_classifier import DEGRADATION_KINDS
+from signal_quality import SIGNAL_FIELD_BASES
+import discovery_payload
+from mqtt_spool import MqttSpool
+from rate_limit import TokenBucket
+from resync import RANK_MAIN, RANK_OTHER, ResyncCache, replay
+from device_registry import DeviceRegistry
+from window_stats import get_window_stats
+import metrics
+from publish_scheduler import (
+    CLASS_DIAGNOSTIC,
+    CLASS_DISCOVERY,
+    CLASS_EVENT,
+    CLASS_STATE,
+    PublishScheduler,
+)
+
+# Seconds after connecting before logging the retained discovery size report.
+DISCOVERY_REPORT_DELAY = 120.0
+
+# Device discovery mode: seconds to collect retained per-entity configs from older
+# versions after connecting; only those are handed over with migrate_discovery.
+LEGACY_DISCOVERY_SCAN = 5.0
+DISCOVERY_CONFIG_FILTER = "homeassistant/+/+/config"
+
+# MQTT 5: device state topics are long and repeated on every packet -> topic aliases.
+ALIAS_TOPIC_PREFIX = "home/rtl_devices/"
 
 # --- Utility meter commodity inference (Itron ERT / rtlamr conventions) ---
 # We infer commodity from fields like 'ert_type' (ERT-SCM) and 'MeterType' (SCMplus/IDM).
@@ -159,10 +193,55 @@ BINARY_SENSOR_FIELDS = {
     "active": ("running", "Lightning Active", False),
 }
 
+# Host-level per-radio fields: "<base>_<radio suffix>" (e.g. radio_status_101).
+# Discovery uses FIELD_META[<base>] and appends the suffix to the friendly name.
+RADIO_FIELD_BASES = (
+    ("radio_status",) + tuple(base for base, _label in DEGRADATION_KINDS.values()) + SIGNAL_FIELD_BASES
+)
+
+
+def _discovery_object_id(value):
+    """MQTT discovery object ids may only contain [a-zA-Z0-9_-]."""
+    return re.sub(r"[^a-zA-Z0-9_-]", "_", str(value))
+
+
+def _mqtt_v5_enabled() -> bool:
+    return str(getattr(config, "MQTT_PROTOCOL", "3.1.1") or "3.1.1").strip().lower() in {"5", "5.0", "v5", "mqttv5"}
+
+
+def _expire_after_for(sensor_name):
+    """expire_after (seconds) for an entity, or None when it never expires."""
+    if "version" in sensor_name.lower() or _radio_field_base(sensor_name):
+        return None
+    # Battery status is often reported infrequently; avoid flapping to "unavailable".
+    if sensor_name == "battery_ok":
+        return max(int(config.RTL_EXPIRE_AFTER), 86400)
+    return config.RTL_EXPIRE_AFTER
+
+
+def _json_state_enabled() -> bool:
+    return str(getattr(config, "MQTT_STATE_MODE", "field") or "field").strip().lower() == "json"
+
+
+def _radio_field_base(sensor_name):
+    """Return the per-radio field base for sensor_name, or None."""
+    for base in RADIO_FIELD_BASES:
+        if sensor_name.startswith(base):
+            return base
+    return None
+
+
 class HomeNodeMQTT:
     def __init__(self, version="Unknown"):
         self.sw_version = version
-        self.client = mqtt.Client(callback_api_version=CallbackAPIVersion.VERSION2)
+        self.protocol_v5 = _mqtt_v5_enabled() and Properties is not None
+        if self.protocol_v5:
+            self.client = mqtt.Client(callback_api_version=CallbackAPIVersion.VERSION2, protocol=mqtt.MQTTv5)
+        else:
+            self.client = mqtt.Client(callback_api_version=CallbackAPIVersion.VERSION2)
+        max_inflight = int(getattr(config, "MQTT_MAX_INFLIGHT", 0) or 0)
+        if max_inflight > 0:
+            self.client.max_inflight_messages_set(max_inflight)
         self.TOPIC_AVAILABILITY = f"home/status/rtl_bridge{config.ID_SUFFIX}/availability"
         self.client.username_pw_set(config.MQTT_SETTINGS["user"], config.MQTT_SETTINGS["pass"])
         self.client.will_set(self.TOPIC_AVAILABILITY, "offline", retain=True)
@@ -170,6 +249,7 @@ class HomeNodeMQTT:
         # Callbacks
         self.client.on_connect = self._on_connect
         self.client.on_message = self._on_message
+        self.client.on_disconnect = self._on_disconnect
 
         self.discovery_published = set()
         self.last_sent_values = {}
@@ -192,6 +272,10 @@ class HomeNodeMQTT:
         # Used for model-specific unit overrides (e.g., Neptune-R900 reports gallons).
         self._device_model_by_id: dict[str, str] = {}
 
+        # Fields published per device, so forget_device() clears exactly that
+        # device's cache keys (ids may share a prefix, e.g. sensor_1 / sensor_1_a).
+        self._device_fields: dict[str, set[str]] = {}
+
         # Remember last raw utility readings so we can re-publish state/config
         # once we learn commodity (or unit preferences) from later fields.
         # Key: (clean_id, field) -> raw_value
@@ -202,6 +286,75 @@ class HomeNodeMQTT:
         # Key: unique_id_with_suffix -> signature tuple
         self._discovery_sig = {}
 
+        # Device-based discovery (mqtt_discovery_mode=device):
+        # device object id -> {"device": {...}, "components": {unique_id: component}}
+        self._device_discovery: dict[str, dict] = {}
+        self._device_discovery_sig: dict[str, str] = {}
+        self._device_discovery_pending: set[str] = set()
+
+        # JSON state mode (mqtt_state_mode=json): clean_id -> last known field values,
+        # published as one home/rtl_devices/<clean_id>/state document per packet/flush.
+        self._device_state: dict[str, dict] = {}
+        self._device_state_dirty: set[str] = set()
+        self._device_state_lock = threading.Lock()
+
+        # MQTT 5 topic aliases (per connection): topic -> alias, least recently used first.
+        # _alias_max is negotiated from the broker's CONNACK TopicAliasMaximum.
+        self._topic_aliases: OrderedDict[str, int] = OrderedDict()
+        self._alias_max = 0
+        self._alias_lock = threading.Lock()
+
+        # Radio that last received each device (MQTT 5 user properties): clean_id -> (radio, freq)
+        self._device_radio: dict[str, tuple[str, str]] = {}
+
+        # Store-and-forward spool (mqtt_spool): device states published while
+        # disconnected are queued on disk and drained after reconnecting.
+        self.connected = False
+        self.spool = None
+        if getattr(config, "MQTT_SPOOL", False):
+            self.spool = MqttSpool.open(
+                str(getattr(config, "MQTT_SPOOL_PATH", "") or ""),
+                int(getattr(config, "MQTT_SPOOL_MAX_MESSAGES", 20000) or 20000),
+            )
+        self._counter_topics: set[str] = set()
+        self._reconnect_thread = None
+        # While draining, live publishes supersede the spooled values of their topic.
+        # _replay_lock orders live publishes against spool/resync replays.
+        self._draining = False
+        self._replay_lock = threading.Lock()
+        self._drain_superseded: set[str] = set()
+        self._stop_event = threading.Event()
+
+        # Reconnect resync (mqtt_resync): last retained config/state per topic,
+        # replayed when a broker comes back without its retained messages.
+        self.resync_cache = ResyncCache()
+        self._topic_rank: dict[str, int] = {}
+        self._ever_connected = False
+
+        # Global publish rate limit (mqtt_rate_limit): priority queue in front of paho.
+        self.scheduler = None
+        msg_rate = float(getattr(config, "MQTT_RATE_LIMIT", 0) or 0)
+        if msg_rate > 0:
+            self.scheduler = PublishScheduler(
+                self._send_now,
+                msg_rate,
+                float(getattr(config, "MQTT_RATE_LIMIT_BYTES", 0) or 0),
+                ready=lambda: self.connected,
+            )
+            self.scheduler.start()
+        self._binary_topics: set[str] = set()
+
+        # Retained discovery size accounting: config topic -> (full_bytes, sent_bytes)
+        self._discovery_bytes: dict[str, tuple[int, int]] = {}
+
+        # Device lifecycle (device_ttl / device_max): devices that stay silent are
+        # dropped from every per-device cache above (see forget_device()).
+        self.device_registry = DeviceRegistry(
+            ttl=getattr(config, "DEVICE_TTL", 0),
+            max_devices=getattr(config, "DEVICE_MAX", 0),
+        )
+        self.device_registry.add_listener(self.forget_device)
+
 
         # --- Nuke Logic Variables ---
         self.nuke_counter = 0
@@ -210,6 +363,11 @@ class HomeNodeMQTT:
         self.NUKE_TIMEOUT = 5.0       
         self.is_nuking = False        
 
+        # Retained per-entity discovery configs seen on the broker (device mode migration).
+        self._legacy_discovery: set[str] = set()
+        self._legacy_scanning = False
+        self._legacy_scan_done = False
+
     def _utility_meta_override(self, clean_id, field):
         """Return (unit, device_class, icon, friendly_name) for utility meter readings, or None."""
         commodity = self._commodity_by_device.get(clean_id)
@@ -271,7 +429,9 @@ class HomeNodeMQTT:
         return v
 
 
-    def _refresh_utility_entities_for_device(self, clean_id: str, device_name: str, device_model: str) -> None:
+    def _refresh_utility_entities_for_device(
+        self, clean_id: str, device_name: str, device_model: str, defer_state: bool = False
+    ) -> None:
         """Re-publish discovery + state for cached utility readings for this device.
 
         This is used when we learn commodity metadata after the reading was already
@@ -282,13 +442,28 @@ class HomeNodeMQTT:
             if cid != clean_id:
                 continue
             # Use is_rtl=False so we only publish if it actually changes.
-            self.send_sensor(clean_id, field, raw_value, device_name, device_model, is_rtl=False)
+            self.send_sensor(
+                clean_id, field, raw_value, device_name, device_model, is_rtl=False, defer_state=defer_state
+            )
 
 
     def _on_connect(self, c, u, f, rc, p=None):
         if rc == 0:
-            c.publish(self.TOPIC_AVAILABILITY, "online", retain=True)
+            if self.protocol_v5:
+                # Aliases only live for one connection; re-learn the broker's limit.
+                wanted = int(getattr(config, "MQTT_TOPIC_ALIAS_MAXIMUM", 0) or 0)
+                with self._alias_lock:
+                    self._topic_aliases.clear()
+                    self._alias_max = max(0, min(wanted, int(getattr(p, "TopicAliasMaximum", 0) or 0)))
+            # Before `connected`: every live publish from now on must see the drain.
+            if self.spool is not None and len(self.spool):
+                self._draining = True
+            self.connected = True
+            resync = self._ever_connected and getattr(config, "MQTT_RESYNC", False)
+            self._ever_connected = True
+            self._publish(self.TOPIC_AVAILABILITY, "online", retain=True)
             print("[MQTT] Connected Successfully.")
+            self._start_reconnect_tasks(resync)
             
             # 1. Subscribe to Nuke Command
             self.nuke_command_topic = f"home/status/rtl_bridge{config.ID_SUFFIX}/nuke/set"
@@ -301,6 +476,15 @@ class HomeNodeMQTT:
             # 3. Publish Buttons
             self._publish_nuke_button()
             self._publish_restart_button()
+
+            # 4. Device discovery: find per-entity configs left by older versions (once)
+            if self._device_discovery_mode() and not self._legacy_scan_done:
+                self._legacy_scan_done = True
+                self._legacy_scanning = True
+                c.subscribe(DISCOVERY_CONFIG_FILTER)
+                timer = threading.Timer(LEGACY_DISCOVERY_SCAN, self._stop_legacy_scan)
+                timer.daemon = True
+                timer.start()
         else:
             print(f"[MQTT] Connection Failed! Code: {rc}")
 
@@ -317,7 +501,11 @@ class HomeNodeMQTT:
                 trigger_radio_restart()
                 return
 
-            # 3. Handle Nuke Scanning (Search & Destroy)
+            # 3. Old per-entity configs to migrate (device discovery mode)
+            if self._legacy_scanning and msg.retain and msg.payload:
+                self._note_legacy_discovery(msg.topic, msg.payload)
+
+            # 4. Handle Nuke Scanning (Search & Destroy)
             if self.is_nuking:
                 if not msg.payload: return
 
@@ -326,8 +514,8 @@ class HomeNodeMQTT:
                     data = json.loads(payload_str)
                     
                     # Check Manufacturer Signature
-                    device_info = data.get("device", {})
-                    manufacturer = device_info.get("manufacturer", "")
+                    device_info = data.get("device") or data.get("dev") or {}
+                    manufacturer = device_info.get("manufacturer") or device_info.get("mf") or ""
 
                     if "rtl-haos" in manufacturer:
                         # SAFETY: Don't delete the buttons!
@@ -335,13 +523,264 @@ class HomeNodeMQTT:
                         if "restart" in msg.topic or "rtl_bridge_restart" in str(msg.topic): return
 
                         print(f"[NUKE] FOUND & DELETING: {msg.topic}")
-                        self.client.publish(msg.topic, "", retain=True)
+                        self._publish(msg.topic, "", retain=True)
                 except Exception:
                     pass
 
         except Exception as e:
             print(f"[MQTT] Error handling message: {e}")
 
+    def _stop_legacy_scan(self):
+        self._legacy_scanning = False
+        if not self.is_nuking:
+            self.client.unsubscribe(DISCOVERY_CONFIG_FILTER)
+
+    def _note_legacy_discovery(self, topic, payload):
+        """Remember a retained rtl-haos per-entity config; migrate it now if its entity is known."""
+        parts = topic.split("/")
+        if len(parts) != 4 or parts[1] == "device":
+            return
+        try:
+            data = json.loads(payload.decode("utf-8"))
+            device_info = data.get("device") or data.get("dev") or {}
+        except Exception:
+            return
+        if "rtl-haos" not in str(device_info.get("manufacturer") or device_info.get("mf") or ""):
+            return
+
+        domain, unique_id = parts[1], parts[2]
+        with self.discovery_lock:
+            self._legacy_discovery.add(topic)
+            # The entity may already be part of a published device config (packets that
+            # arrived before the retained configs): hand it over and re-publish.
+            for dev_key, doc in self._device_discovery.items():
+                if unique_id in doc["components"]:
+                    old_topic = self._migrate_entity_discovery(domain, unique_id)
+                    if old_topic:
+                        doc["migrated"].append(old_topic)
+                        self._device_discovery_sig.pop(dev_key, None)
+                        if dev_key not in self._device_discovery_pending:
+                            self._publish_device_discovery(dev_key)
+                    break
+
+    def _on_disconnect(self, c, u, flags=None, rc=None, p=None):
+        self.connected = False
+        if self.spool is not None:
+            print("[MQTT] Disconnected. Spooling device states until the broker is back.")
+
+    def _start_reconnect_tasks(self, resync=False):
+        """Drain the spool and/or resync caches in the background after (re)connecting."""
+        spooled = self.spool is not None and len(self.spool) > 0
+        if not spooled and not resync:
+            return
+        if self._reconnect_thread is not None and self._reconnect_thread.is_alive():
+            return
+        self._reconnect_thread = threading.Thread(target=self._reconnect_worker, args=(resync,), daemon=True)
+        self._reconnect_thread.start()
+
+    def _reconnect_worker(self, resync):
+        sent = self._drain_spool() if self.spool is not None else set()
+        if resync:
+            self._resync(skip_states=sent)
+
+    def _drain_spool(self):
+        """Replay spooled states oldest-first at mqtt_spool_drain_rate messages/sec.
+
+        Topics published live during the drain are skipped (their spooled values are
+        older). Messages go straight to paho, bypassing mqtt_rate_limit, and are only
+        removed from the spool once paho accepted them.
+        Returns the topics that were published.
+        """
+        try:
+            return self._drain_spool_rows()
+        finally:
+            with self._replay_lock:
+                self._draining = False
+                self._drain_superseded.clear()
+
+    def _drain_spool_rows(self):
+        bucket = TokenBucket(float(getattr(config, "MQTT_SPOOL_DRAIN_RATE", 50) or 0))
+        sent_topics = set()
+        sent = expired = superseded = 0
+        if not len(self.spool):
+            return sent_topics
+        print(f"[MQTT] Draining {len(self.spool)} spooled message(s)...")
+        while self.connected and not self._stop_event.is_set():
+            batch = self.spool.peek(50)
+            if not batch:
+                break
+            for msg in batch:
+                remaining = msg.remaining_expiry()
+                if remaining is not None and remaining <= 0:
+                    # Older than the entity's expire_after: HA would show it as fresh.
+                    self.spool.ack(msg)
+                    expired += 1
+                    continue
+                if msg.topic not in self._drain_superseded:
+                    if not bucket.consume(1, self._stop_event) or not self.connected:
+                        return sent_topics
+                with self._replay_lock:
+                    if msg.topic in self._drain_superseded:
+                        self.spool.ack(msg)
+                        superseded += 1
+                        continue
+                    info = self._send_now(
+                        msg.topic,
+                        msg.payload,
+                        retain=msg.retain,
+                        expiry=remaining,
+                        user_properties=msg.user_properties,
+                    )
+                if getattr(info, "rc", None) != mqtt.MQTT_ERR_SUCCESS:
+                    return sent_topics
+                self.spool.ack(msg)
+                sent_topics.add(msg.topic)
+                sent += 1
+        print(
+            f"[MQTT] Spool drained: {sent} sent, {expired} expired, {superseded} superseded, "
+            f"{len(self.spool)} left."
+        )
+        return sent_topics
+
+    def _resync(self, skip_states=()):
+        """Re-publish remembered discovery + states (main entities first) at mqtt_resync_rate."""
+        plan = self.resync_cache.plan(skip_states)
+        if not plan:
+            return 0
+
+        def _send(kind, topic):
+            if not self.connected or self._stop_event.is_set():
+                return False
+            # Look up and send under the lock live publishes remember under, so a
+            # newer value is never followed by the replayed one.
+            with self._replay_lock:
+                entry = plan.current(kind, topic)
+                if entry is None:
+                    return None  # published again (or forgotten) since the plan
+                remaining = entry.remaining_expiry()
+                if remaining is not None and remaining <= 0:
+                    return None  # stale: let the entity show unavailable
+                info = self._publish(
+                    entry.topic,
+                    entry.payload,
+                    retain=True,
+                    expiry=remaining,
+                    user_properties=entry.user_properties,
+                    spool=False,
+                    remember=False,
+                )
+            return getattr(info, "rc", mqtt.MQTT_ERR_SUCCESS) == mqtt.MQTT_ERR_SUCCESS
+
+        rate = float(getattr(config, "MQTT_RESYNC_RATE", 20) or 0)
+        print(f"[MQTT] Reconnected: resyncing {len(plan)} retained message(s) at {rate or 'unlimited'} msg/s...")
+        sent = replay(plan, _send, rate, self._stop_event)
+        print(f"[MQTT] Resync finished: {sent}/{len(plan)} published.")
+        return sent
+
+    def _publish(self, topic, payload, retain=False, expiry=None, user_properties=None, spool=True, remember=True):
+        """Single publish path. MQTT 5 adds topic aliases, message expiry and user properties.
+
+        With mqtt_spool, device states published while disconnected go to the spool.
+        Retained publishes are remembered for the reconnect resync.
+        """
+        if remember and retain and topic != self.TOPIC_AVAILABILITY:
+            rank = self._topic_rank.get(topic, RANK_OTHER)
+            with self._replay_lock:
+                if topic.startswith("homeassistant/"):
+                    self.resync_cache.remember_config(topic, payload, rank)
+                elif payload in (None, "", b""):
+                    self.resync_cache.forget(topic)
+                else:
+                    self.resync_cache.remember_state(topic, payload, rank, expiry, user_properties)
+
+        if spool and self.spool is not None and topic.startswith(ALIAS_TOPIC_PREFIX):
+            if not self.connected:
+                history = topic in self._counter_topics
+                self.spool.put(topic, payload, retain, expiry, user_properties, history=history)
+                return None
+            if self._draining:
+                with self._replay_lock:
+                    self._drain_superseded.add(topic)
+                    self.spool.discard_topic(topic)
+
+        if self.scheduler is not None and topic != self.TOPIC_AVAILABILITY:
+            self.scheduler.submit(
+                self._publish_class(topic), topic, payload,
+                retain=retain, expiry=expiry, user_properties=user_properties,
+            )
+            return None
+
+        started = time.perf_counter()
+        info = self._send_now(topic, payload, retain=retain, expiry=expiry, user_properties=user_properties)
+        kind = self._publish_class(topic)
+        metrics.inc("mqtt_publishes", kind=kind)
+        metrics.observe("mqtt_publish_latency_seconds", time.perf_counter() - started, kind=kind)
+        return info
+
+    def _publish_class(self, topic):
+        """Scheduler priority class of a topic: event > state > discovery > diagnostic."""
+        if topic.startswith("homeassistant/"):
+            return CLASS_DISCOVERY
+        if topic in self._binary_topics:
+            return CLASS_EVENT
+        if self._topic_rank.get(topic, RANK_MAIN) == RANK_OTHER:
+            return CLASS_DIAGNOSTIC
+        return CLASS_STATE
+
+    def publish_delay_stats(self):
+        """Per-class scheduler delay since the last call, or None without mqtt_rate_limit."""
+        if self.scheduler is None:
+            return None
+        return self.scheduler.take_stats()
+
+    def _send_now(self, topic, payload, retain=False, expiry=None, user_properties=None):
+        """Hand one message to paho (topic aliases / properties with MQTT 5)."""
+        if not self.protocol_v5:
+            return self.client.publish(topic, payload, retain=retain)
+
+        props = Properties(PacketTypes.PUBLISH)
+        if expiry:
+            props.MessageExpiryInterval = int(expiry)
+        if user_properties:
+            props.UserProperty = [(str(k), str(v)) for k, v in user_properties.items()]
+
+        out_topic = topic
+        new_alias = False
+        if topic.startswith(ALIAS_TOPIC_PREFIX):
+            with self._alias_lock:
+                alias = self._topic_aliases.get(topic)
+                if alias is not None:
+                    self._topic_aliases.move_to_end(topic)
+                    out_topic = ""
+                elif self._alias_max > 0:
+                    if len(self._topic_aliases) < self._alias_max:
+                        alias = len(self._topic_aliases) + 1
+                    else:
+                        # Re-map the least recently used alias (sent with the full topic).
+                        _old, alias = self._topic_aliases.popitem(last=False)
+                    self._topic_aliases[topic] = alias
+                    new_alias = True
+            if alias is not None:
+                props.TopicAlias = alias
+
+        info = self.client.publish(out_topic, payload, retain=retain, properties=props)
+        if new_alias and getattr(info, "rc", mqtt.MQTT_ERR_SUCCESS) != mqtt.MQTT_ERR_SUCCESS:
+            # The broker never saw topic -> alias; don't reference it by alias later.
+            with self._alias_lock:
+                if self._topic_aliases.get(topic) == alias:
+                    del self._topic_aliases[topic]
+        return info
+
+    def set_device_radio(self, sensor_id, radio_name, radio_freq):
+        """Remember which radio/frequency received a device (MQTT 5 user properties)."""
+        self._device_radio[clean_mac(sensor_id)] = (str(radio_name), str(radio_freq))
+
+    def _state_properties(self, clean_id):
+        radio = self._device_radio.get(clean_id)
+        if not self.protocol_v5 or radio is None:
+            return None
+        return {"radio": radio[0], "freq": radio[1]}
+
     def _publish_nuke_button(self):
         """Creates the 'Delete Entities' button."""
         sys_id = get_system_mac().replace(":", "").lower()
@@ -363,8 +802,8 @@ class HomeNodeMQTT:
             "availability_topic": self.TOPIC_AVAILABILITY
         }
         
-        config_topic = f"homeassistant/button/{unique_id}/config"
-        self.client.publish(config_topic, json.dumps(payload), retain=True)
+        with self.discovery_lock:
+            self._emit_discovery("button", unique_id, payload, force=True)
 
     def _publish_restart_button(self):
         """Creates the 'Restart Radios' button."""
@@ -387,8 +826,8 @@ class HomeNodeMQTT:
             "availability_topic": self.TOPIC_AVAILABILITY
         }
         
-        config_topic = f"homeassistant/button/{unique_id}/config"
-        self.client.publish(config_topic, json.dumps(payload), retain=True)
+        with self.discovery_lock:
+            self._emit_discovery("button", unique_id, payload, force=True)
 
     def _handle_nuke_press(self):
         """Counts presses and triggers Nuke if threshold met."""
@@ -413,13 +852,14 @@ class HomeNodeMQTT:
         print("[NUKE] DETONATED! Scanning MQTT for 'rtl-haos' devices...")
         print("!"*50 + "\n")
         self.is_nuking = True
-        self.client.subscribe("homeassistant/+/+/config")
+        self.client.subscribe(DISCOVERY_CONFIG_FILTER)
         threading.Timer(5.0, self._stop_nuke_scan).start()
 
     def _stop_nuke_scan(self):
         """Stops the scanning process and resets state."""
         self.is_nuking = False
-        self.client.unsubscribe("homeassistant/+/+/config")
+        if not self._legacy_scanning:
+            self.client.unsubscribe(DISCOVERY_CONFIG_FILTER)
         
         with self.discovery_lock:
             self.discovery_published.clear()
@@ -428,26 +868,52 @@ class HomeNodeMQTT:
             # Also clear discovery signatures so retained config is re-published
             # even when the metadata would otherwise look "unchanged".
             self._discovery_sig.clear()
+            self._device_discovery.clear()
+            self._device_discovery_sig.clear()
 
         print("[NUKE] Scan Complete. All identified entities removed.")
-        self.client.publish(self.TOPIC_AVAILABILITY, "online", retain=True)
+        self._publish(self.TOPIC_AVAILABILITY, "online", retain=True)
         self._publish_nuke_button()
         self._publish_restart_button()
         print("[NUKE] Host Entities restored.")
 
     def start(self):
         print(f"[STARTUP] Connecting to MQTT Broker at {config.MQTT_SETTINGS['host']}...")
+        connect_kwargs = {}
+        if self.protocol_v5:
+            props = Properties(PacketTypes.CONNECT)
+            receive_max = int(getattr(config, "MQTT_RECEIVE_MAXIMUM", 0) or 0)
+            if receive_max > 0:
+                props.ReceiveMaximum = receive_max
+            connect_kwargs["properties"] = props
         try:
-            self.client.connect(config.MQTT_SETTINGS["host"], config.MQTT_SETTINGS["port"])
+            self.client.connect(config.MQTT_SETTINGS["host"], config.MQTT_SETTINGS["port"], **connect_kwargs)
             self.client.loop_start()
         except Exception as e:
-            print(f"[CRITICAL] MQTT Connect Failed: {e}")
-            sys.exit(1)
+            if not getattr(config, "MQTT_CONNECT_RETRY", False):
+                print(f"[CRITICAL] MQTT Connect Failed: {e}")
+                sys.exit(1)
+            # Keep running (radios keep decoding, states are spooled); paho's network
+            # loop retries the first connection with backoff.
+            print(f"[MQTT] Connect failed ({e}). Retrying in the background...")
+            self.client.reconnect_delay_set(min_delay=1, max_delay=60)
+            self.client.connect_async(config.MQTT_SETTINGS["host"], config.MQTT_SETTINGS["port"], **connect_kwargs)
+            self.client.loop_start()
+
+        # Most devices are discovered within the first minutes: report what that cost.
+        timer = threading.Timer(DISCOVERY_REPORT_DELAY, lambda: print(f"[MQTT] {self.discovery_report()}"))
+        timer.daemon = True
+        timer.start()
 
     def stop(self):
-        self.client.publish(self.TOPIC_AVAILABILITY, "offline", retain=True)
+        self._stop_event.set()
+        if self.scheduler is not None:
+            self.scheduler.stop()
+        self._publish(self.TOPIC_AVAILABILITY, "offline", retain=True)
         self.client.loop_stop()
         self.client.disconnect()
+        if self.spool is not None:
+            self.spool.close()
 
     def _publish_discovery(
         self,
@@ -467,8 +933,9 @@ class HomeNodeMQTT:
 
             default_meta = (None, "none", "mdi:eye", sensor_name.replace("_", " ").title())
             
-            if sensor_name.startswith("radio_status"):
-                base_meta = FIELD_META.get("radio_status", default_meta)
+            radio_base = _radio_field_base(sensor_name)
+            if radio_base:
+                base_meta = FIELD_META.get(radio_base, default_meta)
                 unit, device_class, icon, default_fname = base_meta
             else:
                 meta = get_field_meta(sensor_name, device_model, base_meta=FIELD_META) or default_meta
@@ -481,8 +948,8 @@ class HomeNodeMQTT:
 
             if friendly_name_override:
                 friendly_name = friendly_name_override
-            elif sensor_name.startswith("radio_status_"):
-                suffix = sensor_name.replace("radio_status_", "")
+            elif radio_base and sensor_name.startswith(f"{radio_base}_"):
+                suffix = sensor_name[len(radio_base) + 1:]
                 friendly_name = f"{default_fname} {suffix}"
             else:
                 friendly_name = default_fname
@@ -531,7 +998,7 @@ class HomeNodeMQTT:
 
                 if device_class in ["gas", "energy", "water", "monetary", "precipitation"]:
                     payload["state_class"] = "total_increasing"
-                if device_class in ["temperature", "humidity", "pressure", "illuminance", "voltage", "wind_speed", "moisture"]:
+                if device_class in ["temperature", "humidity", "pressure", "illuminance", "voltage", "wind_speed", "moisture", "distance"]:
                     payload["state_class"] = "measurement"
                 if device_class in ["wind_direction"]:
                     payload["state_class"] = "measurement_angle"
@@ -539,12 +1006,9 @@ class HomeNodeMQTT:
             if extra_payload:
                 payload.update(extra_payload)
 
-            if "version" not in sensor_name.lower() and not sensor_name.startswith("radio_status"):
-                # Battery status is often reported infrequently; avoid flapping to "unavailable".
-                if sensor_name == "battery_ok":
-                    payload["expire_after"] = max(int(config.RTL_EXPIRE_AFTER), 86400)
-                else:
-                    payload["expire_after"] = config.RTL_EXPIRE_AFTER
+            expire_after = _expire_after_for(sensor_name)
+            if expire_after is not None:
+                payload["expire_after"] = expire_after
             
             payload["availability_topic"] = self.TOPIC_AVAILABILITY
 
@@ -557,6 +1021,9 @@ class HomeNodeMQTT:
                 payload.get("name"),
                 payload.get("entity_category"),
                 payload.get("state_class"),
+                payload.get("state_topic"),
+                payload.get("value_template"),
+                payload.get("json_attributes_topic"),
             )
 
             prev_sig = self._discovery_sig.get(unique_id)
@@ -565,22 +1032,164 @@ class HomeNodeMQTT:
                 self.discovery_published.add(unique_id)
                 return False
 
-            config_topic = f"homeassistant/{domain}/{unique_id}/config"
-            self.client.publish(config_topic, json.dumps(payload), retain=True)
+            if payload.get("state_class") == "total_increasing" and getattr(config, "MQTT_SPOOL_COUNTER_HISTORY", False):
+                # Meter totals: replay every spooled reading, not only the last one.
+                self._counter_topics.add(state_topic)
+
+            # Resync order: primary (non-diagnostic) entities come back first after a broker restart.
+            rank = RANK_MAIN if entity_cat is None else RANK_OTHER
+            self._topic_rank[f"homeassistant/{domain}/{unique_id}/config"] = rank
+            self._topic_rank[state_topic] = min(rank, self._topic_rank.get(state_topic, RANK_OTHER))
+
+            self._emit_discovery(domain, unique_id, payload)
             self.discovery_published.add(unique_id)
             self._discovery_sig[unique_id] = sig
             return True
 
-    def send_sensor(self, sensor_id, field, value, device_name, device_model, is_rtl=True, friendly_name=None):
+    def _emit_discovery(self, domain, unique_id, payload, force=False):
+        """Publish one entity's discovery config (caller holds discovery_lock).
+
+        entity mode: retained homeassistant/<domain>/<unique_id>/config per entity.
+        device mode: the entity becomes a component of its device's
+        homeassistant/device/<id>/config document, re-published when it changes.
+        """
+        if not self._device_discovery_mode():
+            config_topic = f"homeassistant/{domain}/{unique_id}/config"
+            self._publish(config_topic, self._encode_discovery(config_topic, payload), retain=True)
+            return
+
+        component = dict(payload)
+        device = component.pop("device", None) or {}
+        component.pop("availability_topic", None)
+        component["platform"] = domain
+
+        identifiers = device.get("identifiers") or [unique_id]
+        dev_key = _discovery_object_id(identifiers[0])
+        doc = self._device_discovery.setdefault(dev_key, {"device": {}, "components": {}, "migrated": []})
+        doc["device"].update(device)
+
+        if unique_id not in doc["components"]:
+            old_topic = self._migrate_entity_discovery(domain, unique_id)
+            if old_topic:
+                doc["migrated"].append(old_topic)
+        doc["components"][unique_id] = component
+
+        delay = float(getattr(config, "MQTT_DEVICE_DISCOVERY_DELAY", 1.0) or 0)
+        if force or delay <= 0:
+            self._publish_device_discovery(dev_key)
+        elif dev_key not in self._device_discovery_pending:
+            # Coalesce the burst of new fields from one packet into one device config.
+            self._device_discovery_pending.add(dev_key)
+            timer = threading.Timer(delay, self._flush_device_discovery, args=(dev_key,))
+            timer.daemon = True
+            timer.start()
+
+    def _encode_discovery(self, config_topic, payload, record=True):
+        """Serialize a discovery payload (compact when mqtt_discovery_compact) and count its bytes."""
+        if getattr(config, "MQTT_DISCOVERY_COMPACT", False):
+            body = discovery_payload.encode(discovery_payload.compact(payload), compact=True)
+        else:
+            body = discovery_payload.encode(payload)
+        if record:
+            full = len(discovery_payload.encode(payload).encode("utf-8"))
+            self._discovery_bytes[config_topic] = (full, len(body.encode("utf-8")))
+        return body
+
+    def discovery_report(self) -> str:
+        """One-line summary of the retained discovery configs published by this process."""
+        count = len(self._discovery_bytes)
+        full = sum(f for f, _s in self._discovery_bytes.values())
+        sent = sum(s for _f, s in self._discovery_bytes.values())
+        line = f"{count} discovery configs, {sent} bytes retained"
+        if sent != full and full:
+            line += f" ({full} bytes uncompacted, -{100 * (full - sent) / full:.0f}%)"
+        return line
+
+    @staticmethod
+    def _device_discovery_mode():
+        return str(getattr(config, "MQTT_DISCOVERY_MODE", "entity")).strip().lower() == "device"
+
+    def _migrate_entity_discovery(self, domain, unique_id):
+        """Hand an entity from per-entity discovery over to device discovery.
+
+        Only topics that still hold a retained rtl-haos config (seen by the scan after
+        connecting) are migrated. Home Assistant keeps the entity (and its history) when
+        the old topic first receives {"migrate_discovery": true}; the old retained
+        config is then cleared.
+        """
+        old_topic = f"homeassistant/{domain}/{unique_id}/config"
+        key = f"migrate:{domain}:{unique_id}"
+        if old_topic not in self._legacy_discovery or key in self.migration_cleared:
+            return None
+        self.migration_cleared.add(key)
+        self._legacy_discovery.discard(old_topic)
+        self._publish(old_topic, json.dumps({"migrate_discovery": True}), retain=True, remember=False)
+        return old_topic
+
+    def _flush_device_discovery(self, dev_key):
+        with self.discovery_lock:
+            self._device_discovery_pending.discard(dev_key)
+            self._publish_device_discovery(dev_key)
+
+    def _publish_device_discovery(self, dev_key):
+        """Publish a device's discovery document if it changed (caller holds discovery_lock)."""
+        doc = self._device_discovery.get(dev_key)
+        if not doc:
+            return False
+
+        payload = {
+            "device": doc["device"],
+            "origin": {
+                "name": "rtl-haos",
+                "sw_version": self.sw_version,
+                "support_url": "https://github.com/jaronmcd/rtl-haos",
+            },
+            "availability_topic": self.TOPIC_AVAILABILITY,
+            "components": doc["components"],
+        }
+        config_topic = f"homeassistant/device/{dev_key}/config"
+        self._topic_rank[config_topic] = RANK_MAIN
+        body = self._encode_discovery(config_topic, payload, record=False)
+        if self._device_discovery_sig.get(dev_key) == body:
+            return False
+
+        self._encode_discovery(config_topic, payload)
+        self._publish(config_topic, body, retain=True)
+        self._device_discovery_sig[dev_key] = body
+
+        # The device config now owns these entities: drop the old per-entity configs.
+        for old_topic in doc["migrated"]:
+            self._publish(old_topic, "", retain=True, remember=False)
+        doc["migrated"] = []
+        return True
+
+    def send_sensor(
+        self,
+        sensor_id,
+        field,
+        value,
+        device_name,
+        device_model,
+        is_rtl=True,
+        friendly_name=None,
+        defer_state=False,
+    ):
+        """Publish discovery (if needed) and the state of one device field.
+
+        defer_state=True (DataProcessor, with mqtt_state_mode=json) stages the value in the
+        device's JSON state document instead; flush_device_state() publishes it.
+        """
         if value is None:
             return
 
         self.tracked_devices.add(device_name)
 
         clean_id = clean_mac(sensor_id) 
+        self.device_registry.touch(clean_id, device_name)
         
         # Remember model for model-specific discovery/unit overrides.
         self._device_model_by_id[clean_id] = str(device_model)
+        self._device_fields.setdefault(clean_id, set()).add(field)
 
         unique_id_base = clean_id
         state_topic_base = clean_id
@@ -588,6 +1197,10 @@ class HomeNodeMQTT:
         unique_id = f"{unique_id_base}_{field}"
         state_topic = f"home/rtl_devices/{state_topic_base}/{field}"
 
+        json_state = bool(defer_state) and _json_state_enabled()
+        if json_state:
+            state_topic = f"home/rtl_devices/{state_topic_base}/state"
+
         # Field-specific transforms / entity types
         domain = "sensor"
         extra_payload = None
@@ -620,7 +1233,7 @@ class HomeNodeMQTT:
         if commodity_update and commodity_update != prev_commodity:
             self._commodity_by_device[clean_id] = commodity_update
             # Now that we know commodity, update any utility entities we already published.
-            self._refresh_utility_entities_for_device(clean_id, device_name, device_model)
+            self._refresh_utility_entities_for_device(clean_id, device_name, device_model, defer_state=defer_state)
 
         meta_override = None
         if field in {"Consumption", "consumption", "consumption_data", "meter_reading"}:
@@ -686,7 +1299,7 @@ class HomeNodeMQTT:
             unique_id_v2 = f"{unique_id}{config.ID_SUFFIX}"
             if unique_id_v2 not in self.migration_cleared:
                 old_sensor_config = f"homeassistant/sensor/{unique_id_v2}/config"
-                self.client.publish(old_sensor_config, "", retain=True)
+                self._publish(old_sensor_config, "", retain=True)
                 with self.discovery_lock:
                     self.discovery_published.discard(unique_id_v2)
                 self.migration_cleared.add(unique_id_v2)
@@ -717,6 +1330,16 @@ class HomeNodeMQTT:
             if friendly_name is None:
                 friendly_name = default_friendly
 
+        if json_state:
+            # Every entity of the device reads its field from the shared state document.
+            extra_payload = dict(extra_payload or {})
+            extra_payload["value_template"] = "{{ value_json[%s] }}" % json.dumps(field)
+
+        if domain == "sensor" and get_window_stats().tracks(clean_id, field):
+            # Rolling statistics (rtl_stats_windows) arrive via send_attributes().
+            extra_payload = dict(extra_payload or {})
+            extra_payload["json_attributes_topic"] = f"home/rtl_devices/{state_topic_base}/{field}/attributes"
+
         discovery_published_now = self._publish_discovery(
             field,
             state_topic,
@@ -733,7 +1356,21 @@ class HomeNodeMQTT:
         value_changed = (self.last_sent_values.get(unique_id_v2) != out_value) or bool(discovery_published_now)
 
         if value_changed or is_rtl:
-            self.client.publish(state_topic, str(out_value), retain=True)
+            if json_state:
+                with self._device_state_lock:
+                    self._device_state.setdefault(clean_id, {})[field] = out_value
+                    self._device_state_dirty.add(clean_id)
+            else:
+                if domain == "binary_sensor":
+                    # Events go first when mqtt_rate_limit queues publishes.
+                    self._binary_topics.add(state_topic)
+                self._publish(
+                    state_topic,
+                    str(out_value),
+                    retain=True,
+                    expiry=_expire_after_for(field),
+                    user_properties=self._state_properties(clean_id),
+                )
             self.last_sent_values[unique_id_v2] = out_value
 
             if value_changed:
@@ -741,6 +1378,97 @@ class HomeNodeMQTT:
                 if config.VERBOSE_TRANSMISSIONS:
                     print(f" -> TX {device_name} [{field}]: {out_value}")
 
+    def send_attributes(self, sensor_id, field, attributes):
+        """Publish the JSON attributes of one device field (rolling statistics from window_stats)."""
+        clean_id = clean_mac(sensor_id)
+        attr_topic = f"home/rtl_devices/{clean_id}/{field}/attributes"
+        attr_json = json.dumps(attributes, sort_keys=True)
+        attr_key = f"{clean_id}_{field}{config.ID_SUFFIX}_attr"
+        self._device_fields.setdefault(clean_id, set()).add(field)
+        if self.last_sent_values.get(attr_key) != attr_json:
+            self._publish(attr_topic, attr_json, retain=True)
+            self.last_sent_values[attr_key] = attr_json
+
+    def forget_device(self, clean_id, device_name=None):
+        """Drop all cached state of an evicted device (DeviceRegistry listener).
+
+        With device_ttl_cleanup, its retained discovery configs and states are
+        cleared on the broker as well, so Home Assistant removes the entities.
+        """
+        dropped_docs = []
+        with self.discovery_lock:
+            uids = {f"{clean_id}_{field}{config.ID_SUFFIX}" for field in self._device_fields.pop(clean_id, ())}
+            keys = uids | {f"{uid}_attr" for uid in uids}
+            for store in (self.last_sent_values, self._discovery_sig):
+                for key in keys:
+                    store.pop(key, None)
+            self.discovery_published.difference_update(uids)
+            self.migration_cleared.difference_update(
+                [k for k in self.migration_cleared if k in uids or k.rpartition(":")[2] in uids]
+            )
+            for store in (self._battery_state, self._commodity_by_device, self._device_model_by_id, self._device_radio):
+                store.pop(clean_id, None)
+            for key in [k for k in self._utility_last_raw if k[0] == clean_id]:
+                del self._utility_last_raw[key]
+            for dev_key, doc in list(self._device_discovery.items()):
+                components = doc.get("components") or {}
+                if components and all(uid in uids for uid in components):
+                    del self._device_discovery[dev_key]
+                    self._device_discovery_sig.pop(dev_key, None)
+                    self._device_discovery_pending.discard(dev_key)
+                    dropped_docs.append(f"homeassistant/device/{dev_key}/config")
+        with self._device_state_lock:
+            self._device_state.pop(clean_id, None)
+            self._device_state_dirty.discard(clean_id)
+        if device_name is not None:
+            self.tracked_devices.discard(device_name)
+
+        state_prefix = f"{ALIAS_TOPIC_PREFIX}{clean_id}/"
+        topics = [
+            t for t in self.resync_cache.topics()
+            if t.startswith(state_prefix) or (t.startswith("homeassistant/") and t.split("/")[2] in uids)
+        ]
+        topics += [t for t in dropped_docs if t not in topics]
+        for topic in topics:
+            self.resync_cache.forget(topic)
+            self._topic_rank.pop(topic, None)
+            self._binary_topics.discard(topic)
+            self._counter_topics.discard(topic)
+            self._discovery_bytes.pop(topic, None)
+            if getattr(config, "DEVICE_TTL_CLEANUP", False):
+                self._publish(topic, "", retain=True, spool=False, remember=False)
+
+    def flush_device_state(self, sensor_id=None) -> int:
+        """Publish staged JSON state documents (one device, or all when sensor_id is None).
+
+        Each document carries every field seen for the device so far, so all
+        value_template entities keep resolving. Returns the number of publishes.
+        """
+        with self._device_state_lock:
+            if sensor_id is None:
+                ids = list(self._device_state_dirty)
+            else:
+                clean_id = clean_mac(sensor_id)
+                ids = [clean_id] if clean_id in self._device_state_dirty else []
+            docs = []
+            for clean_id in ids:
+                self._device_state_dirty.discard(clean_id)
+                doc = self._device_state.get(clean_id, {})
+                # The document must outlive its longest-lived field (e.g. battery_ok).
+                expiries = [_expire_after_for(field) for field in doc]
+                expiry = None if not expiries or None in expiries else max(expiries)
+                docs.append((clean_id, json.dumps(doc, default=str), expiry))
+
+        for clean_id, body, expiry in docs:
+            self._publish(
+                f"home/rtl_devices/{clean_id}/state",
+                body,
+                retain=True,
+                expiry=expiry,
+                user_properties=self._state_properties(clean_id),
+            )
+        return len(docs)
+
     def send_health_alert(
         self,
         sensor_id: str,
@@ -763,6 +1491,7 @@ class HomeNodeMQTT:
         unique_id = f"{clean_id}_{field}{config.ID_SUFFIX}"
         state_topic = f"home/rtl_devices/{clean_id}/{field}"
         attr_topic = f"home/rtl_devices/{clean_id}/{field}/attributes"
+        self._binary_topics.add(state_topic)
 
         with self.discovery_lock:
             # Publish discovery if not already done
@@ -789,15 +1518,14 @@ class HomeNodeMQTT:
                     "availability_topic": self.TOPIC_AVAILABILITY,
                 }
 
-                config_topic = f"homeassistant/binary_sensor/{unique_id}/config"
-                self.client.publish(config_topic, json.dumps(payload), retain=True)
+                self._emit_discovery("binary_sensor", unique_id, payload, force=True)
                 self.discovery_published.add(unique_id)
 
         # Publish state
         state_value = "ON" if is_problem else "OFF"
         state_key = f"{unique_id}_state"
         if self.last_sent_values.get(state_key) != state_value:
-            self.client.publish(state_topic, state_value, retain=True)
+            self._publish(state_topic, state_value, retain=True)
             self.last_sent_values[state_key] = state_value
 
         # Publish attributes (always update reason)
@@ -805,5 +1533,5 @@ class HomeNodeMQTT:
         attr_key = f"{unique_id}_attr"
         attr_json = json.dumps(attr_payload)
         if self.last_sent_values.get(attr_key) != attr_json:
-            self.client.publish(attr_topic, attr_json, retain=True)
+            self._publish(attr_topic, attr_json, retain=True)
             self.last_sent_values[attr_key] = attr_json
\ No newline at end of file
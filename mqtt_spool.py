@@ -0,0 +1,176 @@
+# mqtt_spool.py
+"""
+FILE: mqtt_spool.py
+DESCRIPTION:
+  Bounded on-disk store-and-forward spool for device states (opt-in: mqtt_spool).
+  - While the broker is unreachable HomeNodeMQTT writes state publishes here
+    instead of handing them to paho (which drops or buffers them in memory).
+  - Only the latest value per topic is kept; topics marked as counters
+    (mqtt_spool_counter_history) keep every value so meter totals are replayed.
+  - SQLite in WAL mode: one small transaction per state, safe across restarts.
+  - drain order is the original publish order (one sequence for both tables).
+"""
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS latest (
+    topic TEXT PRIMARY KEY,
+    seq INTEGER NOT NULL,
+    payload BLOB,
+    retain INTEGER NOT NULL,
+    expiry INTEGER,
+    props TEXT,
+    queued_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS history (
+    seq INTEGER PRIMARY KEY,
+    topic TEXT NOT NULL,
+    payload BLOB,
+    retain INTEGER NOT NULL,
+    expiry INTEGER,
+    props TEXT,
+    queued_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS latest_seq ON latest(seq);
+"""
+
+
+class SpooledMessage:
+    __slots__ = ("table", "seq", "topic", "payload", "retain", "expiry", "user_properties", "queued_at")
+
+    def __init__(self, table, seq, topic, payload, retain, expiry, props, queued_at):
+        self.table = table
+        self.seq = seq
+        self.topic = topic
+        self.payload = payload
+        self.retain = bool(retain)
+        self.expiry = expiry
+        self.user_properties = json.loads(props) if props else None
+        self.queued_at = queued_at
+
+    def remaining_expiry(self, now: Optional[float] = None) -> Optional[int]:
+        """Seconds of validity left, None if it never expires, <= 0 if stale."""
+        if not self.expiry:
+            return None
+        now = time.time() if now is None else now
+        return int(self.expiry - (now - self.queued_at))
+
+
+class MqttSpool:
+    """SQLite-backed latest-value-per-topic queue with optional counter history."""
+
+    def __init__(self, path: str, max_messages: int = 20000) -> None:
+        self.path = path
+        self.max_messages = max(1, int(max_messages))
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        row = self._db.execute(
+            "SELECT MAX(m) FROM (SELECT MAX(seq) AS m FROM latest UNION ALL SELECT MAX(seq) FROM history)"
+        ).fetchone()
+        self._seq = int(row[0] or 0)
+        self._count = self._count_rows()
+        self.dropped = 0
+
+    @classmethod
+    def open(cls, path: str, max_messages: int = 20000) -> Optional["MqttSpool"]:
+        """Best-effort open; None (with a warning) when the directory is missing or the DB is unusable."""
+        if not path or not os.path.isdir(os.path.dirname(path) or "."):
+            print(f"[MQTT] Warning: Spool disabled, directory for {path!r} does not exist.")
+            return None
+        try:
+            return cls(path, max_messages)
+        except sqlite3.Error as e:
+            print(f"[MQTT] Warning: Spool disabled, cannot open {path}: {e}")
+            return None
+
+    def _count_rows(self) -> int:
+        a = self._db.execute("SELECT COUNT(*) FROM latest").fetchone()[0]
+        b = self._db.execute("SELECT COUNT(*) FROM history").fetchone()[0]
+        return int(a) + int(b)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def put(self, topic, payload, retain=False, expiry=None, user_properties=None, history=False) -> None:
+        """Queue a publish. history=True keeps every value for the topic, otherwise only the latest."""
+        if isinstance(payload, str):
+            payload = payload.encode("utf-8")
+        props = json.dumps(user_properties, sort_keys=True) if user_properties else None
+        now = time.time()
+        with self._lock:
+            self._seq += 1
+            row = (topic, self._seq, payload, int(bool(retain)), expiry, props, now)
+            if history:
+                self._db.execute(
+                    "INSERT INTO history(topic, seq, payload, retain, expiry, props, queued_at) VALUES (?,?,?,?,?,?,?)",
+                    row,
+                )
+                self._count += 1
+            else:
+                replaced = self._db.execute("SELECT 1 FROM latest WHERE topic=?", (topic,)).fetchone()
+                self._db.execute(
+                    "INSERT OR REPLACE INTO latest(topic, seq, payload, retain, expiry, props, queued_at) "
+                    "VALUES (?,?,?,?,?,?,?)",
+                    row,
+                )
+                if not replaced:
+                    self._count += 1
+            if self._count > self.max_messages:
+                self._trim()
+
+    def _trim(self) -> None:
+        """Drop the oldest entries (counter history first) until within max_messages."""
+        surplus = self._count - self.max_messages
+        for table in ("history", "latest"):
+            if surplus <= 0:
+                break
+            cur = self._db.execute(
+                f"DELETE FROM {table} WHERE seq IN (SELECT seq FROM {table} ORDER BY seq LIMIT ?)", (surplus,)
+            )
+            surplus -= cur.rowcount
+            self._count -= cur.rowcount
+            self.dropped += cur.rowcount
+
+    def peek(self, limit: int = 50) -> list[SpooledMessage]:
+        """Oldest queued messages (not removed until ack())."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT 'history', seq, topic, payload, retain, expiry, props, queued_at FROM history "
+                "UNION ALL "
+                "SELECT 'latest', seq, topic, payload, retain, expiry, props, queued_at FROM latest "
+                "ORDER BY seq LIMIT ?",
+                (int(limit),),
+            ).fetchall()
+        return [SpooledMessage(*r) for r in rows]
+
+    def ack(self, msg: SpooledMessage) -> None:
+        """Remove a drained message (unless a newer value for the topic replaced it)."""
+        with self._lock:
+            cur = self._db.execute(f"DELETE FROM {msg.table} WHERE seq=?", (msg.seq,))
+            self._count -= cur.rowcount
+
+    def discard_topic(self, topic: str) -> int:
+        """Drop every queued value of a topic (a newer one was published live)."""
+        with self._lock:
+            removed = 0
+            for table in ("latest", "history"):
+                removed += self._db.execute(f"DELETE FROM {table} WHERE topic=?", (topic,)).rowcount
+            self._count -= removed
+        return removed
+
+    def close(self) -> None:
+        with self._lock:
+            try:
+                self._db.close()
+            except sqlite3.Error:
+                pass
@@ -0,0 +1,121 @@
+# outlier_filter.py
+"""
+FILE: outlier_filter.py
+DESCRIPTION:
+  Spike rejection for slowly changing readings (rtl_outlier_filter).
+  - Applies to fields whose FIELD_META device_class is listed in
+    OUTLIER_CLASSES (temperature, humidity, moisture, pressure).
+  - Physically impossible values (e.g. humidity above 100 %, a temperature
+    outside the range of consumer sensors) are always rejected.
+  - Hampel test: a value further than rtl_outlier_threshold scaled MADs
+    (median absolute deviation) from the median of the entity's last
+    rtl_outlier_window values is rejected. Values rejected by this test stay
+    in the window, so a real level change is accepted once it persists for
+    about half of it. Values outside the physical limits never enter it.
+  - State is one bounded deque per entity; rejections are counted per device.
+"""
+from __future__ import annotations
+
+import math
+import threading
+from collections import deque
+from statistics import median
+from typing import Optional
+
+import config
+from field_meta import FIELD_META, get_field_meta
+
+# device_class -> (absolute floor, relative floor): the smallest deviation from
+# the median that may be rejected, so steady readings (MAD = 0) do not turn
+# every small change into an outlier.
+OUTLIER_CLASSES = {
+    "temperature": (3.0, 0.0),
+    "humidity": (8.0, 0.0),
+    "moisture": (8.0, 0.0),
+    "pressure": (0.0, 0.05),
+}
+
+# unit -> (min, max) that a sensor can really report.
+PHYSICAL_LIMITS = {
+    "%": (0.0, 100.0),
+    "°C": (-50.0, 80.0),
+    "°F": (-58.0, 176.0),
+}
+
+# Scale factor that makes the MAD comparable to a standard deviation.
+MAD_SCALE = 1.4826
+# Values needed in the window before the Hampel test applies.
+MIN_HISTORY = 3
+
+
+class OutlierFilter:
+    """Per-entity Hampel filter plus physical limits (thread-safe)."""
+
+    def __init__(self, window: int = 7, threshold: float = 3.5) -> None:
+        self.window = max(MIN_HISTORY, int(window or 0))
+        self.threshold = float(threshold or 0) or 3.5
+        self._lock = threading.Lock()
+        self._history: dict[tuple[str, str], deque] = {}
+        self.rejected_by_device: dict[str, int] = {}
+        self.rejected = 0
+
+    def reject(self, clean_id: str, field: str, value, model: Optional[str] = None) -> bool:
+        """True if the reading must be dropped (and count it)."""
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return False
+        meta = get_field_meta(field, model, base_meta=FIELD_META)
+        if not meta or meta[1] not in OUTLIER_CLASSES:
+            return False
+        unit, device_class = meta[0], meta[1]
+        value = float(value)
+        if not math.isfinite(value):
+            return self._count(clean_id)
+
+        limits = PHYSICAL_LIMITS.get(unit)
+        if limits is not None and not limits[0] <= value <= limits[1]:
+            return self._count(clean_id)
+
+        key = (clean_id, field)
+        with self._lock:
+            history = self._history.get(key)
+            if history is None:
+                history = self._history[key] = deque(maxlen=self.window)
+            spike = False
+            if len(history) >= MIN_HISTORY:
+                med = median(history)
+                mad = median(abs(x - med) for x in history)
+                abs_floor, rel_floor = OUTLIER_CLASSES[device_class]
+                limit = max(self.threshold * MAD_SCALE * mad, abs_floor, rel_floor * abs(med))
+                spike = abs(value - med) > limit
+            history.append(value)
+        return self._count(clean_id) if spike else False
+
+    def _count(self, clean_id: str) -> bool:
+        with self._lock:
+            self.rejected += 1
+            self.rejected_by_device[clean_id] = self.rejected_by_device.get(clean_id, 0) + 1
+        return True
+
+    def forget(self, clean_id: str, device_name: Optional[str] = None) -> None:
+        with self._lock:
+            for key in [k for k in self._history if k[0] == clean_id]:
+                del self._history[key]
+            self.rejected_by_device.pop(clean_id, None)
+
+
+# Module-level singleton instance (rebuilt when the filter settings change)
+_filter: Optional[OutlierFilter] = None
+_filter_key: Optional[tuple] = None
+
+
+def get_outlier_filter() -> OutlierFilter:
+    """Get the shared filter for the current RTL_OUTLIER_* settings."""
+    global _filter, _filter_key
+    key = (
+        int(getattr(config, "RTL_OUTLIER_WINDOW", 7) or 7),
+        float(getattr(config, "RTL_OUTLIER_THRESHOLD", 3.5) or 3.5),
+    )
+    if _filter is None or key != _filter_key:
+        _filter = OutlierFilter(*key)
+        _filter_key = key
+    return _filter
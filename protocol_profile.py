@@ -0,0 +1,168 @@
+# protocol_profile.py
+"""
+FILE: protocol_profile.py
+DESCRIPTION:
+  Learns which rtl_433 decoders (protocol numbers) each radio actually needs.
+  - record(): counts the 'protocol' number of every accepted packet per radio.
+  - recommended(): the -R set observed often enough to be worth keeping.
+  - Profiles are persisted as JSON so a pruned -R set can be applied on the next
+    restart. rtl_loop alternates pruned runs with periodic full-decoder "probe"
+    windows so newly installed devices are still discovered.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from typing import Optional
+
+import config
+
+PROFILE_VERSION = 1
+
+# Minimum seconds between automatic saves.
+SAVE_INTERVAL = 300
+
+
+class ProtocolProfileStore:
+    """Per-radio protocol counters with JSON persistence."""
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path if path is not None else str(getattr(config, "RTL_PROTOCOL_PROFILE_PATH", "") or "")
+        self._lock = threading.Lock()
+        # radio_key -> {"counts": {protocol(str): count}, "packets": int, "since": float}
+        self.radios: dict[str, dict] = {}
+        self._dirty = False
+        self._last_save = 0.0
+        self._last_logged: dict[str, list[int]] = {}
+        self.load()
+
+    def load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                obj = json.load(f)
+            if isinstance(obj, dict) and obj.get("version") == PROFILE_VERSION:
+                radios = obj.get("radios")
+                if isinstance(radios, dict):
+                    self.radios = radios
+        except Exception as e:
+            print(f"[RTL] Warning: Ignoring unreadable protocol profile {self.path}: {e}")
+
+    def save(self, force: bool = False) -> bool:
+        """Write changed profiles to disk at most every SAVE_INTERVAL seconds (force skips the wait).
+
+        Best-effort: returns False when nothing was written (clean, too soon, or
+        the target directory does not exist, e.g. standalone without /data).
+        """
+        now = time.time()
+        with self._lock:
+            if not self._dirty:
+                return False
+            if not force and (now - self._last_save) < SAVE_INTERVAL:
+                return False
+            self._dirty = False
+            self._last_save = now
+            if not self.path or not os.path.isdir(os.path.dirname(self.path) or "."):
+                return False
+            payload = json.dumps({"version": PROFILE_VERSION, "radios": self.radios}, indent=1, sort_keys=True)
+        try:
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(payload)
+            os.replace(tmp, self.path)
+            return True
+        except Exception as e:
+            print(f"[RTL] Warning: Failed writing protocol profile {self.path}: {e}")
+            return False
+
+    def record(self, radio_key: str, protocol) -> None:
+        """Count one decoded packet for radio_key (ignores packets without a protocol number)."""
+        try:
+            proto = int(protocol)
+        except (TypeError, ValueError):
+            return
+        with self._lock:
+            prof = self.radios.setdefault(radio_key, {"counts": {}, "packets": 0, "since": time.time()})
+            counts = prof.setdefault("counts", {})
+            key = str(proto)
+            counts[key] = int(counts.get(key, 0)) + 1
+            prof["packets"] = int(prof.get("packets", 0)) + 1
+            self._dirty = True
+
+    def packets(self, radio_key: str) -> int:
+        with self._lock:
+            return int(self.radios.get(radio_key, {}).get("packets", 0))
+
+    def recommended(self, radio_key: str, min_count: Optional[int] = None) -> list[int]:
+        """Protocols seen at least min_count times, sorted ascending."""
+        if min_count is None:
+            min_count = int(getattr(config, "RTL_PROTOCOL_MIN_COUNT", 2) or 1)
+        with self._lock:
+            counts = dict(self.radios.get(radio_key, {}).get("counts", {}))
+        out = []
+        for k, v in counts.items():
+            try:
+                if int(v) >= min_count:
+                    out.append(int(k))
+            except (TypeError, ValueError):
+                continue
+        return sorted(out)
+
+    def ready(self, radio_key: str) -> bool:
+        """True once enough packets were observed to trust the recommendation."""
+        min_packets = int(getattr(config, "RTL_PROTOCOL_LEARN_MIN_PACKETS", 200) or 0)
+        return self.packets(radio_key) >= min_packets and bool(self.recommended(radio_key))
+
+    def log_recommendation(self, radio_key: str, radio_name: str) -> None:
+        """Print the recommended -R set when it changes."""
+        if not self.ready(radio_key):
+            return
+        rec = self.recommended(radio_key)
+        if self._last_logged.get(radio_key) == rec:
+            return
+        self._last_logged[radio_key] = rec
+        flags = " ".join(f"-R {p}" for p in rec)
+        print(
+            f"[RTL] Protocol profile for {radio_name}: {len(rec)} decoder(s) seen in "
+            f"{self.packets(radio_key)} packets -> recommended: {flags}"
+        )
+
+    def reset(self) -> None:
+        """Reset all learned state (useful for testing)."""
+        with self._lock:
+            self.radios.clear()
+            self._last_logged.clear()
+            self._dirty = False
+
+
+def radio_uses_explicit_protocols(radio_config: dict) -> bool:
+    """True if the user already constrains decoders (protocols, -R, or an rtl_433 config file)."""
+    if radio_config.get("protocols"):
+        return True
+    for key in ("config_path", "config_inline"):
+        v = radio_config.get(key)
+        if isinstance(v, str) and v.strip():
+            return True
+    for v in (getattr(config, "RTL_433_CONFIG_PATH", ""), getattr(config, "RTL_433_CONFIG_INLINE", "")):
+        if isinstance(v, str) and v.strip():
+            return True
+    for args in (radio_config.get("args", ""), getattr(config, "RTL_433_ARGS", "")):
+        tokens = args if isinstance(args, list) else str(args or "").split()
+        if any(str(t) == "-R" or str(t).startswith("-R") for t in tokens):
+            return True
+    return False
+
+
+# Module-level singleton instance
+_profile_store: Optional[ProtocolProfileStore] = None
+
+
+def get_protocol_profiles() -> ProtocolProfileStore:
+    """Get the shared protocol profile store."""
+    global _profile_store
+    if _profile_store is None:
+        _profile_store = ProtocolProfileStore()
+    return _profile_store
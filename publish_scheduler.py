@@ -0,0 +1,189 @@
+# publish_scheduler.py
+"""
+FILE: publish_scheduler.py
+DESCRIPTION:
+  Global MQTT publish rate limiter with priority classes (opt-in: mqtt_rate_limit).
+  - Every publish is queued in one of four classes and sent by a single worker
+    thread while both the messages/sec and the bytes/sec token buckets allow it.
+  - Classes, highest priority first: event (binary sensors), state,
+    discovery, diagnostic. Availability (LWT/online/offline) bypasses the queue.
+  - A newer state/diagnostic value for a topic that is still queued replaces
+    the old payload. Events are never coalesced (an ON followed by OFF must
+    reach Home Assistant as two transitions), nor is discovery (delete/migrate
+    sequences must stay intact).
+  - Per-class queueing delay is tracked for the bridge's diagnostic sensors.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+
+import metrics
+from rate_limit import TokenBucket
+
+CLASS_EVENT = "event"
+CLASS_STATE = "state"
+CLASS_DISCOVERY = "discovery"
+CLASS_DIAGNOSTIC = "diagnostic"
+
+PRIORITY = {CLASS_EVENT: 0, CLASS_STATE: 1, CLASS_DISCOVERY: 2, CLASS_DIAGNOSTIC: 3}
+_ORDER = sorted(PRIORITY, key=PRIORITY.get)
+
+# Classes where only the latest queued value per topic matters.
+COALESCED_CLASSES = frozenset((CLASS_STATE, CLASS_DIAGNOSTIC))
+
+# Queue bound; beyond it the lowest-priority oldest message is dropped.
+MAX_QUEUE = 50000
+
+
+class _Item:
+    __slots__ = ("cls", "topic", "payload", "kwargs", "queued_at", "cancelled")
+
+    def __init__(self, cls, topic, payload, kwargs, queued_at):
+        self.cls = cls
+        self.topic = topic
+        self.payload = payload
+        self.kwargs = kwargs
+        self.queued_at = queued_at
+        self.cancelled = False
+
+
+class PublishScheduler:
+    """Priority queue + token buckets in front of the raw MQTT publish."""
+
+    def __init__(
+        self,
+        send: Callable[..., object],
+        msg_rate: float,
+        byte_rate: float = 0.0,
+        *,
+        ready: Optional[Callable[[], bool]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._send = send
+        self._ready = ready
+        self._clock = clock
+        self.msg_bucket = TokenBucket(msg_rate, burst=max(1.0, float(msg_rate)), clock=clock)
+        self.byte_bucket = TokenBucket(byte_rate, burst=max(1.0, float(byte_rate)), clock=clock)
+        # One FIFO per class (highest priority first): pop and overflow drop are O(1).
+        self._queues: dict[str, deque[_Item]] = {cls: deque() for cls in _ORDER}
+        self._queued = 0  # entries in _queues, including cancelled ones
+        self._pending_state: dict[str, _Item] = {}
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # class -> [sent, total_delay_s, max_delay_s]; reset by take_stats()
+        self._stats = {cls: [0, 0.0, 0.0] for cls in PRIORITY}
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        with self._cond:
+            return sum(1 for q in self._queues.values() for item in q if not item.cancelled)
+
+    def submit(self, cls: str, topic: str, payload, **kwargs) -> None:
+        """Queue a publish (kwargs are passed through to send())."""
+        item = _Item(cls, topic, payload, kwargs, self._clock())
+        with self._cond:
+            if cls in COALESCED_CLASSES:
+                old = self._pending_state.get(topic)
+                if old is not None and not old.cancelled and old.cls == cls:
+                    # Keep its queue position (and original timestamp); send the newest value.
+                    old.payload = payload
+                    old.kwargs = kwargs
+                    return
+                self._pending_state[topic] = item
+            elif cls == CLASS_EVENT:
+                # Sent ahead of any queued state for the topic, which is older: drop that.
+                old = self._pending_state.pop(topic, None)
+                if old is not None:
+                    old.cancelled = True
+            self._queues.get(cls, self._queues[CLASS_STATE]).append(item)
+            self._queued += 1
+            if self._queued > MAX_QUEUE:
+                self._drop_lowest()
+            self._cond.notify()
+
+    def _take(self, queue: deque) -> _Item:
+        item = queue.popleft()
+        self._queued -= 1
+        if self._pending_state.get(item.topic) is item:
+            del self._pending_state[item.topic]
+        return item
+
+    def _drop_lowest(self) -> None:
+        # Oldest entry of the lowest-priority non-empty class; the new item is
+        # only dropped when everything already queued outranks it.
+        for cls in reversed(_ORDER):
+            queue = self._queues[cls]
+            if queue:
+                item = self._take(queue)
+                if not item.cancelled:
+                    item.cancelled = True
+                    self.dropped += 1
+                return
+
+    def _pop(self, timeout: float) -> Optional[_Item]:
+        with self._cond:
+            while not self._queued:
+                if self._stop.is_set() or not self._cond.wait(timeout):
+                    return None
+            item = self._take(next(q for q in self._queues.values() if q))
+            return None if item.cancelled else item
+
+    def run_once(self, timeout: float = 0.5) -> bool:
+        """Send the highest-priority queued message once the budgets allow. False if idle/stopped."""
+        if self._ready is not None and not self._ready():
+            # Hold the queue while disconnected instead of losing it to paho.
+            self._stop.wait(timeout)
+            return False
+        item = self._pop(timeout)
+        if item is None:
+            return False
+        size = len(item.topic) + (len(item.payload) if isinstance(item.payload, (str, bytes)) else 8)
+        if not self.msg_bucket.consume(1, self._stop) or not self.byte_bucket.consume(size, self._stop):
+            return False
+        delay = max(0.0, self._clock() - item.queued_at)
+        started = time.perf_counter()
+        self._send(item.topic, item.payload, **item.kwargs)
+        metrics.inc("mqtt_publishes", kind=item.cls)
+        metrics.observe("mqtt_publish_latency_seconds", delay + time.perf_counter() - started, kind=item.cls)
+        with self._cond:
+            st = self._stats[item.cls]
+            st[0] += 1
+            st[1] += delay
+            st[2] = max(st[2], delay)
+        return True
+
+    def take_stats(self) -> dict[str, dict[str, float]]:
+        """Per-class {sent, avg_delay_ms, max_delay_ms} since the last call."""
+        with self._cond:
+            out = {}
+            for cls, (sent, total, worst) in self._stats.items():
+                out[cls] = {
+                    "sent": sent,
+                    "avg_delay_ms": round(1000.0 * total / sent, 1) if sent else 0.0,
+                    "max_delay_ms": round(1000.0 * worst, 1),
+                }
+                self._stats[cls] = [0, 0.0, 0.0]
+            return out
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+
+        def _worker():
+            while not self._stop.is_set():
+                try:
+                    self.run_once()
+                except Exception as e:
+                    print(f"[MQTT] Publish scheduler error: {e}")
+
+        self._thread = threading.Thread(target=_worker, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
@@ -0,0 +1,150 @@
+# radio_manager.py
+"""
+FILE: radio_manager.py
+DESCRIPTION:
+  USB hotplug-aware lifecycle for rtl_loop() threads (opt-in: rtl_hotplug).
+  - Polls the sysfs dongle fingerprint (sdr_enum) every few seconds; this is a
+    directory listing, so it costs nothing while the hardware is unchanged.
+  - On a change it re-runs discovery and the normal radio planning (manual
+    rtl_config matching or auto multi-radio), then stops radios whose dongle
+    disappeared or whose plan changed and starts the new ones.
+  - Radios are identified by their full planned config, so a dongle whose
+    librtlsdr index shifted is restarted with the new index.
+"""
+from __future__ import annotations
+
+import json
+import threading
+from typing import Callable, Optional
+
+import config
+import sdr_enum
+
+# Seconds to let a (re)plugged dongle finish enumerating before acting on it.
+SETTLE_DELAY = 2.0
+
+# Seconds to wait for a stopped rtl_loop to release its dongle.
+STOP_JOIN_TIMEOUT = 10.0
+
+# Seconds between starting radios of one plan (same stagger as a static startup).
+START_STAGGER = 5.0
+
+
+def radio_key(radio: dict) -> str:
+    """Identity of a planned radio (any config change means stop + start)."""
+    return json.dumps(radio, sort_keys=True, default=str)
+
+
+class RadioManager:
+    """Starts/stops rtl_loop threads as RTL-SDR dongles come and go."""
+
+    def __init__(
+        self,
+        planner: Callable[[list], list],
+        discover: Callable[[], list],
+        run_radio: Callable[[dict, threading.Event], None],
+        *,
+        poll_interval: Optional[float] = None,
+        start_stagger: Optional[float] = None,
+    ) -> None:
+        self._planner = planner
+        self._discover = discover
+        self._run_radio = run_radio
+        if poll_interval is None:
+            poll_interval = float(getattr(config, "RTL_HOTPLUG_POLL_INTERVAL", 5) or 5)
+        self.poll_interval = max(1.0, float(poll_interval))
+        self.start_stagger = START_STAGGER if start_stagger is None else max(0.0, float(start_stagger))
+
+        # key -> (radio, stop_event, thread)
+        self.running: dict[str, tuple[dict, threading.Event, threading.Thread]] = {}
+        self._fingerprint: Optional[str] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._poll_thread: Optional[threading.Thread] = None
+
+    def apply(self, detected_devices: list) -> tuple[list[str], list[str]]:
+        """Reconcile running radios with the plan for detected_devices.
+
+        Returns (started_names, stopped_names).
+        """
+        desired = {radio_key(r): r for r in self._planner(detected_devices)}
+        with self._lock:
+            stale = [k for k in self.running if k not in desired]
+            stopped = []
+            for k in stale:
+                radio, ev, thread = self.running.pop(k)
+                ev.set()
+                stopped.append((radio, thread))
+
+            # Let stopped radios release their dongle before a new plan reuses it.
+            for _radio, thread in stopped:
+                thread.join(timeout=STOP_JOIN_TIMEOUT)
+
+            started = []
+            for k, radio in desired.items():
+                if k in self.running:
+                    continue
+                # Let the previous rtl_433 claim its dongle before starting the next.
+                if started and self._stop.wait(self.start_stagger):
+                    break
+                ev = threading.Event()
+                thread = threading.Thread(target=self._run_radio, args=(radio, ev), daemon=True)
+                self.running[k] = (radio, ev, thread)
+                thread.start()
+                started.append(radio.get("name", "Unknown"))
+
+        return started, [r.get("name", "Unknown") for r, _t in stopped]
+
+    def poll_once(self) -> bool:
+        """Check sysfs for a dongle change and re-plan; True if a re-plan ran."""
+        usb = sdr_enum.scan_sysfs()
+        if usb is None:
+            return False
+        fp = sdr_enum.fingerprint(usb)
+        if fp == self._fingerprint:
+            return False
+
+        # Wait for enumeration to settle (serial attributes can appear late).
+        if self._stop.wait(SETTLE_DELAY):
+            return False
+        usb = sdr_enum.scan_sysfs() or []
+        settled = sdr_enum.fingerprint(usb)
+        if settled != fp:
+            return False
+
+        before = len(self._fingerprint.split("|")) if self._fingerprint else 0
+        self._fingerprint = fp
+        print(f"[RTL] USB change detected: {before} -> {len(usb)} RTL-SDR dongle(s). Re-planning radios...")
+        started, stopped = self.apply(self._discover())
+        for name in stopped:
+            print(f"[RTL] Stopped {name} (dongle removed or plan changed).")
+        for name in started:
+            print(f"[RTL] Started {name}.")
+        return True
+
+    def start(self, detected_devices: list) -> None:
+        """Start radios for the current hardware and begin watching for changes."""
+        usb = sdr_enum.scan_sysfs()
+        self._fingerprint = sdr_enum.fingerprint(usb) if usb is not None else None
+        self.apply(detected_devices)
+
+        if usb is None:
+            print("[STARTUP] WARNING: rtl_hotplug is enabled but /sys/bus/usb is not available; radios are fixed.")
+            return
+
+        def _watch():
+            # Event.wait so stop() ends the loop immediately.
+            while not self._stop.wait(self.poll_interval):
+                try:
+                    self.poll_once()
+                except Exception as e:
+                    print(f"[RTL] Hotplug re-plan failed: {e}")
+
+        self._poll_thread = threading.Thread(target=_watch, daemon=True)
+        self._poll_thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        with self._lock:
+            for _radio, ev, _thread in self.running.values():
+                ev.set()
@@ -0,0 +1,278 @@
+# radio_supervisor.py
+"""
+FILE: radio_supervisor.py
+DESCRIPTION:
+  Per-radio supervision for the rtl_433 subprocess started by rtl_loop().
+  - Stdout-inactivity watchdog: learns the radio's normal packet interval and
+    terminates an rtl_433 process that is alive but silent (USB glitch, half-open
+    rtl_tcp socket) so it is restarted within seconds instead of minutes.
+  - Restart policy: crash classification, exponential backoff with jitter and a
+    restart budget (cooldown when a radio keeps failing).
+"""
+from __future__ import annotations
+
+import random
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+
+import config
+
+# Packet intervals needed before the watchdog trusts its learned threshold.
+MIN_LEARNED_INTERVALS = 3
+
+# EWMA smoothing factor for the packet interval (higher = adapts faster).
+INTERVAL_ALPHA = 0.2
+
+# How often the watchdog thread checks for inactivity (seconds).
+WATCHDOG_CHECK_INTERVAL = 5.0
+
+# A run that decoded packets for at least this long resets the backoff streak.
+STABLE_RUN_SECONDS = 300.0
+
+# Friendly status (as published by rtl_loop) -> crash category.
+_STATUS_CATEGORIES = {
+    "Error: No RTL-SDR device found": "no_device",
+    "Error: USB busy / claimed": "usb_busy",
+    "Error: Permission denied": "permission",
+    "Error: Kernel driver active": "kernel_driver",
+    "Error: rtl_433 crashed": "crashed",
+}
+
+# Categories that neither grow the backoff nor count toward the restart budget
+# (user/planned restarts); they reset the failure streak.
+_NEUTRAL_CATEGORIES = {"terminated", "replan", "probe", "stopped"}
+
+
+def _cfg_int(name: str, default: int) -> int:
+    try:
+        return int(getattr(config, name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _cfg_float(name: str, default: float) -> float:
+    try:
+        return float(getattr(config, name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+class RadioSupervisor:
+    """Tracks liveness and restart history for one radio.
+
+    One instance lives for the whole lifetime of an rtl_loop() thread, so the
+    learned packet interval and the restart history survive process restarts.
+    """
+
+    def __init__(
+        self,
+        radio_name: str,
+        *,
+        clock: Callable[[], float] = time.time,
+        rng: Callable[[], float] = random.random,
+        stop_event: Optional[threading.Event] = None,
+    ) -> None:
+        self.radio_name = radio_name
+        self._clock = clock
+        self._rng = rng
+        # Set by the hotplug RadioManager when this radio should shut down for good.
+        self.stop_event = stop_event
+
+        self.watchdog_enabled = bool(getattr(config, "RTL_WATCHDOG_ENABLED", True))
+        self.min_timeout = max(1.0, _cfg_float("RTL_WATCHDOG_MIN_TIMEOUT", 60))
+        self.max_timeout = max(self.min_timeout, _cfg_float("RTL_WATCHDOG_MAX_TIMEOUT", 900))
+        self.factor = max(1.0, _cfg_float("RTL_WATCHDOG_FACTOR", 8))
+
+        self.backoff_base = max(0.0, _cfg_float("RTL_RESTART_BACKOFF_BASE", 5))
+        self.backoff_max = max(self.backoff_base, _cfg_float("RTL_RESTART_BACKOFF_MAX", 300))
+        self.jitter = min(1.0, max(0.0, _cfg_float("RTL_RESTART_JITTER", 0.2)))
+        self.budget = _cfg_int("RTL_RESTART_BUDGET", 10)
+        self.budget_window = max(1, _cfg_int("RTL_RESTART_BUDGET_WINDOW", 600))
+        self.budget_cooldown = max(0.0, _cfg_float("RTL_RESTART_BUDGET_COOLDOWN", 600))
+
+        # Packet interval learning (survives restarts)
+        self.avg_interval: Optional[float] = None
+        self.interval_samples = 0
+        self._last_packet: Optional[float] = None
+
+        # Per-process state
+        self.started_at: Optional[float] = None
+        self.last_activity: Optional[float] = None
+        self.packets_this_run = 0
+        self.stalled = False
+        self.planned_restart: Optional[str] = None
+        self._deadline: Optional[float] = None
+        self._deadline_reason = "replan"
+
+        # Restart history
+        self.failure_streak = 0
+        self.restart_times: deque[float] = deque()
+        self.last_category: Optional[str] = None
+
+        self._watch_stop: Optional[threading.Event] = None
+        self._watch_thread: Optional[threading.Thread] = None
+
+    # --- Activity tracking ---
+    def process_started(self) -> None:
+        now = self._clock()
+        self.started_at = now
+        self.last_activity = now
+        self.packets_this_run = 0
+        self.stalled = False
+        self.planned_restart = None
+        self._deadline = None
+        # The gap across a restart is not a normal packet interval.
+        self._last_packet = None
+
+    def note_line(self) -> None:
+        """Record any stdout line (JSON or log) from rtl_433."""
+        self.last_activity = self._clock()
+
+    def note_packet(self) -> None:
+        """Record a decoded JSON packet and update the learned interval."""
+        now = self._clock()
+        self.last_activity = now
+        self.packets_this_run += 1
+        if self._last_packet is not None:
+            gap = max(0.0, now - self._last_packet)
+            if self.avg_interval is None:
+                self.avg_interval = gap
+            else:
+                self.avg_interval += INTERVAL_ALPHA * (gap - self.avg_interval)
+            self.interval_samples += 1
+        self._last_packet = now
+
+    def stall_timeout(self) -> Optional[float]:
+        """Inactivity threshold in seconds, or None while still learning."""
+        if not self.watchdog_enabled:
+            return None
+        if self.interval_samples < MIN_LEARNED_INTERVALS or self.avg_interval is None:
+            return None
+        return min(self.max_timeout, max(self.min_timeout, self.factor * self.avg_interval))
+
+    def is_stalled(self, now: Optional[float] = None) -> bool:
+        timeout = self.stall_timeout()
+        if timeout is None or self.last_activity is None:
+            return False
+        now = self._clock() if now is None else now
+        return (now - self.last_activity) > timeout
+
+    def schedule_restart(self, delay_s: float, reason: str = "replan") -> None:
+        """Ask the watchdog to restart the current process after delay_s seconds."""
+        self._deadline = self._clock() + max(0.0, float(delay_s))
+        self.planned_restart = None
+        self._deadline_reason = reason
+
+    def check(self, process) -> Optional[str]:
+        """Terminate the process if it stalled or a planned restart is due.
+
+        Returns the reason ("stalled" / "stopped" / planned reason) when it acted, else None.
+        """
+        now = self._clock()
+        reason = None
+        if self.stop_event is not None and self.stop_event.is_set():
+            self.planned_restart = "stopped"
+            reason = "stopped"
+        elif self.is_stalled(now):
+            self.stalled = True
+            reason = "stalled"
+        elif self._deadline is not None and now >= self._deadline:
+            self._deadline = None
+            self.planned_restart = self._deadline_reason
+            reason = self.planned_restart
+
+        if reason is None:
+            return None
+
+        if reason == "stalled":
+            idle = int(now - (self.last_activity or now))
+            print(f"[RTL] WARNING: {self.radio_name} produced no output for {idle}s; restarting rtl_433.")
+        try:
+            process.terminate()
+        except Exception:
+            pass
+        return reason
+
+    # --- Watchdog thread ---
+    def start_watchdog(self, process, check_interval: float = WATCHDOG_CHECK_INTERVAL) -> None:
+        self.stop_watchdog()
+        stop = threading.Event()
+
+        def _watch():
+            # Event.wait (not time.sleep) so stop_watchdog() wakes the thread immediately.
+            while not stop.wait(check_interval):
+                if self.check(process) is not None:
+                    return
+
+        self._watch_stop = stop
+        self._watch_thread = threading.Thread(target=_watch, daemon=True)
+        self._watch_thread.start()
+
+    def stop_watchdog(self) -> None:
+        if self._watch_stop is not None:
+            self._watch_stop.set()
+        self._watch_stop = None
+        self._watch_thread = None
+
+    # --- Restart policy ---
+    def classify_exit(self, returncode: Optional[int], last_status: Optional[str] = None) -> str:
+        """Classify why rtl_433 stopped.
+
+        Returns one of: stalled, replan/probe (planned), no_device, usb_busy, permission,
+        kernel_driver, crashed, terminated, error, exited.
+        """
+        if self.stalled:
+            return "stalled"
+        if self.planned_restart:
+            return self.planned_restart
+        if last_status in _STATUS_CATEGORIES:
+            return _STATUS_CATEGORIES[last_status]
+        if isinstance(returncode, int):
+            if returncode in (-4, -6, -7, -8, -11):  # SIGILL/SIGABRT/SIGBUS/SIGFPE/SIGSEGV
+                return "crashed"
+            if returncode < 0:
+                return "terminated"
+            if returncode > 0:
+                return "error"
+        return "exited"
+
+    def next_delay(self, category: str) -> float:
+        """Record a restart and return how long to wait before starting rtl_433 again.
+
+        Only failures (stalls, crashes, USB errors, ...) grow the backoff and count
+        toward the restart budget.
+        """
+        now = self._clock()
+        self.last_category = category
+
+        # A run that decoded packets for a while counts as healthy: reset the streak.
+        ran_for = now - self.started_at if self.started_at is not None else 0.0
+        healthy_run = self.packets_this_run > 0 and ran_for >= STABLE_RUN_SECONDS
+        if healthy_run or category in _NEUTRAL_CATEGORIES:
+            self.failure_streak = 0
+
+        delay = min(self.backoff_max, self.backoff_base * (2 ** self.failure_streak))
+        if category not in _NEUTRAL_CATEGORIES:
+            self.failure_streak = min(self.failure_streak + 1, 16)
+
+        if self.jitter and delay > 0:
+            delay *= 1.0 + self.jitter * (2.0 * self._rng() - 1.0)
+
+        if category in _NEUTRAL_CATEGORIES:
+            return max(0.0, delay)
+
+        # Restart budget: too many failed runs in the window -> cool down.
+        self.restart_times.append(now)
+        cutoff = now - self.budget_window
+        while self.restart_times and self.restart_times[0] <= cutoff:
+            self.restart_times.popleft()
+        if self.budget > 0 and len(self.restart_times) > self.budget:
+            print(
+                f"[RTL] WARNING: {self.radio_name} exceeded restart budget "
+                f"({len(self.restart_times)} restarts in {self.budget_window}s); cooling down."
+            )
+            delay = max(delay, self.budget_cooldown)
+
+        return max(0.0, delay)
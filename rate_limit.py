@@ -0,0 +1,65 @@
+# rate_limit.py
+"""
+FILE: rate_limit.py
+DESCRIPTION:
+  Token-bucket rate limiting for MQTT publishing.
+  - TokenBucket: `rate` tokens per second, bursts up to `burst` tokens.
+  - consume() blocks on a threading.Event (so shutdown interrupts the wait);
+    try_consume()/delay_for() never block.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Optional
+
+
+class TokenBucket:
+    """Classic token bucket. rate <= 0 means unlimited."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        self.rate = float(rate)
+        self.burst = float(burst) if burst is not None else max(1.0, self.rate)
+        self._clock = clock
+        self._tokens = self.burst
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.rate <= 0
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(0.0, now - self._last)
+        self._last = now
+        self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+
+    def delay_for(self, n: float = 1.0) -> float:
+        """Seconds until n tokens are available (0 if available now)."""
+        if self.unlimited:
+            return 0.0
+        with self._lock:
+            self._refill(self._clock())
+            missing = min(n, self.burst) - self._tokens
+            return max(0.0, missing / self.rate)
+
+    def try_consume(self, n: float = 1.0) -> bool:
+        """Take n tokens if available; never blocks."""
+        if self.unlimited:
+            return True
+        with self._lock:
+            self._refill(self._clock())
+            # Requests larger than the bucket are allowed once it is full.
+            need = min(n, self.burst)
+            if self._tokens >= need:
+                self._tokens -= n
+                return True
+            return False
+
+    def consume(self, n: float = 1.0, stop_event: Optional[threading.Event] = None) -> bool:
+        """Block until n tokens were taken. Returns False if stop_event was set first."""
+        stop_event = stop_event or threading.Event()
+        while not self.try_consume(n):
+            if stop_event.wait(max(0.001, self.delay_for(n))):
+                return False
+        return True
@@ -0,0 +1,143 @@
+# resync.py
+"""
+FILE: resync.py
+DESCRIPTION:
+  Reconnect resync for HomeNodeMQTT (mqtt_resync).
+  - ResyncCache remembers the last retained discovery config and state per
+    topic, with an importance rank (0 = main sensors, 1 = everything else).
+  - plan() orders a replay: rank 0 configs, rank 0 states, rank 1 configs,
+    rank 1 states. A broker restarted without persistence gets the important
+    entities back first instead of waiting hours for the next transmission.
+  - The plan only holds topics. replay() looks up the current entry right
+    before sending it (ResyncPlan.current), so a topic that was published again
+    after the plan was built is skipped instead of being overwritten with an
+    older value. It sends through a TokenBucket and stops as soon as the
+    connection drops again.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Iterable, Optional
+
+from rate_limit import TokenBucket
+
+RANK_MAIN = 0
+RANK_OTHER = 1
+
+
+class ResyncEntry:
+    __slots__ = ("topic", "payload", "rank", "expiry", "user_properties", "stamped", "seq")
+
+    def __init__(self, topic, payload, rank=RANK_OTHER, expiry=None, user_properties=None, seq=0):
+        self.topic = topic
+        self.payload = payload
+        self.rank = rank
+        self.expiry = expiry
+        self.user_properties = user_properties
+        self.stamped = time.monotonic()
+        self.seq = seq
+
+    def remaining_expiry(self, now: Optional[float] = None) -> Optional[int]:
+        """Seconds of validity left, None if it never expires, <= 0 if stale."""
+        if not self.expiry:
+            return None
+        now = time.monotonic() if now is None else now
+        return int(self.expiry - (now - self.stamped))
+
+
+class ResyncPlan(list):
+    """Replay order as (kind, topic); entries are read from the cache when sent."""
+
+    def __init__(self, cache: "ResyncCache", items, seq: int) -> None:
+        super().__init__(items)
+        self.cache = cache
+        self.seq = seq
+
+    def current(self, kind: str, topic: str) -> Optional[ResyncEntry]:
+        """The entry to replay, or None if it was forgotten or published again since the plan."""
+        entry = self.cache.get(kind, topic)
+        if entry is None or entry.seq > self.seq:
+            return None
+        return entry
+
+
+class ResyncCache:
+    """Last retained config/state per topic (thread-safe)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._seq = 0
+        self.configs: dict[str, ResyncEntry] = {}
+        self.states: dict[str, ResyncEntry] = {}
+
+    def remember_config(self, topic, payload, rank=RANK_OTHER) -> None:
+        with self._lock:
+            if payload in (None, "", b""):
+                self.configs.pop(topic, None)
+            else:
+                self._seq += 1
+                self.configs[topic] = ResyncEntry(topic, payload, rank, seq=self._seq)
+
+    def remember_state(self, topic, payload, rank=RANK_OTHER, expiry=None, user_properties=None) -> None:
+        with self._lock:
+            self._seq += 1
+            self.states[topic] = ResyncEntry(topic, payload, rank, expiry, user_properties, self._seq)
+
+    def get(self, kind: str, topic: str) -> Optional[ResyncEntry]:
+        with self._lock:
+            return (self.configs if kind == "config" else self.states).get(topic)
+
+    def forget(self, topic) -> None:
+        with self._lock:
+            self.configs.pop(topic, None)
+            self.states.pop(topic, None)
+
+    def topics(self) -> list[str]:
+        """Every remembered config and state topic."""
+        with self._lock:
+            return list(self.configs) + list(self.states)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.configs.clear()
+            self.states.clear()
+
+    def plan(self, skip_states: Iterable[str] = ()) -> ResyncPlan:
+        """Replay order as (kind, topic): per rank, configs before states."""
+        skip = set(skip_states)
+        with self._lock:
+            configs = [(e.rank, e.topic) for e in self.configs.values()]
+            states = [(e.rank, e.topic) for e in self.states.values() if e.topic not in skip]
+            seq = self._seq
+        out = []
+        for rank in sorted({r for r, _t in configs} | {r for r, _t in states}):
+            out.extend(("config", t) for r, t in configs if r == rank)
+            out.extend(("state", t) for r, t in states if r == rank)
+        return ResyncPlan(self, out, seq)
+
+
+def replay(
+    plan: ResyncPlan,
+    publish: Callable[[str, str], Optional[bool]],
+    rate: float,
+    stop_event: Optional[threading.Event] = None,
+) -> int:
+    """Publish plan topics at `rate` msg/s. Returns the sent count.
+
+    publish(kind, topic) looks up the current entry itself: it returns False to
+    abort, None if the topic no longer needs a replay, True once sent.
+    """
+    bucket = TokenBucket(rate)
+    sent = 0
+    for kind, topic in plan:
+        if plan.current(kind, topic) is None:
+            continue  # don't wait for a token just to skip it
+        if not bucket.consume(1, stop_event):
+            break
+        result = publish(kind, topic)
+        if result is False:
+            break
+        if result:
+            sent += 1
+    return sent
@@ -0,0 +1,101 @@
+# rtl_log_classifier.py
+"""
+FILE: rtl_log_classifier.py
+DESCRIPTION:
+  Classifies non-JSON rtl_433 / librtlsdr log lines with ONE precompiled regex.
+  - Fatal conditions map to the friendly radio status strings used by rtl_loop().
+  - Performance-degradation events (lost/dropped samples, async read buffer
+    problems, PLL lock failures, overload) are counted per radio so slow hosts
+    show up before decode yield silently drops.
+"""
+from __future__ import annotations
+
+import re
+from typing import NamedTuple, Optional
+
+# (category, kind, regex alternatives). Order = priority when several match one line.
+_RULES = [
+    # Noise: never actionable (checked first so it can't trip a status mapping)
+    ("noise", "noise", [r"detached kernel driver", r"detaching kernel driver"]),
+    # Fatal: mapped to a radio status + health error
+    ("fatal", "no_device", [r"no supported devices", r"no matching device", r"found 0 device"]),
+    ("fatal", "usb_busy", [r"usb_claim_interface", r"device or resource busy"]),
+    ("fatal", "permission", [r"permission denied"]),
+    ("fatal", "kernel_driver", [r"kernel driver is active"]),
+    ("fatal", "crashed", [r"illegal instruction", r"segmentation fault"]),
+    # Degradation: counted per radio
+    (
+        "degraded",
+        "sample_drop",
+        [
+            r"lost \d+ samples",
+            r"samples? (?:were )?(?:lost|dropped)",
+            r"dropped \d* ?samples",
+            r"(?:buffer|sample) overrun",
+            r"libusb_error_overflow",
+        ],
+    ),
+    (
+        "degraded",
+        "async_buffer",
+        [
+            r"async read stalled",
+            r"rtlsdr_read_async",
+            r"failed to submit transfer",
+            r"cb transfer status",
+            r"async (?:read )?buffer",
+        ],
+    ),
+    ("degraded", "pll_unlock", [r"pll not locked", r"pll (?:lock )?(?:failed|unlocked)"]),
+    ("degraded", "overload", [r"overload", r"clipping", r"adc saturat"]),
+]
+
+# Fatal kind -> friendly HA status (kept identical to the historical rtl_loop strings).
+FATAL_STATUS = {
+    "no_device": "Error: No RTL-SDR device found",
+    "usb_busy": "Error: USB busy / claimed",
+    "permission": "Error: Permission denied",
+    "kernel_driver": "Error: Kernel driver active",
+    "crashed": "Error: rtl_433 crashed",
+}
+
+# Degradation kind -> (per-radio field base, friendly label for health reasons)
+DEGRADATION_KINDS = {
+    "sample_drop": ("radio_sample_drops", "sample drops"),
+    "async_buffer": ("radio_async_errors", "async read errors"),
+    "pll_unlock": ("radio_pll_unlocks", "PLL not locked"),
+    "overload": ("radio_overloads", "tuner overload"),
+}
+
+_GROUPS = [(f"g{i}", cat, kind) for i, (cat, kind, _alts) in enumerate(_RULES)]
+_PRIORITY = {g: i for i, (g, _c, _k) in enumerate(_GROUPS)}
+_LINE_RE = re.compile(
+    "|".join(f"(?P<{g}>{'|'.join(alts)})" for (g, _c, _k), (_cat, _kind, alts) in zip(_GROUPS, _RULES)),
+    re.IGNORECASE,
+)
+_GROUP_INFO = {g: (cat, kind) for g, cat, kind in _GROUPS}
+
+
+class LogClass(NamedTuple):
+    category: str  # noise | fatal | degraded
+    kind: str
+    status: Optional[str] = None
+
+
+def classify_log_line(line: str) -> Optional[LogClass]:
+    """Classify one non-JSON rtl_433 output line; None if it is not recognized."""
+    if not line:
+        return None
+    best = None
+    for m in _LINE_RE.finditer(line):
+        g = m.lastgroup
+        if g is None:
+            continue
+        if best is None or _PRIORITY[g] < _PRIORITY[best]:
+            best = g
+            if _PRIORITY[g] == 0:
+                break
+    if best is None:
+        return None
+    category, kind = _GROUP_INFO[best]
+    return LogClass(category, kind, FATAL_STATUS.get(kind))
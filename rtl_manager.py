@@ -11,7 +11,9 @@ import copy
 import sys
 import os
 import shlex
+import threading
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 from datetime import datetime
 from typing import Optional
@@ -19,6 +21,16 @@ from typing import Optional
 import config
 from utils import clean_mac, calculate_dew_point
 from sdr_health import get_health_monitor
+from radio_supervisor import RadioSupervisor
+from rtl_log_classifier import classify_log_line, DEGRADATION_KINDS
+from protocol_profile import get_protocol_profiles, radio_uses_explicit_protocols
+from hop_scheduler import HopScheduler
+from admission import get_admission_gate
+from model_prefilter import get_model_prefilter
+from field_projection import get_field_projection
+from signal_quality import SIGNAL_FIELDS, SignalGate
+import metrics
+import sdr_enum
 
 # --- Process Tracking ---
 ACTIVE_PROCESSES = []
@@ -209,6 +221,13 @@ def _ensure_rtl433_outputs(cmd: list[str], *, radio_label: str, global_map: dict
         # Also add '-M time' if rtl_publish_timestamps is enabled
         if getattr(config, "RTL_PUBLISH_TIMESTAMPS", False):
             cmd.extend(["-M", "time"])
+        # Protocol learning needs the decoder number in each packet
+        if getattr(config, "RTL_PROTOCOL_LEARNING", False):
+            cmd.extend(["-M", "protocol"])
+    elif getattr(config, "RTL_PROTOCOL_LEARNING", False) and not any(
+        vals and vals[0].lower() == "protocol" for vals in opt_map.get("-M", [])
+    ):
+        print(f"WARNING: rtl_protocol_learning is enabled but -M is set without 'protocol' for {radio_label}; nothing will be learned.")
 
     return cmd
 
@@ -276,6 +295,15 @@ def _write_inline_config(inline: str, radio_name: str, radio_id: str) -> str:
         return ""
 
 
+def _global_args_set(*keys: str) -> bool:
+    """True if global RTL_433_ARGS sets any of the given options (they override per-radio values)."""
+    global_args = _parse_extra_args(getattr(config, "RTL_433_ARGS", ""))
+    if not global_args:
+        return False
+    opt_map = _argv_option_map(global_args)
+    return any(k in opt_map for k in keys)
+
+
 def build_rtl_433_command(radio_config: dict) -> list[str]:
     """Build the rtl_433 command for a single radio.
 
@@ -475,6 +503,41 @@ def _publish_radio_status(
     )
 
 
+def _publish_degradation_counts(
+    mqtt_handler,
+    sys_id: str,
+    sys_model: str,
+    status_field: str,
+    radio_name: str,
+    counts: dict,
+) -> None:
+    """Publish per-radio degradation counters (only kinds that occurred at least once)."""
+    suffix = status_field[len("radio_status_"):]
+    named = bool(radio_name and str(radio_name).strip() and str(radio_name).strip().lower() != "unknown")
+    for kind, count in counts.items():
+        if not count or kind not in DEGRADATION_KINDS:
+            continue
+        base, label = DEGRADATION_KINDS[kind]
+        friendly = f"{radio_name} {label.title()}" if named else None
+        _publish_radio_status(mqtt_handler, sys_id, sys_model, f"{base}_{suffix}", count, friendly_name=friendly)
+
+
+def _publish_signal_stats(
+    mqtt_handler,
+    sys_id: str,
+    sys_model: str,
+    status_field: str,
+    radio_name: str,
+    stats: dict,
+) -> None:
+    """Publish per-radio signal averages, histograms and weak-packet drops."""
+    suffix = status_field[len("radio_status_"):]
+    named = bool(radio_name and str(radio_name).strip() and str(radio_name).strip().lower() != "unknown")
+    for base, value in stats.items():
+        friendly = f"{radio_name} {SIGNAL_FIELDS.get(base, base)}" if named else None
+        _publish_radio_status(mqtt_handler, sys_id, sys_model, f"{base}_{suffix}", value, friendly_name=friendly)
+
+
 def trigger_radio_restart():
     """Terminates all running radios."""
     print("[RTL] User requested restart. Stopping processes...")
@@ -514,14 +577,16 @@ def _debug_dump_packet(
 
     Highlights:
       - UNSUPPORTED = published field missing FIELD_META entry
+      - INFERRED = missing from FIELD_META, unit/class taken from the field's unit suffix
       - Prints FIELD_META stubs for quick copy/paste
       - Preserves rtl_433's own "time" field
       - Prints raw JSON as a clean single line (no prefixes)
     """
     try:
-        from field_meta import FIELD_META
+        from field_meta import FIELD_META, infer_field_meta
     except Exception:
         FIELD_META = {}
+        infer_field_meta = lambda field: None  # noqa: E731
 
     skip = set(getattr(config, "SKIP_KEYS", []) or [])
 
@@ -642,11 +707,18 @@ def _debug_dump_packet(
         source = item["source"]
 
         meta = FIELD_META.get(field)
+        inferred = None if meta else infer_field_meta(field)
 
         if meta:
             unit, dev_class, icon, friendly = meta
             prefix = "[SUPPORTED]"
             meta_s = f"unit={unit or '-'} class={dev_class or '-'} icon={icon or '-'} name={friendly or '-'}"
+        elif inferred:
+            # Published with the suffix-inferred metadata; still worth a FIELD_META entry.
+            unit, dev_class, icon, friendly = inferred
+            prefix = "[INFERRED]"
+            missing.add(field)
+            meta_s = f"unit={unit or '-'} class={dev_class or '-'} icon={icon or '-'} name={friendly or '-'}"
         else:
             # This is what mqtt_handler will effectively do: default_meta
             prefix = "[UNSUPPORTED]"
@@ -658,10 +730,10 @@ def _debug_dump_packet(
 
     if missing:
         print(f"[JSONDUMP] unsupported fields missing FIELD_META ({len(missing)}): {', '.join(sorted(missing))}")
-        print("[JSONDUMP] FIELD_META stubs (paste into field_meta.py):")
+        print("[JSONDUMP] FIELD_META stubs (paste into field_meta.json or your field_meta_overlay):")
         for f in sorted(missing):
-            friendly = _default_friendly(f)
-            print(f'[JSONDUMP]   "{f}": (None, "none", "{default_icon}", "{friendly}"),')
+            stub = infer_field_meta(f) or (None, "none", default_icon, _default_friendly(f))
+            print(f"[JSONDUMP]   {json.dumps(f)}: {json.dumps(list(stub), ensure_ascii=False)},")
 
     print("[JSONDUMP] END\n")
 
@@ -712,52 +784,115 @@ def is_allowed_device(clean_id: str, model: str, dev_type: str, raw_id: Optional
     return False
 
 
-def discover_rtl_devices():
+def _probe_rtl_eeprom(index: int) -> Optional[tuple[str, int]]:
+    """Run rtl_eeprom for one index; returns (output, returncode) or None if rtl_eeprom is missing."""
+    try:
+        proc = subprocess.run(
+            ["rtl_eeprom", "-d", str(index)],
+            capture_output=True,
+            text=True,
+            # rtl_eeprom output can include non-UTF8 bytes depending on dongle EEPROM
+            # contents. Without this, Python may raise UnicodeDecodeError while decoding
+            # stdout/stderr (e.g., byte 0xFF).
+            errors="replace",
+            timeout=5,
+        )
+    except FileNotFoundError:
+        return None
+    except subprocess.TimeoutExpired:
+        return ("", -1)
+    return ((proc.stdout or "") + (proc.stderr or ""), proc.returncode)
+
+
+def _parse_eeprom_serial(output: str) -> Optional[str]:
+    for line in output.splitlines():
+        if "Serial number" in line or "serial number" in line or "S/N" in line:
+            parts = line.split(":", 1)
+            if len(parts) == 2:
+                candidate = parts[1].strip()
+                if candidate:
+                    return candidate.split()[0]
+    return None
+
+
+def _probe_devices(indices: list[int]) -> Optional[list[dict]]:
+    """Probe indices with rtl_eeprom in parallel; None if rtl_eeprom is not installed."""
+    if not indices:
+        return []
+    with ThreadPoolExecutor(max_workers=len(indices)) as pool:
+        results = list(pool.map(_probe_rtl_eeprom, indices))
+
     devices = []
-    index = 0
-    while index < 8:
-        try:
-            proc = subprocess.run(
-                ["rtl_eeprom", "-d", str(index)],
-                capture_output=True,
-                text=True,
-                # rtl_eeprom output can include non-UTF8 bytes depending on dongle EEPROM
-                # contents. Without this, Python may raise UnicodeDecodeError while decoding
-                # stdout/stderr (e.g., byte 0xFF).
-                errors="replace",
-                timeout=5,
-            )
-        except FileNotFoundError:
+    for index, result in zip(indices, results):
+        if result is None:
             print("[STARTUP] WARNING: rtl_eeprom not found; cannot auto-detect.")
-            break
+            return None
 
-        output = (proc.stdout or "") + (proc.stderr or "")
+        output, returncode = result
         if "No supported devices" in output or "No matching device" in output:
             break
 
-        serial = None
-        for line in output.splitlines():
-            if "Serial number" in line or "serial number" in line or "S/N" in line:
-                parts = line.split(":", 1)
-                if len(parts) == 2:
-                    candidate = parts[1].strip()
-                    if candidate:
-                        serial = candidate.split()[0]
-                        break
-
+        serial = _parse_eeprom_serial(output)
         if serial:
             print(f"[STARTUP] Found RTL-SDR at index {index}: Serial {serial}")
             devices.append({"name": f"RTL_{serial}", "id": serial, "index": index})
-        else:
-            if proc.returncode == 0:
-                devices.append({"name": f"RTL_Index_{index}", "id": str(index), "index": index})
+        elif returncode == 0:
+            devices.append({"name": f"RTL_Index_{index}", "id": str(index), "index": index})
+    return devices
 
-        index += 1
 
+def discover_rtl_devices():
+    """Enumerate attached RTL-SDR dongles as [{"name", "id", "index"}].
+
+    sysfs answers "how many and which serials" without opening any device. rtl_eeprom
+    is only needed to pin the librtlsdr index of each serial when several dongles are
+    attached; those probes run in parallel and their result is cached until the set
+    of attached dongles changes. Without sysfs (non-Linux, restricted containers) all
+    indices are probed in parallel.
+    """
+    usb = sdr_enum.scan_sysfs()
+
+    if usb is None:
+        return _probe_devices(list(range(8))) or []
+
+    if not usb:
+        return []
+
+    if len(usb) == 1 and usb[0]["serial"]:
+        serial = usb[0]["serial"]
+        print(f"[STARTUP] Found RTL-SDR at index 0: Serial {serial}")
+        return [{"name": f"RTL_{serial}", "id": serial, "index": 0}]
+
+    fp = sdr_enum.fingerprint(usb)
+    cached = sdr_enum.load_cached_devices(fp)
+    if cached is not None:
+        for d in cached:
+            print(f"[STARTUP] Found RTL-SDR at index {d.get('index')}: Serial {d.get('id')} (cached)")
+        return cached
+
+    devices = _probe_devices(list(range(len(usb))))
+    if devices is None:
+        # rtl_eeprom missing: fall back to sysfs order (index mapping is best-effort).
+        devices = []
+        for index, d in enumerate(usb):
+            serial = d["serial"] or str(index)
+            devices.append({"name": f"RTL_{serial}" if d["serial"] else f"RTL_Index_{index}", "id": serial, "index": index})
+        return devices
+
+    if len(devices) == len(usb):
+        sdr_enum.save_cached_devices(fp, devices)
     return devices
 
 
-def rtl_loop(radio_config: dict, mqtt_handler, data_processor, sys_id: str, sys_model: str) -> None:
+def rtl_loop(
+    radio_config: dict,
+    mqtt_handler,
+    data_processor,
+    sys_id: str,
+    sys_model: str,
+    stop_event: Optional[threading.Event] = None,
+) -> None:
+    """Run rtl_433 for one radio forever (or until stop_event is set) and dispatch its packets."""
     radio_name = radio_config.get("name", "Unknown")
     radio_id = radio_config.get("id", "0")
 
@@ -789,15 +924,94 @@ def rtl_loop(radio_config: dict, mqtt_handler, data_processor, sys_id: str, sys_
 
     last_online_mark = 0.0
     last_error_line = None
+    last_status = None
     ts_refresh_s = 30
 
+    # Performance-degradation events seen in rtl_433 logs (cumulative per radio)
+    degradation_counts: dict[str, int] = {}
+    degradation_dirty = False
+    last_degradation_publish = 0.0
+
+    # Watchdog + restart policy (learned packet interval survives restarts)
+    supervisor = RadioSupervisor(radio_name, stop_event=stop_event)
+
+    # Decoder learning: count protocol numbers; optionally run with a pruned -R set,
+    # alternating with full-decoder probe windows so new device types are still found.
+    profiles = get_protocol_profiles() if getattr(config, "RTL_PROTOCOL_LEARNING", False) else None
+    autoprune = (
+        profiles is not None
+        and getattr(config, "RTL_PROTOCOL_AUTOPRUNE", False)
+        and not radio_uses_explicit_protocols(radio_config)
+    )
+    probe_interval = float(getattr(config, "RTL_PROTOCOL_PROBE_INTERVAL", 86400) or 0)
+    probe_duration = float(getattr(config, "RTL_PROTOCOL_PROBE_DURATION", 1800) or 0)
+    next_probe_at = None
+
+    # Adaptive hopping: repeat productive frequencies in the -f list.
+    hopper = None
+    if getattr(config, "RTL_HOP_ADAPTIVE", False) and len(frequencies) > 1 and not _global_args_set("-f", "-H"):
+        hopper = HopScheduler(frequencies, radio_name)
+        if not hopper.enabled:
+            hopper = None
+
+    # Admission gate: new device IDs need N sightings (or a strong signal) before discovery.
+    gate = get_admission_gate()
+    if not gate.enabled:
+        gate = None
+    else:
+        gate.bind(getattr(mqtt_handler, "device_registry", None))
+
+    # Blacklisted models are dropped from the raw line, before json.loads.
+    prefilter = get_model_prefilter()
+    if not prefilter.enabled:
+        prefilter = None
+
+    # Signal-quality gate + per-radio snr/rssi histograms (-M level metadata)
+    signal = SignalGate(radio_config)
+
+    # Per-model / per-device field selection (device_fields)
+    projection = get_field_projection()
+    if not projection.enabled:
+        projection = None
+
+    category = None
+    run_cmd = cmd
+
     while True:
+        if stop_event is not None and stop_event.is_set():
+            break
+
         process = None
+        last_status = None
+
+        # Pick this run's decoder set (a "probe" restart always runs every decoder)
+        # and hop plan; only rebuild the command when something is adaptive.
+        prune_phase = None
+        probe_scheduled = False
+        run_config = radio_config
+        if autoprune:
+            if category != "probe" and profiles.ready(status_field):
+                prune_phase = "pruned"
+                run_config = dict(run_config, protocols=profiles.recommended(status_field))
+                if next_probe_at is None:
+                    next_probe_at = time.time() + probe_interval
+            else:
+                prune_phase = "probe"
+                next_probe_at = None
+        if hopper is not None:
+            run_config = dict(run_config, freq=hopper.freq_arg())
+        if run_config is not radio_config:
+            next_cmd = build_rtl_433_command(run_config)
+            if next_cmd != run_cmd:
+                run_cmd = next_cmd
+                label = {"pruned": ", pruned decoders", "probe": ", all decoders (probe)"}.get(prune_phase, "")
+                print(f"[STARTUP] rtl_433 cmd [{radio_name} id={radio_id}{label}]: {_format_cmd(run_cmd)}")
+
         try:
             _publish_radio_status(mqtt_handler, sys_id, sys_model, status_field, "Rebooting...", friendly_name=status_friendly)
 
             process = subprocess.Popen(
-                cmd,
+                run_cmd,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
                 text=True,
@@ -807,6 +1021,13 @@ def rtl_loop(radio_config: dict, mqtt_handler, data_processor, sys_id: str, sys_
                 bufsize=1,
             )
             ACTIVE_PROCESSES.append(process)
+            supervisor.process_started()
+            if prune_phase == "pruned" and probe_interval > 0:
+                supervisor.schedule_restart(max(0.0, next_probe_at - time.time()), reason="probe")
+            elif prune_phase == "probe" and profiles.ready(status_field):
+                supervisor.schedule_restart(probe_duration, reason="replan")
+                probe_scheduled = True
+            supervisor.start_watchdog(process)
 
             _publish_radio_status(mqtt_handler, sys_id, sys_model, status_field, "Scanning...", friendly_name=status_friendly)
 
@@ -830,15 +1051,27 @@ def rtl_loop(radio_config: dict, mqtt_handler, data_processor, sys_id: str, sys_
                     continue
 
                 empty_reads = 0
+                supervisor.note_line()
+                metrics.inc("rtl_lines", radio=radio_name)
 
                 raw = line.strip()
                 if not raw:
                     continue
 
-
+                if prefilter is not None and prefilter.blocked(raw):
+                    # Still a decoded packet: keeps the stall watchdog and health monitor fed.
+                    supervisor.note_packet()
+                    metrics.inc("rtl_packets", radio=radio_name)
+                    metrics.inc("rtl_packets_filtered", radio=radio_name, reason="prefilter")
+                    health = get_health_monitor()
+                    health.record_data_received(radio_name)
+                    health.clear_error(radio_name)
+                    continue
 
                 try:
                     data = json.loads(raw)
+                    supervisor.note_packet()
+                    metrics.inc("rtl_packets", radio=radio_name)
 
                     data_raw = None
                     if getattr(config, "DEBUG_RAW_JSON", False):
@@ -876,6 +1109,19 @@ def rtl_loop(radio_config: dict, mqtt_handler, data_processor, sys_id: str, sys_
 
                     last_error_line = None
 
+                    if signal.due(now):
+                        _publish_signal_stats(
+                            mqtt_handler, sys_id, sys_model, status_field, radio_name, signal.take()
+                        )
+
+                    # Flush degradation counters that were rate-limited while events were bursting.
+                    if degradation_dirty and (now - last_degradation_publish) >= ts_refresh_s:
+                        last_degradation_publish = now
+                        degradation_dirty = False
+                        _publish_degradation_counts(
+                            mqtt_handler, sys_id, sys_model, status_field, radio_name, degradation_counts
+                        )
+
                     model = data.get("model", "Unknown")
                     raw_id = data.get("id", "Unknown")
                     clean_id = clean_mac(raw_id)
@@ -883,24 +1129,56 @@ def rtl_loop(radio_config: dict, mqtt_handler, data_processor, sys_id: str, sys_
                     dev_type = data.get("type", "Untyped")
 
                     if is_blocked_device(clean_id, model, dev_type):
+                        metrics.inc("rtl_packets_filtered", radio=radio_name, reason="blacklist")
                         continue
 
                     if not is_allowed_device(clean_id, model, dev_type, raw_id=raw_id):
+                        metrics.inc("rtl_packets_filtered", radio=radio_name, reason="whitelist")
+                        continue
+
+                    # Marginal decodes (often corrupted IDs) below the snr/rssi threshold
+                    if not signal.check(model, data):
+                        metrics.inc("rtl_packets_filtered", radio=radio_name, reason="signal")
                         continue
 
+                    # Learn which decoders this radio needs (before SKIP_KEYS drops "protocol")
+                    if profiles is not None:
+                        profiles.record(status_field, data.get("protocol"))
+                        if profiles.save():
+                            profiles.log_recommendation(status_field, radio_name)
+                        if prune_phase == "probe" and not probe_scheduled and profiles.ready(status_field):
+                            # Enough traffic seen: finish this full-decoder window, then prune.
+                            supervisor.schedule_restart(probe_duration, reason="replan")
+                            probe_scheduled = True
+
+                    if hopper is not None:
+                        hopper.record(data.get("freq"))
+                        # During a probe window the already scheduled restart applies the new plan.
+                        if hopper.maybe_replan() and not probe_scheduled:
+                            supervisor.schedule_restart(0, reason="replan")
+
+                    if gate is not None and not gate.admit(clean_id, data.get("rssi")):
+                        metrics.inc("rtl_packets_filtered", radio=radio_name, reason="admission")
+                        continue
+
+                    # Field selection for this device (None = publish everything)
+                    rule = projection.rule_for(model, clean_id) if projection is not None else None
+
                     # Neptune R900 Water Meter
                     if "Neptune-R900" in model and data.get("consumption") is not None:
-                        real_val = float(data["consumption"]) / 10.0
-                        data_processor.dispatch_reading(
-                            clean_id, "meter_reading", real_val, dev_name, model, radio_name=radio_name, radio_freq=freq_display
-                        )
+                        if rule is None or rule.keeps("meter_reading"):
+                            real_val = float(data["consumption"]) / 10.0
+                            data_processor.dispatch_reading(
+                                clean_id, "meter_reading", real_val, dev_name, model, radio_name=radio_name, radio_freq=freq_display
+                            )
                         del data["consumption"]
 
                     # SCM / ERT Meters
                     if ("SCM" in model or "ERT" in model) and data.get("consumption") is not None:
-                        data_processor.dispatch_reading(
-                            clean_id, "Consumption", data["consumption"], dev_name, model, radio_name=radio_name, radio_freq=freq_display
-                        )
+                        if rule is None or rule.keeps("Consumption"):
+                            data_processor.dispatch_reading(
+                                clean_id, "Consumption", data["consumption"], dev_name, model, radio_name=radio_name, radio_freq=freq_display
+                            )
                         del data["consumption"]
 
                     # Dew point
@@ -908,7 +1186,7 @@ def rtl_loop(radio_config: dict, mqtt_handler, data_processor, sys_id: str, sys_
                     if t_c is None and "temperature_F" in data:
                         t_c = (data["temperature_F"] - 32) * 5 / 9
 
-                    if t_c is not None and data.get("humidity") is not None:
+                    if t_c is not None and data.get("humidity") is not None and (rule is None or rule.keeps("dew_point")):
                         dp_f = calculate_dew_point(t_c, data["humidity"])
                         if dp_f is not None:
                             data_processor.dispatch_reading(
@@ -917,6 +1195,9 @@ def rtl_loop(radio_config: dict, mqtt_handler, data_processor, sys_id: str, sys_
 
                     # Flatten + dispatch
                     # Flatten + dispatch
+                    if rule is not None:
+                        data = {k: v for k, v in data.items() if rule.keeps_key(k)}
+
                     if getattr(config, "DEBUG_RAW_JSON", False):
                         _debug_dump_packet(
                             raw_line=raw,
@@ -947,29 +1228,36 @@ def rtl_loop(radio_config: dict, mqtt_handler, data_processor, sys_id: str, sys_
                                 clean_id, key, value, dev_name, model, radio_name=radio_name, radio_freq=freq_display
                             )
 
-                except json.JSONDecodeError:
-                    # Logs/errors from rtl_433 / librtlsdr
-                    low = raw.lower()
+                    # One JSON state publish per packet (mqtt_state_mode=json).
+                    end_packet = getattr(data_processor, "end_packet", None)
+                    if end_packet is not None:
+                        end_packet(clean_id)
 
-                    # Ignore common noise
-                    if "detached kernel driver" in low or "detaching kernel driver" in low:
+                except json.JSONDecodeError:
+                    metrics.inc("rtl_json_errors", radio=radio_name)
+                    # Logs/errors from rtl_433 / librtlsdr (single precompiled classifier)
+                    log_class = classify_log_line(raw)
+                    if log_class is None or log_class.category == "noise":
                         continue
 
-                    # --- Friendly HA status mappings (check BEFORE noise filters) ---
-                    status = None
-                    if "no supported devices" in low or "no matching device" in low or "found 0 device" in low:
-                        status = "Error: No RTL-SDR device found"
-                    elif "usb_claim_interface" in low or "device or resource busy" in low:
-                        status = "Error: USB busy / claimed"
-                    elif "permission denied" in low:
-                        status = "Error: Permission denied"
-                    elif "kernel driver is active" in low:
-                        status = "Error: Kernel driver active"
-                    elif "illegal instruction" in low or "segmentation fault" in low:
-                        status = "Error: rtl_433 crashed"
+                    if log_class.category == "degraded":
+                        degradation_counts[log_class.kind] = degradation_counts.get(log_class.kind, 0) + 1
+                        get_health_monitor().record_degradation(radio_name, log_class.kind)
+                        degradation_dirty = True
+                        now = time.time()
+                        if (now - last_degradation_publish) >= ts_refresh_s:
+                            last_degradation_publish = now
+                            degradation_dirty = False
+                            _publish_degradation_counts(
+                                mqtt_handler, sys_id, sys_model, status_field, radio_name, degradation_counts
+                            )
+                        continue
 
+                    # --- Friendly HA status mappings ---
+                    status = log_class.status
                     if status is not None:
                         last_error_line = raw[:160]
+                        last_status = status
                         _publish_radio_status(
                             mqtt_handler,
                             sys_id,
@@ -982,10 +1270,6 @@ def rtl_loop(radio_config: dict, mqtt_handler, data_processor, sys_id: str, sys_
                         health = get_health_monitor()
                         health.record_error(radio_name, status.replace("Error: ", ""))
                         continue
-
-                    # Ignore startup chatter that isn't actionable
-                    if "using device" in low or ("found" in low and "device" in low):
-                        continue
                 except Exception as e:
                     print(f"[RTL] Error processing line: {e}")
 
@@ -993,7 +1277,18 @@ def rtl_loop(radio_config: dict, mqtt_handler, data_processor, sys_id: str, sys_
             _publish_radio_status(mqtt_handler, sys_id, sys_model, status_field, f"Error: {e}", friendly_name=status_friendly)
             print(f"[RTL] Subprocess crashed or failed to start: {e}")
 
+        supervisor.stop_watchdog()
+
+        if profiles is not None:
+            profiles.save(force=True)
+            profiles.log_recommendation(status_field, radio_name)
+
+        if degradation_dirty:
+            degradation_dirty = False
+            _publish_degradation_counts(mqtt_handler, sys_id, sys_model, status_field, radio_name, degradation_counts)
+
         # Cleanup before restart
+        rc = None
         if process:
             if process in ACTIVE_PROCESSES:
                 ACTIVE_PROCESSES.remove(process)
@@ -1008,7 +1303,12 @@ def rtl_loop(radio_config: dict, mqtt_handler, data_processor, sys_id: str, sys_
                     pass
 
             rc = process.poll()
-            if rc is not None and rc != 0:
+            if supervisor.stalled:
+                _publish_radio_status(
+                    mqtt_handler, sys_id, sys_model, status_field, "Error: rtl_433 stalled (no output)", friendly_name=status_friendly
+                )
+                get_health_monitor().record_error(radio_name, "rtl_433 stalled")
+            elif rc is not None and rc != 0 and not supervisor.planned_restart:
                 if last_error_line:
                     _publish_radio_status(
                         mqtt_handler, sys_id, sys_model, status_field, f"Error: {last_error_line}", friendly_name=status_friendly
@@ -1019,8 +1319,24 @@ def rtl_loop(radio_config: dict, mqtt_handler, data_processor, sys_id: str, sys_
                     )
 
         last_online_mark = 0.0
+
+        if stop_event is not None and stop_event.is_set():
+            break
+
         # Record health: restart
         health = get_health_monitor()
         health.record_restart(radio_name)
-        print(f"[RTL] {radio_name} crashed/stopped. Restarting in 5s...")
-        time.sleep(5)
+
+        category = supervisor.classify_exit(rc, last_status)
+        delay = supervisor.next_delay(category)
+        print(f"[RTL] {radio_name} crashed/stopped ({category}). Restarting in {delay:.0f}s...")
+        if stop_event is not None:
+            # Wake immediately if the radio manager stops this radio during backoff.
+            stop_event.wait(delay)
+        else:
+            time.sleep(delay)
+
+    # Only reached when stop_event is set (hotplug radio manager).
+    get_health_monitor().forget_radio(radio_name)
+    _publish_radio_status(mqtt_handler, sys_id, sys_model, status_field, "Disconnected", friendly_name=status_friendly)
+    print(f"[RTL] {radio_name} stopped.")
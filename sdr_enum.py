@@ -0,0 +1,138 @@
+# sdr_enum.py
+"""
+FILE: sdr_enum.py
+DESCRIPTION:
+  Fast RTL-SDR enumeration helpers used by rtl_manager.discover_rtl_devices().
+  - scan_sysfs(): reads vendor/product/serial of attached RTL2832U dongles from
+    /sys/bus/usb/devices without opening them (milliseconds, no rtl_eeprom).
+  - fingerprint(): identifies the exact set of attached dongles (bus/devnum
+    change on every replug) so a previous index<->serial mapping can be reused.
+  - load_cached_devices()/save_cached_devices(): JSON cache for that mapping.
+"""
+from __future__ import annotations
+
+import json
+import os
+from typing import Optional
+
+import config
+
+SYSFS_USB_ROOT = "/sys/bus/usb/devices"
+
+# USB vendor:product IDs handled by librtlsdr (its known_devices table).
+KNOWN_RTL_USB_IDS = frozenset(
+    {
+        ("0bda", "2832"), ("0bda", "2838"),
+        ("0413", "6680"), ("0413", "6f0f"),
+        ("0458", "707f"),
+        ("0ccd", "00a9"), ("0ccd", "00b3"), ("0ccd", "00b4"), ("0ccd", "00b5"), ("0ccd", "00b7"),
+        ("0ccd", "00b8"), ("0ccd", "00b9"), ("0ccd", "00c0"), ("0ccd", "00c6"), ("0ccd", "00d3"),
+        ("0ccd", "00d7"), ("0ccd", "00e0"),
+        ("1554", "5020"),
+        ("15f4", "0131"), ("15f4", "0133"),
+        ("185b", "0620"), ("185b", "0650"), ("185b", "0680"),
+        ("1b80", "d393"), ("1b80", "d394"), ("1b80", "d395"), ("1b80", "d397"), ("1b80", "d398"),
+        ("1b80", "d39d"), ("1b80", "d3a4"), ("1b80", "d3a8"), ("1b80", "d3af"), ("1b80", "d3b0"),
+        ("1d19", "1101"), ("1d19", "1102"), ("1d19", "1103"), ("1d19", "1104"),
+        ("1f4d", "a803"), ("1f4d", "b803"), ("1f4d", "c803"), ("1f4d", "d286"), ("1f4d", "d803"),
+    }
+)
+
+CACHE_VERSION = 1
+
+
+def _read_attr(dev_dir: str, name: str) -> str:
+    try:
+        with open(os.path.join(dev_dir, name), "r", encoding="utf-8", errors="replace") as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
+
+def scan_sysfs(root: Optional[str] = None) -> Optional[list[dict]]:
+    """Return attached RTL-SDR dongles from sysfs, or None if sysfs is unavailable.
+
+    Each entry: {"vid", "pid", "serial", "busnum", "devnum", "path", "product"}.
+    Sorted by (busnum, devnum) for stable output.
+    """
+    root = root if root is not None else SYSFS_USB_ROOT
+    if not root or not os.path.isdir(root):
+        return None
+
+    devices = []
+    try:
+        names = os.listdir(root)
+    except OSError:
+        return None
+
+    for name in names:
+        # Interfaces ("1-1.2:1.0") and root hubs ("usb1") are not dongles.
+        if ":" in name or name.startswith("usb"):
+            continue
+        dev_dir = os.path.join(root, name)
+        vid = _read_attr(dev_dir, "idVendor").lower()
+        pid = _read_attr(dev_dir, "idProduct").lower()
+        if (vid, pid) not in KNOWN_RTL_USB_IDS:
+            continue
+        try:
+            busnum = int(_read_attr(dev_dir, "busnum") or 0)
+            devnum = int(_read_attr(dev_dir, "devnum") or 0)
+        except ValueError:
+            busnum, devnum = 0, 0
+        devices.append(
+            {
+                "vid": vid,
+                "pid": pid,
+                "serial": _read_attr(dev_dir, "serial"),
+                "busnum": busnum,
+                "devnum": devnum,
+                "path": name,
+                "product": _read_attr(dev_dir, "product"),
+            }
+        )
+
+    devices.sort(key=lambda d: (d["busnum"], d["devnum"], d["path"]))
+    return devices
+
+
+def fingerprint(devices: list[dict]) -> str:
+    """Stable identity of the attached dongle set (changes on any replug)."""
+    return "|".join(
+        f"{d['busnum']}:{d['devnum']}:{d['vid']}:{d['pid']}:{d['serial']}" for d in devices
+    )
+
+
+def _cache_path() -> str:
+    return str(getattr(config, "RTL_SDR_CACHE_PATH", "") or "")
+
+
+def load_cached_devices(fp: str) -> Optional[list[dict]]:
+    """Devices from the last probe if the dongle set is unchanged, else None."""
+    path = _cache_path()
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            obj = json.load(f)
+    except Exception:
+        return None
+    if not isinstance(obj, dict) or obj.get("version") != CACHE_VERSION or obj.get("fingerprint") != fp:
+        return None
+    devices = obj.get("devices")
+    if not isinstance(devices, list) or not all(isinstance(d, dict) for d in devices):
+        return None
+    return devices
+
+
+def save_cached_devices(fp: str, devices: list[dict]) -> None:
+    """Best-effort write of the probe result (skipped if the directory is missing)."""
+    path = _cache_path()
+    if not path or not os.path.isdir(os.path.dirname(path) or "."):
+        return
+    try:
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION, "fingerprint": fp, "devices": devices}, f, indent=1)
+        os.replace(tmp, path)
+    except Exception as e:
+        print(f"[STARTUP] Warning: Failed writing SDR cache {path}: {e}")
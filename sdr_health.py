@@ -8,6 +8,7 @@ Alert conditions:
   - Zero data: No sensor readings received in 15 minutes (configurable)
   - USB errors: Device disconnected, busy, or permission denied
   - rtl_433 crash: Segfault, illegal instruction
+  - Performance degradation: frequent sample drops / async read errors / PLL unlocks
 """
 from __future__ import annotations
 
@@ -16,6 +17,8 @@ import time
 from typing import Optional
 
 import config
+import metrics
+from rtl_log_classifier import DEGRADATION_KINDS
 
 
 class SDRHealthMonitor:
@@ -46,6 +49,12 @@ class SDRHealthMonitor:
         # Track current error state per radio (None = no error)
         self.current_errors: dict[str, str] = {}
 
+        # Track performance-degradation event timestamps per radio and kind
+        self.degradation_times: dict[str, dict[str, list[float]]] = {}
+
+        # Cumulative degradation counts per radio and kind (never pruned)
+        self.degradation_totals: dict[str, dict[str, int]] = {}
+
         # Overall alert state (cached for efficiency)
         self._alert_state: bool = False
         self._alert_reason: str = ""
@@ -84,6 +93,29 @@ class SDRHealthMonitor:
         with self._state_lock:
             self.current_errors.pop(radio_name, None)
 
+    def record_degradation(self, radio_name: str, kind: str) -> None:
+        """Record a performance-degradation event (e.g. lost samples) for a radio."""
+        now = time.time()
+        with self._state_lock:
+            totals = self.degradation_totals.setdefault(radio_name, {})
+            totals[kind] = totals.get(kind, 0) + 1
+
+            times = self.degradation_times.setdefault(radio_name, {}).setdefault(kind, [])
+            times.append(now)
+            window = getattr(config, "SDR_HEALTH_RESTART_WINDOW", 600)
+            cutoff = now - window
+            if times[0] <= cutoff:
+                self.degradation_times[radio_name][kind] = [t for t in times if t > cutoff]
+
+    def forget_radio(self, radio_name: str) -> None:
+        """Drop all state for a radio that was intentionally stopped (e.g. dongle unplugged)."""
+        with self._state_lock:
+            self.restart_times.pop(radio_name, None)
+            self.last_data_time.pop(radio_name, None)
+            self.current_errors.pop(radio_name, None)
+            self.degradation_times.pop(radio_name, None)
+            self.degradation_totals.pop(radio_name, None)
+
     def check_health(self) -> tuple[bool, str]:
         """Check overall SDR health.
 
@@ -116,6 +148,17 @@ class SDRHealthMonitor:
                     minutes = int((now - last_time) / 60)
                     problems.append(f"{radio_name}: no data ({minutes}m)")
 
+            # Check for frequent performance degradation (0 disables)
+            deg_threshold = getattr(config, "SDR_HEALTH_DEGRADATION_THRESHOLD", 10)
+            if deg_threshold and deg_threshold > 0:
+                for radio_name, kinds in self.degradation_times.items():
+                    for kind, timestamps in kinds.items():
+                        recent = [t for t in timestamps if t > cutoff]
+                        kinds[kind] = recent
+                        if len(recent) >= deg_threshold:
+                            label = DEGRADATION_KINDS.get(kind, (None, kind))[1]
+                            problems.append(f"{radio_name}: {label} ({len(recent)}x in {window}s)")
+
             # Check for current errors
             for radio_name, error_type in self.current_errors.items():
                 problems.append(f"{radio_name}: {error_type}")
@@ -137,14 +180,30 @@ class SDRHealthMonitor:
             radios = set(self.restart_times.keys())
             radios.update(self.last_data_time.keys())
             radios.update(self.current_errors.keys())
+            radios.update(self.degradation_totals.keys())
             return radios
 
+    def metric_samples(self) -> tuple[list, list]:
+        """(radio error gauge, degradation counter) samples for the metrics endpoint."""
+        with self._state_lock:
+            radios = set(self.restart_times) | set(self.last_data_time) | set(self.current_errors)
+            radios.update(self.degradation_totals)
+            errors = [({"radio": r}, int(r in self.current_errors)) for r in sorted(radios)]
+            degradations = [
+                ({"radio": r, "kind": kind}, n)
+                for r, totals in self.degradation_totals.items()
+                for kind, n in totals.items()
+            ]
+        return errors, degradations
+
     def reset(self) -> None:
         """Reset all health state (useful for testing)."""
         with self._state_lock:
             self.restart_times.clear()
             self.last_data_time.clear()
             self.current_errors.clear()
+            self.degradation_times.clear()
+            self.degradation_totals.clear()
             self._alert_state = False
             self._alert_reason = ""
 
@@ -159,3 +218,8 @@ def get_health_monitor() -> SDRHealthMonitor:
     if _health_monitor is None:
         _health_monitor = SDRHealthMonitor()
     return _health_monitor
+
+
+metrics.register_collector("sdr_health_problem", lambda: int(get_health_monitor().check_health()[0]))
+metrics.register_collector("sdr_radio_error", lambda: get_health_monitor().metric_samples()[0])
+metrics.register_collector("sdr_radio_degradation_events", lambda: get_health_monitor().metric_samples()[1])
@@ -0,0 +1,177 @@
+# signal_quality.py
+"""
+FILE: signal_quality.py
+DESCRIPTION:
+  Signal-quality gate and histograms from rtl_433 level metadata (-M level).
+  - Packets whose snr / rssi is below the threshold for their model, radio or
+    the global default (rtl_min_snr / rtl_min_rssi) are dropped right after
+    decoding. Marginal decodes are where corrupted IDs and junk devices come from.
+  - Per radio, snr and rssi are counted in fixed-bucket histograms. Every
+    PUBLISH_INTERVAL seconds rtl_loop publishes the averages, the histograms
+    and the cumulative number of dropped packets as bridge diagnostics.
+"""
+from __future__ import annotations
+
+import fnmatch
+import re
+from array import array
+from bisect import bisect_right
+from typing import Iterable, Optional
+
+import config
+
+# Bucket edges in dB: bucket i holds edges[i-1] <= v < edges[i].
+SNR_EDGES = (3.0, 6.0, 9.0, 12.0, 15.0, 20.0, 25.0, 30.0)
+RSSI_EDGES = (-30.0, -25.0, -20.0, -15.0, -10.0, -5.0, -2.0)
+
+# Per-radio diagnostics: "<base>_<radio suffix>" (see mqtt_handler.RADIO_FIELD_BASES) -> label
+SIGNAL_FIELDS = {
+    "radio_snr_avg": "Average SNR",
+    "radio_rssi_avg": "Average RSSI",
+    "radio_snr_histogram": "SNR Histogram",
+    "radio_rssi_histogram": "RSSI Histogram",
+    "radio_weak_drops": "Weak Packets Dropped",
+}
+SIGNAL_FIELD_BASES = tuple(SIGNAL_FIELDS)
+
+PUBLISH_INTERVAL = 300.0
+
+
+def _fmt_db(v: float) -> str:
+    return f"{v:g}"
+
+
+class Histogram:
+    """Fixed-bucket counts plus sum for the average."""
+
+    __slots__ = ("edges", "counts", "total", "sum")
+
+    def __init__(self, edges: tuple[float, ...]) -> None:
+        self.edges = edges
+        self.counts = array("L", [0] * (len(edges) + 1))
+        self.total = 0
+        self.sum = 0.0
+
+    def add(self, value: float) -> None:
+        self.counts[bisect_right(self.edges, value)] += 1
+        self.total += 1
+        self.sum += value
+
+    def mean(self) -> Optional[float]:
+        return round(self.sum / self.total, 1) if self.total else None
+
+    def render(self) -> str:
+        """Compact text for a HA state (< 255 chars), e.g. '<3:0 3..6:4 ... >=30:1'."""
+        e = self.edges
+        labels = [f"<{_fmt_db(e[0])}"]
+        labels += [f"{_fmt_db(lo)}..{_fmt_db(hi)}" for lo, hi in zip(e, e[1:])]
+        labels.append(f">={_fmt_db(e[-1])}")
+        return " ".join(f"{label}:{n}" for label, n in zip(labels, self.counts))
+
+    def reset(self) -> None:
+        for i in range(len(self.counts)):
+            self.counts[i] = 0
+        self.total = 0
+        self.sum = 0.0
+
+
+def parse_thresholds(entries: Iterable[object]) -> list[tuple[re.Pattern, float, float]]:
+    """rtl_signal_thresholds entries 'Model*: snr=6, rssi=-20' -> (model regex, snr, rssi)."""
+    rules = []
+    for entry in entries or ():
+        pattern, sep, spec = str(entry).partition(":")
+        if not sep or not pattern.strip():
+            print(f"[CONFIG] Ignoring rtl_signal_thresholds entry {entry!r} (expected '<model>: snr=.., rssi=..').")
+            continue
+        snr = rssi = 0.0
+        for part in spec.split(","):
+            key, _eq, value = part.partition("=")
+            try:
+                if key.strip().lower() == "snr":
+                    snr = float(value)
+                elif key.strip().lower() == "rssi":
+                    rssi = float(value)
+            except ValueError:
+                print(f"[CONFIG] Ignoring invalid value in rtl_signal_thresholds entry {entry!r}.")
+        rules.append((re.compile(fnmatch.translate(pattern.strip()), re.IGNORECASE), snr, rssi))
+    return rules
+
+
+def _num(value) -> Optional[float]:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return float(value)
+
+
+def _threshold(radio_value, global_value) -> float:
+    """Radio setting if present (0 turns a global threshold off for that radio), else the global one."""
+    if radio_value is not None and radio_value != "":
+        try:
+            return float(radio_value)
+        except (TypeError, ValueError):
+            print(f"[CONFIG] Ignoring invalid radio signal threshold {radio_value!r}.")
+    return float(global_value or 0)
+
+
+class SignalGate:
+    """Per-radio thresholds, histograms and drop counter (one per rtl_loop)."""
+
+    def __init__(self, radio_config: Optional[dict] = None) -> None:
+        radio_config = radio_config or {}
+        self.min_snr = _threshold(radio_config.get("min_snr"), getattr(config, "RTL_MIN_SNR", 0))
+        self.min_rssi = _threshold(radio_config.get("min_rssi"), getattr(config, "RTL_MIN_RSSI", 0))
+        self.rules = parse_thresholds(getattr(config, "RTL_SIGNAL_THRESHOLDS", None) or ())
+        self._by_model: dict[str, tuple[float, float]] = {}
+        self.snr = Histogram(SNR_EDGES)
+        self.rssi = Histogram(RSSI_EDGES)
+        self.dropped = 0
+        self._next_publish: Optional[float] = None
+
+    def thresholds_for(self, model: str) -> tuple[float, float]:
+        """(min_snr, min_rssi) for a model; 0 disables a check. Model rules win over radio/global."""
+        hit = self._by_model.get(model)
+        if hit is None:
+            hit = (self.min_snr, self.min_rssi)
+            for regex, snr, rssi in self.rules:
+                if regex.match(str(model)):
+                    hit = (snr, rssi)
+                    break
+            self._by_model[model] = hit
+        return hit
+
+    def check(self, model: str, data: dict) -> bool:
+        """Record the packet's levels; False if it is below the threshold and must be dropped."""
+        snr = _num(data.get("snr"))
+        rssi = _num(data.get("rssi"))
+        if snr is not None:
+            self.snr.add(snr)
+        if rssi is not None:
+            self.rssi.add(rssi)
+        min_snr, min_rssi = self.thresholds_for(model)
+        if (min_snr and snr is not None and snr < min_snr) or (min_rssi and rssi is not None and rssi < min_rssi):
+            self.dropped += 1
+            return False
+        return True
+
+    def due(self, now: float) -> bool:
+        """True once per PUBLISH_INTERVAL (the first call only starts the clock)."""
+        if self._next_publish is None:
+            self._next_publish = now + PUBLISH_INTERVAL
+            return False
+        if now < self._next_publish:
+            return False
+        self._next_publish = now + PUBLISH_INTERVAL
+        return True
+
+    def take(self) -> dict[str, object]:
+        """Diagnostics for the interval (field base -> value); resets the histograms."""
+        out: dict[str, object] = {"radio_weak_drops": self.dropped}
+        if self.snr.total:
+            out["radio_snr_avg"] = self.snr.mean()
+            out["radio_snr_histogram"] = self.snr.render()
+        if self.rssi.total:
+            out["radio_rssi_avg"] = self.rssi.mean()
+            out["radio_rssi_histogram"] = self.rssi.render()
+        self.snr.reset()
+        self.rssi.reset()
+        return out
@@ -38,6 +38,9 @@ except ImportError as e:
 # Safe imports for the rest of the app
 import config
 from mqtt_handler import HomeNodeMQTT
+from admission import get_admission_gate
+from model_prefilter import get_model_prefilter
+from outlier_filter import get_outlier_filter
 from utils import get_system_mac
 from sdr_health import get_health_monitor 
 
@@ -117,6 +120,33 @@ def system_stats_loop(mqtt_handler, DEVICE_ID, MODEL_NAME):
             mqtt_handler.send_sensor(DEVICE_ID, "sys_rtl_433_version", rtl_433_version, device_name, MODEL_NAME, is_rtl=True)
             # mqtt_handler.send_sensor(DEVICE_ID, "sys_device_list", dev_list_str, device_name, MODEL_NAME, is_rtl=True)
 
+            # Publish queue delay per priority class (only with mqtt_rate_limit)
+            delay_stats = getattr(mqtt_handler, "publish_delay_stats", None)
+            delay_stats = delay_stats() if callable(delay_stats) else None
+            if isinstance(delay_stats, dict):
+                for cls, st in delay_stats.items():
+                    mqtt_handler.send_sensor(
+                        DEVICE_ID, f"sys_mqtt_delay_{cls}", st["avg_delay_ms"], device_name, MODEL_NAME, is_rtl=True
+                    )
+
+            # Blacklisted packets dropped before JSON decoding
+            prefilter = get_model_prefilter()
+            if prefilter.enabled:
+                for key, val in prefilter.stats().items():
+                    mqtt_handler.send_sensor(DEVICE_ID, f"sys_prefilter_{key}", val, device_name, MODEL_NAME, is_rtl=True)
+
+            # New-device admission gate (only with admission_min_sightings / admission_min_rssi)
+            gate = get_admission_gate()
+            if gate.enabled:
+                for key, val in gate.stats().items():
+                    mqtt_handler.send_sensor(DEVICE_ID, f"sys_admission_{key}", val, device_name, MODEL_NAME, is_rtl=True)
+
+            # Readings dropped by the outlier filter (all devices)
+            if getattr(config, "RTL_OUTLIER_FILTER", False):
+                mqtt_handler.send_sensor(
+                    DEVICE_ID, "sys_outliers_rejected", get_outlier_filter().rejected, device_name, MODEL_NAME, is_rtl=True
+                )
+
             # B. Configuration Lists (Sent as Diagnostics)
             # We fetch these fresh from config every loop in case of future hot-reloads
             # bl = getattr(config, "DEVICE_BLACKLIST", [])
@@ -24,6 +24,16 @@ def _isolate_device_filters(monkeypatch):
     monkeypatch.setattr(config, "DEVICE_BLACKLIST", ["SimpliSafe*", "EezTire*"], raising=False)
 
 
+@pytest.fixture(autouse=True)
+def _isolate_sdr_enumeration(monkeypatch):
+    # Discovery must not see the test host's USB bus or a cached mapping; tests that
+    # exercise sysfs point SYSFS_USB_ROOT at a fake tree.
+    import sdr_enum
+
+    monkeypatch.setattr(sdr_enum, "SYSFS_USB_ROOT", "/nonexistent/sys/bus/usb/devices")
+    monkeypatch.setattr(config, "RTL_SDR_CACHE_PATH", "", raising=False)
+
+
 @pytest.fixture(autouse=True)
 def _clear_build_metadata_env(monkeypatch):
     """Keep tests deterministic regardless of the developer's shell env.
@@ -0,0 +1,25 @@
+"""The add-on schema exposes the tuning options read from config.py."""
+import re
+
+import config
+
+EXPECTED = {
+    "mqtt_spool_path": "str?",
+    "rtl_sdr_cache_path": "str?",
+    "rtl_hotplug_poll_interval": "int?",
+    "rtl_restart_jitter": "float?",
+    "rtl_restart_budget_cooldown": "int?",
+    "rtl_hop_adaptive_min_packets": "int?",
+    "rtl_hop_adaptive_max_slots": "int?",
+}
+
+
+def test_schema_declares_options_with_settings_types():
+    with open("config.yaml", "r", encoding="utf-8") as f:
+        text = f.read()
+    schema = dict(re.findall(r"^  (\w+): (\S+)$", text.split("\nschema:", 1)[1], re.M))
+
+    for name, kind in EXPECTED.items():
+        assert schema.get(name) == kind, name
+        annotation = config.Settings.model_fields[name].annotation
+        assert annotation.__name__ == kind.rstrip("?")
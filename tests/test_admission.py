@@ -0,0 +1,135 @@
+"""Tests for the new-device admission gate."""
+import json
+
+import pytest
+
+import admission
+import config
+import rtl_manager as rm
+from admission import AdmissionGate
+from device_registry import DeviceRegistry
+
+
+class FakeClock:
+    def __init__(self, t=0.0):
+        self.t = t
+
+    def __call__(self):
+        return self.t
+
+
+def test_disabled_gate_admits_everything():
+    gate = AdmissionGate()
+    assert not gate.enabled
+    assert gate.admit("abc")
+    assert gate.stats() == {"pending": 0, "promoted": 0, "rejected": 0, "held": 0}
+
+
+def test_promotes_after_sightings_within_window():
+    clock = FakeClock()
+    gate = AdmissionGate(min_sightings=3, window=100, clock=clock)
+    assert not gate.admit("tpms")
+    clock.t = 150  # window elapsed: start over
+    assert not gate.admit("tpms")
+    assert not gate.admit("tpms")
+    assert gate.admit("tpms")
+    assert gate.admit("tpms")  # admitted devices pass directly
+    assert gate.stats() == {"pending": 0, "promoted": 1, "rejected": 1, "held": 3}
+
+
+def test_strong_signal_admits_on_first_packet():
+    gate = AdmissionGate(min_sightings=5, min_rssi=-12.0)
+    assert not gate.admit("far", rssi=-20.5)
+    assert not gate.admit("unknown_level")
+    assert gate.admit("near", rssi=-3.1)
+
+
+def test_single_sighting_admits_regardless_of_level():
+    gate = AdmissionGate(min_sightings=1, min_rssi=-12.0)
+    assert gate.enabled
+    assert gate.admit("far", rssi=-30.0)
+    assert gate.admit("unknown_level")
+    assert gate.stats()["held"] == 0
+
+
+def test_admitted_ids_are_bounded_lru():
+    gate = AdmissionGate(min_sightings=1, min_rssi=-12.0, max_admitted=2)
+    for cid in ("a", "b"):
+        gate.admit(cid)
+    gate.admit("a")  # refreshes a
+    gate.admit("c")
+    assert list(gate.admitted) == ["a", "c"]
+
+
+def test_candidates_are_bounded_and_follow_registry():
+    gate = AdmissionGate(min_sightings=2, max_candidates=2)
+    for cid in ("a", "b", "c"):
+        gate.admit(cid)
+    assert gate.stats()["pending"] == 2 and gate.rejected == 1
+
+    registry = DeviceRegistry(max_devices=1)
+    gate.bind(registry)
+    gate.bind(registry)
+    assert gate.admit("b")
+    registry.touch("b")
+    registry.touch("c")  # evicts b
+    assert "b" not in gate.admitted
+    assert len(registry._listeners) == 1
+
+
+@pytest.fixture
+def gated(monkeypatch):
+    monkeypatch.setattr(config, "ADMISSION_MIN_SIGHTINGS", 2, raising=False)
+    monkeypatch.setattr(config, "RTL_433_ARGS", "", raising=False)
+    monkeypatch.setattr(config, "RTL_433_CONFIG_PATH", "", raising=False)
+    monkeypatch.setattr(config, "RTL_433_CONFIG_INLINE", "", raising=False)
+    monkeypatch.setattr(admission, "_gate", None)
+    yield
+    admission._gate = None
+
+
+def test_rtl_loop_holds_packets_of_candidates(gated, monkeypatch):
+    dispatched = []
+
+    class DummyProcessor:
+        def dispatch_reading(self, clean_id, field, value, *a, **k):
+            dispatched.append((clean_id, field, value))
+
+    packets = [
+        {"model": "Acurite-Tower", "id": 1, "temperature_F": 70.0},
+        {"model": "Passing-TPMS", "id": 77, "pressure_kPa": 220},
+        {"model": "Acurite-Tower", "id": 1, "temperature_F": 70.5},
+    ]
+
+    class DummyProc:
+        def __init__(self, lines):
+            self._lines = lines
+
+            class _Stdout:
+                def readline(_self):
+                    return self._lines.pop(0) if self._lines else ""
+
+            self.stdout = _Stdout()
+
+        def poll(self):
+            return None if self._lines else 1
+
+        def terminate(self):
+            return None
+
+        def wait(self, timeout=None):
+            return None
+
+    monkeypatch.setattr(rm.subprocess, "Popen", lambda cmd, *a, **k: DummyProc([json.dumps(p) + "\n" for p in packets]))
+
+    def fake_sleep(secs):
+        raise StopIteration()
+
+    monkeypatch.setattr(rm.time, "sleep", fake_sleep)
+
+    with pytest.raises(StopIteration):
+        rm.rtl_loop({"name": "RTL_101", "id": "101", "freq": "433.92M"}, None, DummyProcessor(), "sys", "Bridge")
+
+    assert [d for d in dispatched if d[1] == "temperature"] == [("1", "temperature", 70.5)]
+    assert all(d[0] == "1" for d in dispatched)
+    assert admission.get_admission_gate().stats()["pending"] == 1
@@ -71,3 +71,32 @@ def test_throttle_loop_flushes_and_formats_values(monkeypatch, capsys):
     out = capsys.readouterr().out
     assert "Flushed" in out
     assert "RTL_A[915M]" in out
+
+
+def test_event_lane_publishes_binary_changes_immediately(monkeypatch):
+    monkeypatch.setattr(config, "RTL_THROTTLE_INTERVAL", 30, raising=False)
+    monkeypatch.setattr(config, "RTL_THROTTLE_EVENT_FIELDS", ["button"], raising=False)
+    mqtt = DummyMQTT()
+    dp = data_processor.DataProcessor(mqtt)
+
+    dp.dispatch_reading("door1", "contact_open", 0, "Door", "DSC", radio_name="R", radio_freq="433.92M")
+    dp.dispatch_reading("door1", "contact_open", 0, "Door", "DSC", radio_name="R", radio_freq="433.92M")
+    dp.dispatch_reading("door1", "contact_open", 1, "Door", "DSC", radio_name="R", radio_freq="433.92M")
+    dp.dispatch_reading("door1", "button", 2, "Door", "DSC", radio_name="R", radio_freq="433.92M")
+    dp.dispatch_reading("door1", "temperature", 20.5, "Door", "DSC", radio_name="R", radio_freq="433.92M")
+
+    assert [(c[1], c[2]) for c in mqtt.calls] == [("contact_open", 0), ("contact_open", 1), ("button", 2)]
+    # The repeated 0 was dropped from the buffer when the state changed to 1.
+    assert "contact_open" not in dp.buffer["door1"]
+    assert dp.buffer["door1"]["temperature"] == [20.5]
+
+
+def test_event_lane_can_be_disabled(monkeypatch):
+    monkeypatch.setattr(config, "RTL_THROTTLE_INTERVAL", 30, raising=False)
+    monkeypatch.setattr(config, "RTL_THROTTLE_EVENT_LANE", False, raising=False)
+    mqtt = DummyMQTT()
+    dp = data_processor.DataProcessor(mqtt)
+
+    dp.dispatch_reading("leak1", "leak_detected", 1, "Leak", "Acurite", radio_name="R", radio_freq="433.92M")
+    assert mqtt.calls == []
+    assert dp.buffer["leak1"]["leak_detected"] == [1]
@@ -0,0 +1,81 @@
+"""Tests for counter -> rate derivation."""
+import config
+import data_processor
+import derived_metrics
+from derived_metrics import MIN_INTERVAL, DerivedMetrics
+
+
+def test_rain_rate_from_total():
+    dm = DerivedMetrics()
+    assert dm.update("ws", "rain_mm", 10.0, 0.0) == []
+    assert dm.update("ws", "rain_mm", 10.5, 30.0) == []  # too soon, baseline kept
+    assert dm.update("ws", "rain_mm", 11.0, 600.0) == [("rain_rate_mm_h", 6.0)]
+
+
+def test_power_from_energy_total():
+    dm = DerivedMetrics()
+    dm.update("m", "total_kWh", 100.0, 0.0)
+    assert dm.update("m", "total_kWh", 100.25, 900.0) == [("power_W", 1000.0)]
+
+
+def test_counter_wraparound_and_reset():
+    dm = DerivedMetrics()
+    dm.update("g", "Consumption", 65500, 0.0)
+    assert dm.update("g", "Consumption", 100, 3600.0) == [("consumption_rate", 136.0)]
+
+    # A drop that is not a wrap restarts the baseline without publishing.
+    assert dm.update("g", "Consumption", 20, 7200.0) == []
+    assert dm.resets == 1
+    assert dm.update("g", "Consumption", 30, 10800.0) == [("consumption_rate", 10.0)]
+
+
+def test_native_rate_wins_and_forget():
+    dm = DerivedMetrics()
+    dm.update("ws", "rain_rate_mm_h", 1.2, 0.0)
+    dm.update("ws", "rain_mm", 1.0, 0.0)
+    assert dm.update("ws", "rain_mm", 2.0, 3600.0) == []
+
+    dm.forget("ws")
+    dm.update("ws", "rain_mm", 1.0, 0.0)
+    assert dm.update("ws", "rain_mm", 2.0, 3600.0) == [("rain_rate_mm_h", 1.0)]
+
+
+def test_ignores_non_counters_and_non_numbers():
+    dm = DerivedMetrics()
+    assert dm.update("x", "temperature", 20.0, 0.0) == []
+    dm.update("x", "rain_mm", "n/a", 0.0)
+    assert dm._baseline == {}
+
+
+class DummyMQTT:
+    def __init__(self):
+        self.calls = []
+
+    def send_sensor(self, clean_id, field, value, dev_name, model, is_rtl=True):
+        self.calls.append((field, value))
+
+
+def test_data_processor_dispatches_derived_fields(monkeypatch):
+    monkeypatch.setattr(config, "RTL_THROTTLE_INTERVAL", 0, raising=False)
+    monkeypatch.setattr(config, "RTL_DERIVED_METRICS", True, raising=False)
+    now = [1000.0]
+    monkeypatch.setattr(data_processor.time, "monotonic", lambda: now[0])
+
+    mqtt = DummyMQTT()
+    dp = data_processor.DataProcessor(mqtt)
+    dp.dispatch_reading("m", "total_m3", 5.0, "Meter", "Model")
+    now[0] += 2 * MIN_INTERVAL
+    dp.dispatch_reading("m", "total_m3", 5.1, "Meter", "Model")
+
+    assert mqtt.calls == [("total_m3", 5.0), ("total_m3", 5.1), ("flow_m3_h", 3.0)]
+    assert isinstance(dp.derived, derived_metrics.DerivedMetrics)
+
+
+def test_data_processor_derivation_off_by_default(monkeypatch):
+    monkeypatch.setattr(config, "RTL_THROTTLE_INTERVAL", 0, raising=False)
+    monkeypatch.setattr(config, "RTL_DERIVED_METRICS", False, raising=False)
+    mqtt = DummyMQTT()
+    dp = data_processor.DataProcessor(mqtt)
+    dp.dispatch_reading("ws", "rain_mm", 1.0, "WS", "Model")
+    dp.dispatch_reading("ws", "rain_mm", 9.0, "WS", "Model")
+    assert [c[0] for c in mqtt.calls] == ["rain_mm", "rain_mm"]
@@ -0,0 +1,115 @@
+"""Tests for device lifecycle eviction (device_ttl / device_max)."""
+from types import SimpleNamespace
+
+import pytest
+
+import config
+import data_processor
+import device_registry
+import mqtt_handler
+from device_registry import DeviceRegistry
+from mqtt_handler import HomeNodeMQTT
+
+
+class FakeClock:
+    def __init__(self, t=0.0):
+        self.t = t
+
+    def __call__(self):
+        return self.t
+
+
+def test_lru_cap_evicts_least_recently_heard():
+    evicted = []
+    reg = DeviceRegistry(max_devices=2, clock=FakeClock())
+    reg.add_listener(lambda cid, name: evicted.append((cid, name)))
+    reg.touch("a", "A")
+    reg.touch("b", "B")
+    reg.touch("a")
+    assert reg.touch("c", "C") == ["b"]
+    assert evicted == [("b", "B")]
+    assert "a" in reg and "c" in reg and len(reg) == 2
+
+
+def test_ttl_expiry_runs_from_touch_and_sweep():
+    clock = FakeClock()
+    reg = DeviceRegistry(ttl=100, clock=clock)
+    reg.touch("old")
+    clock.t = 50
+    reg.touch("new")
+    clock.t = 90
+    assert reg.touch("new") == []  # swept, nothing expired yet
+    clock.t = 140
+    assert reg.touch("new") == []  # expired, but the next sweep is not due
+    clock.t = 90 + device_registry.SWEEP_INTERVAL
+    assert reg.touch("new") == ["old"]
+    clock.t += 500
+    assert reg.sweep() == ["new"]
+    assert reg.evicted == 2
+    assert DeviceRegistry().sweep() == []
+
+
+@pytest.fixture
+def handler(mocker, monkeypatch):
+    monkeypatch.setattr(config, "DEVICE_MAX", 1, raising=False)
+    client_cls = mocker.patch("mqtt_handler.mqtt.Client")
+    client_cls.return_value.publish.return_value = SimpleNamespace(rc=mqtt_handler.mqtt.MQTT_ERR_SUCCESS)
+    return HomeNodeMQTT()
+
+
+def test_eviction_clears_handler_and_processor_caches(handler, monkeypatch):
+    h = handler
+    monkeypatch.setattr(config, "RTL_THROTTLE_INTERVAL", 30, raising=False)
+    dp = data_processor.DataProcessor(h)
+    dp.dispatch_reading("tpms1", "pressure_kPa", 220, "TPMS", "Toyota", radio_name="R", radio_freq="315M")
+    h.send_sensor("tpms1", "pressure_kPa", 220, "TPMS (tpms1)", "Toyota")
+    h.send_sensor("tpms1", "battery_ok", 1, "TPMS (tpms1)", "Toyota")
+    assert "tpms1" in h._battery_state and dp.buffer
+
+    h.send_sensor("tpms2", "pressure_kPa", 230, "TPMS (tpms2)", "Toyota")
+
+    assert not any(k.startswith("tpms1_") for k in h.last_sent_values)
+    assert not any(k.startswith("tpms1_") for k in h.discovery_published)
+    assert "tpms1" not in h._battery_state and "tpms1" not in h._device_model_by_id
+    assert not any("tpms1" in t for t in h.resync_cache.topics())
+    assert h.tracked_devices == {"TPMS (tpms2)"}
+    assert "tpms1" not in dp.buffer
+
+
+def test_eviction_leaves_keys_that_share_the_id_prefix(handler, monkeypatch):
+    h = handler
+    monkeypatch.setattr(config, "DEVICE_TTL_CLEANUP", True, raising=False)
+    h.nuke_command_topic = "rtl/nuke"
+    h._publish_nuke_button()  # unique_id rtl_bridge_nuke...: shares the "rtl_" prefix
+    h.send_sensor("rtl", "temperature", 20, "RTL", "Acurite")
+    h.send_attributes("rtl", "temperature", {"mean_1h": 20})
+    start = len(h.client.publish.call_args_list)
+
+    h.forget_device("rtl", "RTL")
+
+    assert f"homeassistant/button/rtl_bridge_nuke{config.ID_SUFFIX}/config" in h.resync_cache.topics()
+    assert not any(k.startswith("rtl_temperature") for k in h.last_sent_values)
+    cleared = {c.args[0] for c in h.client.publish.call_args_list[start:] if c.args[1] == ""}
+    assert cleared == {
+        f"homeassistant/sensor/rtl_temperature{config.ID_SUFFIX}/config",
+        "home/rtl_devices/rtl/temperature",
+        "home/rtl_devices/rtl/temperature/attributes",
+    }
+
+
+def test_cleanup_clears_retained_topics(handler, monkeypatch):
+    h = handler
+    monkeypatch.setattr(config, "DEVICE_TTL_CLEANUP", True, raising=False)
+    h.send_sensor("tpms1", "pressure_kPa", 220, "TPMS", "Toyota")
+    start = len(h.client.publish.call_args_list)
+    h.send_sensor("tpms2", "pressure_kPa", 230, "TPMS", "Toyota")
+
+    cleared = {c.args[0] for c in h.client.publish.call_args_list[start:] if c.args[1] == ""}
+    assert cleared == {
+        f"homeassistant/sensor/tpms1_pressure_kPa{config.ID_SUFFIX}/config",
+        "home/rtl_devices/tpms1/pressure_kPa",
+    }
+
+    # A forgotten device that comes back is discovered again.
+    h.send_sensor("tpms1", "pressure_kPa", 221, "TPMS", "Toyota")
+    assert f"tpms1_pressure_kPa{config.ID_SUFFIX}" in h.discovery_published
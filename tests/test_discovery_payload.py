@@ -0,0 +1,100 @@
+"""Tests for compact (abbreviated) Home Assistant discovery payloads."""
+import json
+
+import pytest
+
+import config
+import discovery_payload
+from mqtt_handler import HomeNodeMQTT
+
+
+def _entity_payload():
+    return {
+        "name": "Battery Low",
+        "state_topic": "home/rtl_devices/dev1/battery_ok",
+        "json_attributes_topic": "home/rtl_devices/dev1/battery_ok/attributes",
+        "unique_id": "dev1_battery_ok",
+        "device": {
+            "identifiers": ["rtl433_Acurite_dev1"],
+            "manufacturer": "rtl-haos",
+            "model": "Acurite",
+            "name": "Acurite dev1",
+            "sw_version": "",
+        },
+        "device_class": "battery",
+        "entity_category": None,
+        "payload_on": "ON",
+        "payload_off": "OFF",
+        "expire_after": 0,
+        "availability_topic": "home/status/rtl_bridge/availability",
+    }
+
+
+def test_compact_abbreviates_and_drops_defaults():
+    out = discovery_payload.compact(_entity_payload())
+
+    assert out["uniq_id"] == "dev1_battery_ok"
+    assert out["dev"] == {"ids": ["rtl433_Acurite_dev1"], "mf": "rtl-haos", "mdl": "Acurite", "name": "Acurite dev1"}
+    assert out["dev_cla"] == "battery"
+    assert out["avty_t"] == "home/status/rtl_bridge/availability"
+    for dropped in ("pl_on", "pl_off", "exp_aft", "ent_cat", "payload_on", "state_topic"):
+        assert dropped not in out
+
+
+def test_compact_uses_base_topic_when_shorter():
+    out = discovery_payload.compact(_entity_payload())
+    assert out["~"] == "home/rtl_devices/dev1/battery_ok"
+    assert out["stat_t"] == "~"
+    assert out["json_attr_t"] == "~/attributes"
+
+
+def test_encode_is_deterministic():
+    a = _entity_payload()
+    b = dict(reversed(list(a.items())))
+    assert discovery_payload.encode(a) == discovery_payload.encode(b)
+    assert discovery_payload.encode(discovery_payload.compact(a), compact=True) == discovery_payload.encode(
+        discovery_payload.compact(b), compact=True
+    )
+
+
+def test_compact_device_payload():
+    doc = {
+        "device": {"identifiers": ["x"], "manufacturer": "rtl-haos"},
+        "origin": {"name": "rtl-haos", "sw_version": "1.2", "support_url": "https://example.invalid"},
+        "availability_topic": "home/status/a",
+        "components": {"x_t": {"platform": "sensor", "state_topic": "home/t", "unique_id": "x_t"}},
+    }
+    out = discovery_payload.compact(doc)
+    assert out["o"] == {"name": "rtl-haos", "sw": "1.2", "url": "https://example.invalid"}
+    assert out["cmps"]["x_t"] == {"p": "sensor", "stat_t": "home/t", "uniq_id": "x_t"}
+
+
+def test_handler_publishes_compact_configs_and_reports(mocker, monkeypatch):
+    monkeypatch.setattr(config, "MQTT_DISCOVERY_COMPACT", True, raising=False)
+    mocker.patch("mqtt_handler.mqtt.Client")
+    h = HomeNodeMQTT()
+    h.send_sensor("dev1", "temperature", 70.1, "Acurite dev1", "Acurite")
+
+    configs = [c.args for c in h.client.publish.call_args_list if c.args[0].endswith("/config")]
+    assert len(configs) == 1
+    body = configs[0][1]
+    assert " " not in body.replace("Acurite dev1", "")
+    data = json.loads(body)
+    assert data["stat_t"] == "home/rtl_devices/dev1/temperature"
+    assert data["dev"]["mf"] == "rtl-haos"
+
+    report = h.discovery_report()
+    assert report.startswith("1 discovery configs")
+    assert "uncompacted" in report
+
+
+@pytest.mark.parametrize("device_key,mf_key", [("device", "manufacturer"), ("dev", "mf")])
+def test_nuke_scan_matches_full_and_compact(mocker, device_key, mf_key):
+    mocker.patch("mqtt_handler.mqtt.Client")
+    h = HomeNodeMQTT()
+    h._on_connect(h.client, None, None, 0)
+    h.is_nuking = True
+    topic = "homeassistant/sensor/dev1_temperature/config"
+    payload = json.dumps({device_key: {mf_key: "rtl-haos"}}).encode("utf-8")
+    h._on_message(h.client, None, mocker.Mock(topic=topic, payload=payload))
+    assert h.client.publish.call_args.args[:2] == (topic, "")
@@ -0,0 +1,86 @@
+"""Tests for the field metadata database (field_meta.json + overlay)."""
+import json
+
+import pytest
+
+import config
+import field_meta
+from field_meta import compile_field_db, load_field_db, validate_field_db
+
+
+def _write(tmp_path, doc, name="overlay.json"):
+    path = tmp_path / name
+    path.write_text(json.dumps(doc), encoding="utf-8")
+    return str(path)
+
+
+def test_bundled_database_is_valid_and_read_only():
+    doc = load_field_db(field_meta.BUNDLED_DB_PATH)
+    assert doc["version"] == field_meta.DB_VERSION
+    assert field_meta.FIELD_META["humidity"] == ("%", "humidity", "mdi:water-percent", "Humidity")
+    assert field_meta.MODEL_FIELD_META["neptune-r900"]["meter_reading"][0] == "gal"
+    with pytest.raises(TypeError):
+        field_meta.FIELD_META["humidity"] = None
+
+
+def test_validation_reports_each_problem():
+    doc = {
+        "version": 9,
+        "fields": [
+            {"group": "A", "entries": {"x": ["u", "none", "eye", "X"], "y": [None, "none", "mdi:eye"]}},
+            {"group": "B", "entries": {"x": [None, "none", "mdi:eye", "X"]}},
+            {"group": "C"},
+        ],
+        "models": {"Acme": {"entries": {"z": [1, "none", "mdi:eye", "Z"]}}},
+    }
+    errors = validate_field_db(doc)
+    assert len(errors) == 7
+    assert any("already defined" in e for e in errors)
+    assert any("lowercase" in e for e in errors)
+    assert validate_field_db([]) == ["top level must be an object"]
+
+
+def test_overlay_entries_win(tmp_path, monkeypatch):
+    overlay = {
+        "version": 1,
+        "fields": [{"group": "Mine", "entries": {
+            "humidity": ["%", "humidity", "mdi:cloud", "Air Humidity"],
+            "pool_temp_C": ["°C", "temperature", "mdi:pool", "Pool"],
+        }}],
+        "models": {"neptune-r900": {"entries": {"leak": [None, "none", "mdi:pipe-leak", "Leak"]}}},
+    }
+    monkeypatch.setattr(config, "FIELD_META_OVERLAY", _write(tmp_path, overlay), raising=False)
+    fields, models = field_meta._load_databases()
+    assert fields["humidity"][3] == "Air Humidity"
+    assert fields["pool_temp_C"][2] == "mdi:pool"
+    assert fields["temperature"] == field_meta.FIELD_META["temperature"]
+    assert set(models["neptune-r900"]) == {"meter_reading", "leak"}
+
+
+def test_invalid_overlay_is_ignored(tmp_path, monkeypatch, capsys):
+    path = _write(tmp_path, {"version": 1, "fields": [{"entries": {"a": ["x"]}}]})
+    monkeypatch.setattr(config, "FIELD_META_OVERLAY", path, raising=False)
+    fields, _models = field_meta._load_databases()
+    assert "a" not in fields and fields == field_meta.FIELD_META
+    assert "Ignoring field metadata overlay" in capsys.readouterr().out
+
+
+def test_compile_merges_in_order():
+    a = {"version": 1, "fields": [{"entries": {"f": [None, "none", "mdi:a", "A"]}}]}
+    b = {"version": 1, "fields": [{"entries": {"f": [None, "none", "mdi:b", "B"]}}]}
+    fields, models = compile_field_db(a, b)
+    assert fields == {"f": (None, "none", "mdi:b", "B")} and dict(models) == {}
+
+
+def test_cli_validates_and_benchmarks(tmp_path, capsys, monkeypatch):
+    monkeypatch.setattr(field_meta, "benchmark", lambda: {"load_ms": 1.0, "lookup_ns": 100.0})
+    assert field_meta.main(["--bench"]) == 0
+    bad = _write(tmp_path, {"version": 1, "fields": {}}, "bad.json")
+    assert field_meta.main([bad]) == 1
+    out = capsys.readouterr().out
+    assert "OK " in out and "INVALID" in out and "ns/call" in out
+
+
+def test_benchmark_reports_costs():
+    result = field_meta.benchmark(rounds=1, lookups=100)
+    assert result["load_ms"] > 0 and result["lookup_ns"] > 0
@@ -172,5 +172,5 @@ def test_field_meta_covers_published_fields_from_captured_fixtures():
         for fname in sorted(missing):
             for f in sorted(missing[fname]):
                 friendly = f.replace("_", " ").strip().title().replace('"', "'")
-                lines.append(f'    "{f}": (None, "none", "mdi:eye", "{friendly}"),')
+                lines.append(f'        "{f}": [null, "none", "mdi:eye", "{friendly}"],')
         raise AssertionError("\n".join(lines))
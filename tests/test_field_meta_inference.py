@@ -0,0 +1,57 @@
+import field_meta
+from field_meta import FIELD_META, get_field_meta, infer_field_meta
+
+
+def test_suffix_rules_infer_units():
+    assert infer_field_meta("temperature_5_C") == ("°C", "temperature", "mdi:thermometer", "Temperature 5 (C)")
+    assert infer_field_meta("pipe_temp_F") == ("°F", "temperature", "mdi:thermometer", "Pipe Temp (F)")
+    assert infer_field_meta("gust_speed_mi_h")[:2] == ("mph", "wind_speed")
+    assert infer_field_meta("rain_rate_mm_h")[:2] == ("mm/h", "precipitation_intensity")
+    assert infer_field_meta("import_kWh")[:2] == ("kWh", "energy")
+    assert infer_field_meta("solar_V")[:2] == ("V", "voltage")
+    assert infer_field_meta("alien_radiation") is None
+    assert infer_field_meta("_C") is None
+
+
+def test_ambiguous_suffixes_need_a_known_base():
+    assert infer_field_meta("button_A") is None
+    assert infer_field_meta("sensor_C") is None
+    assert infer_field_meta("mode_F") is None
+    assert infer_field_meta("ct2_A")[:2] == ("A", "current")
+    assert infer_field_meta("grid_W")[:2] == ("W", "power")
+    assert infer_field_meta("dew_point_C")[:2] == ("°C", "temperature")
+
+
+def test_only_rain_mm_is_precipitation():
+    assert infer_field_meta("rain_2_mm")[:2] == ("mm", "precipitation")
+    assert infer_field_meta("snow_depth_mm")[:2] == ("mm", "distance")
+    assert infer_field_meta("tank_level_mm")[:2] == ("mm", "distance")
+
+
+def test_exact_entries_win_and_inference_can_be_disabled():
+    assert get_field_meta("battery_V") == FIELD_META["battery_V"]
+    assert get_field_meta("pressure_2_hPa", base_meta={})[:2] == ("hPa", "pressure")
+    assert get_field_meta("pressure_2_hPa", base_meta={}, infer=False) is None
+
+
+def test_base_meta_changes_are_not_memoized():
+    base = {}
+    assert get_field_meta("odd_power_W", base_meta=base)[0] == "W"
+    base["odd_power_W"] = ("kW", "power", "mdi:flash", "Odd")
+    assert get_field_meta("odd_power_W", base_meta=base) == ("kW", "power", "mdi:flash", "Odd")
+
+
+def test_model_prefix_trie_prefers_longest_prefix(monkeypatch):
+    overrides = {
+        "acme": {"level": ("cm", "distance", "mdi:ruler", "Level"), "flow": ("L", "water", "mdi:water", "Flow")},
+        "acme-pro": {"level": ("mm", "distance", "mdi:ruler", "Level")},
+    }
+    monkeypatch.setattr(field_meta, "_MODEL_TRIE", field_meta._build_model_trie(overrides))
+    field_meta._model_overrides.cache_clear()
+    try:
+        assert get_field_meta("level", "ACME-Pro 2")[0] == "mm"
+        assert get_field_meta("flow", "ACME-Pro 2")[0] == "L"
+        assert get_field_meta("level", "Acme-Basic")[0] == "cm"
+        assert get_field_meta("level", "Other", base_meta={}, infer=False) is None
+    finally:
+        field_meta._model_overrides.cache_clear()
@@ -0,0 +1,81 @@
+"""Tests for per-model / per-device field selection (device_fields)."""
+import json
+
+import pytest
+
+import config
+import field_projection
+import rtl_manager as rm
+from field_projection import FieldProjection
+
+
+def test_allow_and_deny_rules_merge_per_device():
+    proj = FieldProjection([
+        "Acurite-Tower*: temperature, humidity",
+        "acurite*: -humidity",
+        "abc123: rssi*",
+        "not a rule",
+    ])
+    assert proj.enabled and len(proj.rules) == 3
+
+    rule = proj.rule_for("Acurite-Tower", "1234")
+    assert rule.keeps("temperature") and rule.keeps_key("temperature_C")
+    assert not rule.keeps("humidity")  # deny wins
+    assert not rule.keeps("battery_ok")
+
+    by_id = proj.rule_for("Other", "abc123")
+    assert by_id.keeps("rssi") and not by_id.keeps("snr")
+
+    assert proj.rule_for("LaCrosse-TX141", "9") is None
+    assert proj.rule_for("Acurite-Tower", "1234") is rule  # cached
+
+
+@pytest.fixture
+def projected(monkeypatch):
+    monkeypatch.setattr(config, "DEVICE_FIELDS", ["Acurite-Tower: temperature, dew_point"], raising=False)
+    monkeypatch.setattr(config, "RTL_433_ARGS", "", raising=False)
+    monkeypatch.setattr(config, "RTL_433_CONFIG_PATH", "", raising=False)
+    monkeypatch.setattr(config, "RTL_433_CONFIG_INLINE", "", raising=False)
+    yield
+    field_projection._projection = None
+
+
+def test_rtl_loop_dispatches_only_selected_fields(projected, monkeypatch):
+    dispatched = []
+
+    class DummyProcessor:
+        def dispatch_reading(self, clean_id, field, value, *a, **k):
+            dispatched.append(field)
+
+    packets = [{"model": "Acurite-Tower", "id": 1, "temperature_C": 20.0, "humidity": 50, "battery_ok": 1}]
+
+    class DummyProc:
+        def __init__(self, lines):
+            self._lines = lines
+
+            class _Stdout:
+                def readline(_self):
+                    return self._lines.pop(0) if self._lines else ""
+
+            self.stdout = _Stdout()
+
+        def poll(self):
+            return None if self._lines else 1
+
+        def terminate(self):
+            return None
+
+        def wait(self, timeout=None):
+            return None
+
+    monkeypatch.setattr(rm.subprocess, "Popen", lambda cmd, *a, **k: DummyProc([json.dumps(p) + "\n" for p in packets]))
+
+    def fake_sleep(secs):
+        raise StopIteration()
+
+    monkeypatch.setattr(rm.time, "sleep", fake_sleep)
+
+    with pytest.raises(StopIteration):
+        rm.rtl_loop({"name": "RTL_101", "id": "101", "freq": "433.92M"}, None, DummyProcessor(), "sys", "Bridge")
+
+    assert sorted(dispatched) == ["dew_point", "temperature"]
@@ -0,0 +1,138 @@
+"""Tests for adaptive hop planning on multi-frequency radios."""
+import json
+
+import pytest
+
+import config
+import rtl_manager as rm
+from hop_scheduler import HopScheduler, allocate_slots, interleave, parse_freq_mhz
+
+
+class FakeClock:
+    def __init__(self, t=1000.0):
+        self.t = t
+
+    def __call__(self):
+        return self.t
+
+
+@pytest.fixture
+def hop_cfg(monkeypatch):
+    monkeypatch.setattr(config, "RTL_HOP_ADAPTIVE", True, raising=False)
+    monkeypatch.setattr(config, "RTL_HOP_ADAPTIVE_INTERVAL", 600, raising=False)
+    monkeypatch.setattr(config, "RTL_HOP_ADAPTIVE_MIN_PACKETS", 10, raising=False)
+    monkeypatch.setattr(config, "RTL_HOP_ADAPTIVE_MIN_GAIN", 0.25, raising=False)
+    monkeypatch.setattr(config, "RTL_HOP_ADAPTIVE_MAX_SLOTS", 6, raising=False)
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [("433.92M", 433.92), ("915000000", 915.0), ("433920k", 433.92), ("1.2G", 1200.0), ("auto", None)],
+)
+def test_parse_freq_mhz(value, expected):
+    assert parse_freq_mhz(value) == (pytest.approx(expected) if expected else None)
+
+
+def test_allocate_slots_keeps_one_per_frequency():
+    assert allocate_slots([30, 0, 0], 6) == [4, 1, 1]
+    assert allocate_slots([0, 0, 0], 6) == [1, 1, 1]
+    assert sum(allocate_slots([5, 3, 1, 1], 10)) == 10
+
+
+def test_interleave_spreads_repeats():
+    assert interleave([3, 1]) == [0, 0, 1, 0]
+    order = interleave([2, 1, 1])
+    assert sorted(order) == [0, 0, 1, 2]
+    assert order[0] != order[1] or order[-1] != 0
+
+
+def test_record_matches_nearest_frequency():
+    hop = HopScheduler(["315M", "345M", "390M"])
+    hop.record(315.01)
+    hop.record("344.9")
+    hop.record(433.92)  # not a configured hop -> unmatched
+    hop.record(None)
+    assert hop.counts == [1, 1, 0]
+    assert hop.unmatched == 1
+
+
+def test_replan_requires_interval_packets_and_gain(hop_cfg):
+    clock = FakeClock()
+    hop = HopScheduler(["315M", "345M", "390M"], "Hopper", clock=clock)
+    for _ in range(30):
+        hop.record(315.0)
+
+    assert hop.maybe_replan() is False  # interval not elapsed
+    clock.t += 601
+    assert hop.maybe_replan() is True
+    assert hop.weights == [4, 1, 1]
+    assert hop.freq_arg().split(",").count("315M") == 4
+    assert hop.counts == [0, 0, 0]
+
+
+def test_balanced_traffic_is_not_replanned(hop_cfg):
+    clock = FakeClock()
+    hop = HopScheduler(["315M", "345M"], clock=clock)
+    for _ in range(20):
+        hop.record(315.0)
+        hop.record(345.0)
+    clock.t += 601
+    assert hop.maybe_replan() is False
+    assert hop.weights == [1, 1]
+
+
+def test_rtl_loop_restarts_with_weighted_hop_list(hop_cfg, monkeypatch):
+    monkeypatch.setattr(config, "RTL_HOP_ADAPTIVE_INTERVAL", 0, raising=False)
+    monkeypatch.setattr(config, "RTL_433_ARGS", "", raising=False)
+
+    class DummyProcessor:
+        def dispatch_reading(self, *a, **k):
+            return None
+
+    commands = []
+
+    class DummyProc:
+        def __init__(self, lines):
+            self._lines = lines
+
+            class _Stdout:
+                def readline(_self):
+                    return self._lines.pop(0) if self._lines else ""
+
+            self.stdout = _Stdout()
+
+        def poll(self):
+            return None if self._lines else 1
+
+        def terminate(self):
+            return None
+
+        def wait(self, timeout=None):
+            return None
+
+    def fake_popen(cmd, *a, **k):
+        commands.append(list(cmd))
+        pkt = json.dumps({"model": "Car-Remote", "id": 7, "freq": 315.0}) + "\n"
+        return DummyProc([pkt] * 12 if len(commands) == 1 else [])
+
+    monkeypatch.setattr(rm.subprocess, "Popen", fake_popen)
+
+    sleeps = []
+
+    def fake_sleep(secs):
+        sleeps.append(secs)
+        if len(sleeps) >= 2:
+            raise StopIteration()
+
+    monkeypatch.setattr(rm.time, "sleep", fake_sleep)
+
+    radio = {"name": "Hopper", "id": "3", "freq": "315M,345M,390M", "hop_interval": 20}
+    with pytest.raises(StopIteration):
+        rm.rtl_loop(radio, None, DummyProcessor(), "sys", "Bridge")
+
+    def freqs(cmd):
+        return [cmd[i + 1] for i, tok in enumerate(cmd) if tok == "-f"]
+
+    assert freqs(commands[0]) == ["315M", "345M", "390M"]
+    assert freqs(commands[1]).count("315M") == 4
+    assert set(freqs(commands[1])) == {"315M", "345M", "390M"}
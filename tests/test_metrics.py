@@ -0,0 +1,101 @@
+"""Tests for the pipeline metrics registry and OpenMetrics endpoint."""
+import threading
+import urllib.request
+
+import pytest
+
+import config
+import data_processor
+import metrics
+from sdr_health import get_health_monitor
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def _value(counters, name, **labels):
+    return counters.get(metrics._key(name, labels), 0)
+
+
+def test_counters_from_many_threads_are_summed():
+    def work():
+        for _ in range(1000):
+            metrics.inc("rtl_lines", radio="a")
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    metrics.inc("rtl_lines", 5, radio="b")
+
+    counters, _hists = metrics.snapshot()
+    assert _value(counters, "rtl_lines", radio="a") == 4000
+    assert _value(counters, "rtl_lines", radio="b") == 5
+
+
+def test_render_openmetrics_text():
+    metrics.inc("rtl_packets_filtered", radio="r1", reason="signal")
+    metrics.observe("mqtt_publish_latency_seconds", 0.003, kind="state")
+    metrics.observe("mqtt_publish_latency_seconds", 20.0, kind="state")
+
+    text = metrics.render()
+    assert "# TYPE rtl_haos_rtl_packets_filtered counter" in text
+    assert 'rtl_haos_rtl_packets_filtered_total{radio="r1",reason="signal"} 1' in text
+    assert 'rtl_haos_mqtt_publish_latency_seconds_bucket{kind="state",le="0.0025"} 0' in text
+    assert 'rtl_haos_mqtt_publish_latency_seconds_bucket{kind="state",le="0.005"} 1' in text
+    assert 'rtl_haos_mqtt_publish_latency_seconds_bucket{kind="state",le="+Inf"} 2' in text
+    assert 'rtl_haos_mqtt_publish_latency_seconds_count{kind="state"} 2' in text
+    assert text.endswith("# EOF\n")
+
+
+def test_sdr_health_collectors():
+    monitor = get_health_monitor()
+    monitor.reset()
+    try:
+        monitor.record_error("Weather", "usb_error")
+        monitor.record_degradation("Weather", "sample_drop")
+        text = metrics.render()
+        assert "rtl_haos_sdr_health_problem 1" in text
+        assert 'rtl_haos_sdr_radio_error{radio="Weather"} 1' in text
+        assert 'rtl_haos_sdr_radio_degradation_events_total{kind="sample_drop",radio="Weather"} 1' in text
+    finally:
+        monitor.reset()
+
+
+class DummyMQTT:
+    def send_sensor(self, *args, **kwargs):
+        pass
+
+
+def test_data_processor_counts_and_buffer_gauge(monkeypatch):
+    monkeypatch.setattr(config, "RTL_THROTTLE_INTERVAL", 30, raising=False)
+    monkeypatch.setattr(config, "RTL_THROTTLE_EVENT_LANE", False, raising=False)
+    dp = data_processor.DataProcessor(DummyMQTT())
+    dp.dispatch_reading("t1", "temperature", 20.5, "T1", "Acurite")
+    dp.dispatch_reading("t1", "temperature", 20.6, "T1", "Acurite")
+    dp.dispatch_reading("t1", "humidity", None, "T1", "Acurite")
+
+    counters, _hists = metrics.snapshot()
+    assert _value(counters, "dispatch_readings") == 2
+    assert dp.buffered_readings() == 2
+    assert "rtl_haos_throttle_buffer_readings 2" in metrics.render()
+
+
+def test_metrics_server_serves_scrapes():
+    server = metrics.start_metrics_server(0, "127.0.0.1")
+    assert server is not None
+    try:
+        metrics.inc("dispatch_readings")
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url, timeout=5) as resp:
+            body = resp.read().decode()
+            assert resp.headers["Content-Type"].startswith("application/openmetrics-text")
+        assert "rtl_haos_dispatch_readings_total 1" in body
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,28 @@
+"""Tests for the pre-parse blacklist model filter."""
+import json
+
+import config
+import model_prefilter
+import rtl_manager as rm
+from model_prefilter import ModelPrefilter
+
+
+def test_matches_model_token_like_is_blocked_device():
+    pf = ModelPrefilter(["SimpliSafe*", "EezTire*"])
+    line = '{"time" : "2024-01-01 00:00:00", "model" : "SimpliSafe-Sensor", "id" : "1A2B"}'
+    assert pf.blocked(line)
+    assert pf.blocked(json.dumps({"model": "eeztire-E618", "id": 3}))
+    assert not pf.blocked(json.dumps({"model": "Acurite-Tower", "id": 3}))
+    assert not pf.blocked('{"id" : "SimpliSafe"}')  # IDs/types are left to is_blocked_device
+    assert pf.stats() == {"packets": 2, "bytes": len(line) + len(json.dumps({"model": "eeztire-E618", "id": 3}))}
+
+    for model in ("SimpliSafe-Sensor", "eeztire-E618", "Acurite-Tower"):
+        assert pf.blocked(json.dumps({"model": model})) == rm.is_blocked_device("x", model, "Untyped")
+
+
+def test_disabled_without_patterns_or_by_option(monkeypatch):
+    assert not ModelPrefilter([]).enabled
+    monkeypatch.setattr(config, "DEVICE_BLACKLIST", ["Foo*"], raising=False)
+    assert model_prefilter.get_model_prefilter().enabled
+    monkeypatch.setattr(config, "RTL_MODEL_PREFILTER", False, raising=False)
+    assert not model_prefilter.get_model_prefilter().enabled
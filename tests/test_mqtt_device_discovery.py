@@ -0,0 +1,194 @@
+"""Tests for Home Assistant device-based discovery (mqtt_discovery_mode=device)."""
+import json
+
+import pytest
+
+import config
+from mqtt_handler import HomeNodeMQTT
+
+
+@pytest.fixture
+def device_mode(monkeypatch):
+    monkeypatch.setattr(config, "MQTT_DISCOVERY_MODE", "device", raising=False)
+    monkeypatch.setattr(config, "MQTT_DEVICE_DISCOVERY_DELAY", 0, raising=False)
+
+
+def _published(handler):
+    return [(c.args[0], c.args[1]) for c in handler.client.publish.call_args_list]
+
+
+def _device_configs(handler):
+    return [(t, json.loads(p)) for t, p in _published(handler) if t.startswith("homeassistant/device/") and p]
+
+
+def test_entity_mode_is_default(mocker):
+    mocker.patch("mqtt_handler.mqtt.Client")
+    h = HomeNodeMQTT()
+    h.send_sensor("device_1", "temperature", 21.5, "Weather", "Acurite")
+
+    topics = [t for t, _p in _published(h)]
+    assert any(t.startswith("homeassistant/sensor/") and t.endswith("/config") for t in topics)
+    assert not any(t.startswith("homeassistant/device/") for t in topics)
+
+
+def test_device_config_collects_components(mocker, device_mode):
+    mocker.patch("mqtt_handler.mqtt.Client")
+    h = HomeNodeMQTT(version="v1.2.3")
+    h.send_sensor("device_1", "temperature", 21.5, "Weather", "Acurite")
+    h.send_sensor("device_1", "humidity", 40, "Weather", "Acurite")
+
+    docs = _device_configs(h)
+    assert len(docs) == 2
+    topic, doc = docs[-1]
+    assert topic == f"homeassistant/device/rtl433_Acurite_device1{config.ID_SUFFIX}/config"
+    assert doc["origin"]["name"] == "rtl-haos"
+    assert doc["availability_topic"] == h.TOPIC_AVAILABILITY
+    assert doc["device"]["manufacturer"] == "rtl-haos"
+
+    components = doc["components"]
+    assert len(components) == 2
+    assert {c["platform"] for c in components.values()} == {"sensor"}
+    for uid, comp in components.items():
+        assert comp["unique_id"] == uid
+        assert "device" not in comp
+        assert comp["state_topic"].startswith("home/rtl_devices/device1/")
+
+    # No per-entity configs, and no migration markers without old retained configs
+    assert not [t for t, _p in _published(h) if t.startswith("homeassistant/sensor/")]
+
+
+def test_unchanged_device_config_is_not_republished(mocker, device_mode):
+    mocker.patch("mqtt_handler.mqtt.Client")
+    h = HomeNodeMQTT()
+    h.send_sensor("device_1", "temperature", 21.5, "Weather", "Acurite")
+    h._discovery_sig.clear()  # force the entity path to run again
+    h.discovery_published.clear()
+    h.send_sensor("device_1", "temperature", 22.0, "Weather", "Acurite")
+
+    assert len(_device_configs(h)) == 1
+
+
+def _legacy_config(handler, topic):
+    """Deliver a retained per-entity config from an older rtl-haos version."""
+    _deliver(handler, topic, json.dumps({"name": "Temperature", "device": {"manufacturer": "rtl-haos"}}).encode())
+
+
+def _deliver(handler, topic, payload, retain=True):
+    class Msg:
+        pass
+
+    msg = Msg()
+    msg.topic, msg.payload, msg.retain = topic, payload, retain
+    # Command topics are only set on connect.
+    handler.nuke_command_topic = handler.restart_command_topic = "home/status/test/set"
+    handler._on_message(handler.client, None, msg)
+
+
+def _temperature_uid(handler):
+    handler.send_sensor("device_1", "temperature", 21.5, "Weather", "Acurite")
+    _topic, doc = _device_configs(handler)[-1]
+    return next(iter(doc["components"]))
+
+
+def _assert_marker_device_clear(handler, old_topic):
+    pubs = _published(handler)
+    marker = pubs.index((old_topic, json.dumps({"migrate_discovery": True})))
+    device_idx = max(i for i, (t, _p) in enumerate(pubs) if t.startswith("homeassistant/device/"))
+    clear_idx = pubs.index((old_topic, ""))
+    assert marker < device_idx < clear_idx
+    assert old_topic not in handler.resync_cache.configs
+
+
+def test_migration_marker_then_clear(mocker, device_mode):
+    mocker.patch("mqtt_handler.mqtt.Client")
+    probe = HomeNodeMQTT()
+    old_topic = f"homeassistant/sensor/{_temperature_uid(probe)}/config"
+
+    h = HomeNodeMQTT()
+    h._legacy_scanning = True
+    _legacy_config(h, old_topic)
+    h.send_sensor("device_1", "temperature", 21.5, "Weather", "Acurite")
+    _assert_marker_device_clear(h, old_topic)
+
+
+def test_late_legacy_config_is_migrated_once(mocker, device_mode):
+    mocker.patch("mqtt_handler.mqtt.Client")
+    h = HomeNodeMQTT()
+    old_topic = f"homeassistant/sensor/{_temperature_uid(h)}/config"
+
+    h._legacy_scanning = True
+    _legacy_config(h, old_topic)
+    _assert_marker_device_clear(h, old_topic)
+    assert len(_device_configs(h)) == 2
+
+    _legacy_config(h, old_topic)
+    assert _published(h).count((old_topic, json.dumps({"migrate_discovery": True}))) == 1
+
+
+def test_foreign_or_unscanned_configs_are_ignored(mocker, device_mode):
+    mocker.patch("mqtt_handler.mqtt.Client")
+    h = HomeNodeMQTT()
+    old_topic = f"homeassistant/sensor/{_temperature_uid(h)}/config"
+
+    _legacy_config(h, old_topic)  # scan window closed
+    h._legacy_scanning = True
+    _deliver(h, old_topic, b'{"device": {"manufacturer": "Other"}}')
+    assert not [t for t, _p in _published(h) if t.startswith("homeassistant/sensor/")]
+
+
+def test_connect_scans_for_legacy_configs_once(mocker, device_mode):
+    mocker.patch("mqtt_handler.mqtt.Client")
+    mocker.patch("mqtt_handler.threading.Timer")
+    h = HomeNodeMQTT()
+    h._on_connect(h.client, None, None, 0)
+    h._on_connect(h.client, None, None, 0)
+    subs = [c.args[0] for c in h.client.subscribe.call_args_list]
+    assert subs.count("homeassistant/+/+/config") == 1
+    h._stop_legacy_scan()
+    h.client.unsubscribe.assert_called_once_with("homeassistant/+/+/config")
+
+
+def test_delayed_flush_batches_new_fields(mocker, device_mode, monkeypatch):
+    monkeypatch.setattr(config, "MQTT_DEVICE_DISCOVERY_DELAY", 30, raising=False)
+    timers = []
+
+    class FakeTimer:
+        def __init__(self, delay, fn, args=()):
+            self.fn, self.args = fn, args
+            self.daemon = False
+            timers.append(self)
+
+        def start(self):
+            return None
+
+    mocker.patch("mqtt_handler.mqtt.Client")
+    mocker.patch("mqtt_handler.threading.Timer", FakeTimer)
+    h = HomeNodeMQTT()
+    h.send_sensor("device_1", "temperature", 21.5, "Weather", "Acurite")
+    h.send_sensor("device_1", "humidity", 40, "Weather", "Acurite")
+
+    assert len(timers) == 1
+    assert _device_configs(h) == []
+
+    timers[0].fn(*timers[0].args)
+    docs = _device_configs(h)
+    assert len(docs) == 1 and len(docs[0][1]["components"]) == 2
+
+
+def test_nuke_scan_deletes_device_configs(mocker, device_mode):
+    mocker.patch("mqtt_handler.mqtt.Client")
+    h = HomeNodeMQTT()
+    h._on_connect(h.client, None, None, 0)
+    h.send_sensor("device_1", "temperature", 21.5, "Weather", "Acurite")
+    topic, doc = _device_configs(h)[-1]
+
+    h.is_nuking = True
+    msg = mocker.Mock(topic=topic, payload=json.dumps(doc).encode("utf-8"))
+    h._on_message(h.client, None, msg)
+    assert h.client.publish.call_args.args[:2] == (topic, "")
+
+    # Sensor devices are forgotten; the bridge buttons are re-published.
+    h._stop_nuke_scan()
+    dev_key = topic.split("/")[2]
+    assert dev_key not in h._device_discovery and dev_key not in h._device_discovery_sig
+    assert _device_configs(h)[-1][0] != topic
@@ -0,0 +1,108 @@
+"""Tests for per-device JSON state documents (mqtt_state_mode=json)."""
+import json
+
+import pytest
+
+import config
+from data_processor import DataProcessor
+from mqtt_handler import HomeNodeMQTT
+
+
+@pytest.fixture
+def json_mode(monkeypatch):
+    monkeypatch.setattr(config, "MQTT_STATE_MODE", "json", raising=False)
+    monkeypatch.setattr(config, "RTL_THROTTLE_INTERVAL", 0, raising=False)
+
+
+def _state_publishes(handler):
+    return [
+        (c.args[0], c.args[1])
+        for c in handler.client.publish.call_args_list
+        if c.args[0].startswith("home/rtl_devices/")
+    ]
+
+
+def _configs(handler):
+    return {
+        c.args[0]: json.loads(c.args[1])
+        for c in handler.client.publish.call_args_list
+        if c.args[0].startswith("homeassistant/") and c.args[0].endswith("/config") and c.args[1]
+    }
+
+
+def test_one_publish_per_packet(mocker, json_mode):
+    mocker.patch("mqtt_handler.mqtt.Client")
+    h = HomeNodeMQTT()
+    dp = DataProcessor(h)
+
+    for field, value in (("temperature", 70.1), ("humidity", 40), ("battery_ok", 1)):
+        dp.dispatch_reading("dev1", field, value, "Weather dev1", "Acurite")
+    assert _state_publishes(h) == []
+    dp.end_packet("dev1")
+
+    pubs = _state_publishes(h)
+    assert len(pubs) == 1
+    topic, body = pubs[0]
+    assert topic == "home/rtl_devices/dev1/state"
+    assert json.loads(body) == {"temperature": 70.1, "humidity": 40, "battery_ok": "OFF"}
+
+
+def test_entities_use_value_template(mocker, json_mode):
+    mocker.patch("mqtt_handler.mqtt.Client")
+    h = HomeNodeMQTT()
+    dp = DataProcessor(h)
+    dp.dispatch_reading("dev1", "temperature", 70.1, "Weather dev1", "Acurite")
+    dp.dispatch_reading("dev1", "battery_ok", 0, "Weather dev1", "Acurite")
+    dp.end_packet("dev1")
+
+    configs = _configs(h)
+    temp = configs[f"homeassistant/sensor/dev1_temperature{config.ID_SUFFIX}/config"]
+    assert temp["state_topic"] == "home/rtl_devices/dev1/state"
+    assert temp["value_template"] == '{{ value_json["temperature"] }}'
+
+    battery = configs[f"homeassistant/binary_sensor/dev1_battery_ok{config.ID_SUFFIX}/config"]
+    assert battery["value_template"] == '{{ value_json["battery_ok"] }}'
+    assert battery["payload_on"] == "ON"
+    assert json.loads(_state_publishes(h)[-1][1])["battery_ok"] == "ON"
+
+
+def test_document_keeps_last_known_fields(mocker, json_mode):
+    mocker.patch("mqtt_handler.mqtt.Client")
+    h = HomeNodeMQTT()
+    dp = DataProcessor(h)
+    dp.dispatch_reading("dev1", "temperature", 70.1, "Weather dev1", "Acurite")
+    dp.dispatch_reading("dev1", "humidity", 40, "Weather dev1", "Acurite")
+    dp.end_packet("dev1")
+    dp.dispatch_reading("dev1", "temperature", 71.0, "Weather dev1", "Acurite")
+    dp.end_packet("dev1")
+
+    assert json.loads(_state_publishes(h)[-1][1]) == {"temperature": 71.0, "humidity": 40}
+    # Nothing staged -> nothing published
+    assert h.flush_device_state("dev1") == 0
+
+
+def test_utility_refresh_updates_document(mocker, json_mode):
+    mocker.patch("mqtt_handler.mqtt.Client")
+    h = HomeNodeMQTT()
+    dp = DataProcessor(h)
+    dp.dispatch_reading("m1", "Consumption", 12345, "ERT-SCM m1", "ERT-SCM")
+    dp.dispatch_reading("m1", "ert_type", 4, "ERT-SCM m1", "ERT-SCM")  # electric
+    dp.end_packet("m1")
+
+    doc = json.loads(_state_publishes(h)[-1][1])
+    assert doc["Consumption"] == pytest.approx(123.45)
+    cfg = _configs(h)[f"homeassistant/sensor/m1_Consumption{config.ID_SUFFIX}/config"]
+    assert cfg["unit_of_measurement"] == "kWh"
+    assert cfg["state_topic"] == "home/rtl_devices/m1/state"
+
+
+def test_field_mode_unchanged(mocker, monkeypatch):
+    monkeypatch.setattr(config, "MQTT_STATE_MODE", "field", raising=False)
+    monkeypatch.setattr(config, "RTL_THROTTLE_INTERVAL", 0, raising=False)
+    mocker.patch("mqtt_handler.mqtt.Client")
+    h = HomeNodeMQTT()
+    dp = DataProcessor(h)
+    dp.dispatch_reading("dev1", "temperature", 70.1, "Weather dev1", "Acurite")
+    dp.end_packet("dev1")
+
+    assert _state_publishes(h) == [("home/rtl_devices/dev1/temperature", "70.1")]
@@ -0,0 +1,137 @@
+"""Tests for the reconnect resync (replay of remembered discovery + state)."""
+from types import SimpleNamespace
+
+import pytest
+
+import config
+import mqtt_handler
+from mqtt_handler import HomeNodeMQTT
+from resync import RANK_MAIN, RANK_OTHER, ResyncCache, replay
+
+
+def test_plan_orders_by_rank_configs_first():
+    cache = ResyncCache()
+    cache.remember_state("home/rtl_devices/a/rssi", "-80", RANK_OTHER)
+    cache.remember_config("homeassistant/sensor/a_rssi/config", "{}", RANK_OTHER)
+    cache.remember_state("home/rtl_devices/a/temperature", "70", RANK_MAIN)
+    cache.remember_config("homeassistant/sensor/a_temperature/config", "{}", RANK_MAIN)
+
+    plan = list(cache.plan())
+    assert plan == [
+        ("config", "homeassistant/sensor/a_temperature/config"),
+        ("state", "home/rtl_devices/a/temperature"),
+        ("config", "homeassistant/sensor/a_rssi/config"),
+        ("state", "home/rtl_devices/a/rssi"),
+    ]
+    assert len(cache.plan(skip_states=["home/rtl_devices/a/rssi"])) == 3
+
+    # Deleted configs are forgotten
+    cache.remember_config("homeassistant/sensor/a_rssi/config", "")
+    assert "homeassistant/sensor/a_rssi/config" not in cache.configs
+
+
+def test_replay_stops_when_publish_fails():
+    cache = ResyncCache()
+    for i in range(5):
+        cache.remember_state(f"t/{i}", str(i))
+    seen = []
+
+    def publish(kind, topic):
+        seen.append(topic)
+        return len(seen) < 3
+
+    assert replay(cache.plan(), publish, rate=0) == 2
+    assert len(seen) == 3
+
+
+def test_plan_reads_current_entries_and_skips_republished():
+    cache = ResyncCache()
+    cache.remember_state("t/a", "1")
+    cache.remember_state("t/b", "1")
+    cache.remember_state("t/c", "1")
+    plan = cache.plan()
+
+    cache.remember_state("t/a", "2")  # published live after the plan was built
+    cache.forget("t/b")
+    assert plan.current("state", "t/a") is None
+    assert plan.current("state", "t/b") is None
+    assert plan.current("state", "t/c").payload == "1"
+
+    sent = []
+    assert replay(plan, lambda kind, topic: sent.append(topic) or True, rate=0) == 1
+    assert sent == ["t/c"]
+
+
+@pytest.fixture
+def handler(mocker, monkeypatch):
+    monkeypatch.setattr(config, "MQTT_RESYNC", True, raising=False)
+    monkeypatch.setattr(config, "MQTT_RESYNC_RATE", 0, raising=False)
+    monkeypatch.setattr(config, "MAIN_SENSORS", ["temperature"], raising=False)
+    client_cls = mocker.patch("mqtt_handler.mqtt.Client")
+    client_cls.return_value.publish.return_value = SimpleNamespace(rc=mqtt_handler.mqtt.MQTT_ERR_SUCCESS)
+    return HomeNodeMQTT()
+
+
+def _topics_after(h, start):
+    return [c.args[0] for c in h.client.publish.call_args_list[start:]]
+
+
+def test_first_connect_does_not_resync(handler):
+    handler.send_sensor("dev1", "temperature", 70.1, "Weather", "Acurite")
+    handler._on_connect(handler.client, None, None, 0)
+    assert handler._reconnect_thread is None
+
+
+def test_reconnect_replays_main_sensors_first(handler):
+    h = handler
+    h._on_connect(h.client, None, None, 0)
+    h.send_sensor("dev1", "rssi", -80, "Weather", "Acurite")
+    h.send_sensor("dev1", "temperature", 70.1, "Weather", "Acurite")
+
+    h._on_disconnect(h.client, None)
+    start = len(h.client.publish.call_args_list)
+    h._on_connect(h.client, None, None, 0)
+    h._reconnect_thread.join(timeout=5)
+
+    replayed = [t for t in _topics_after(h, start) if "dev1" in t]
+    assert replayed == [
+        f"homeassistant/sensor/dev1_temperature{config.ID_SUFFIX}/config",
+        "home/rtl_devices/dev1/temperature",
+        f"homeassistant/sensor/dev1_rssi{config.ID_SUFFIX}/config",
+        "home/rtl_devices/dev1/rssi",
+    ]
+    assert all(c.kwargs.get("retain") for c in h.client.publish.call_args_list[start:])
+
+
+def test_live_publish_during_resync_is_not_overwritten(handler):
+    h = handler
+    h._on_connect(h.client, None, None, 0)
+    h.send_sensor("dev1", "temperature", 70.1, "Weather", "Acurite")
+    h.send_sensor("dev1", "rssi", -80, "Weather", "Acurite")
+    h.connected = True
+    plan = h.resync_cache.plan()
+
+    h.send_sensor("dev1", "rssi", -70, "Weather", "Acurite")
+    start = len(h.client.publish.call_args_list)
+    h.resync_cache.plan = lambda skip=(): plan
+    h._resync()
+
+    replayed = [c.args[:2] for c in h.client.publish.call_args_list[start:] if c.args[0].startswith("home/")]
+    assert replayed == [("home/rtl_devices/dev1/temperature", "70.1")]
+
+
+def test_resync_is_off_by_default(mocker):
+    mocker.patch("mqtt_handler.mqtt.Client")
+    h = HomeNodeMQTT()
+    h._on_connect(h.client, None, None, 0)
+    h.send_sensor("dev1", "temperature", 70.1, "Weather", "Acurite")
+    h._on_connect(h.client, None, None, 0)
+    assert h._reconnect_thread is None
+
+
+def test_resync_can_be_disabled(handler, monkeypatch):
+    monkeypatch.setattr(config, "MQTT_RESYNC", False, raising=False)
+    handler._on_connect(handler.client, None, None, 0)
+    handler.send_sensor("dev1", "temperature", 70.1, "Weather", "Acurite")
+    handler._on_connect(handler.client, None, None, 0)
+    assert handler._reconnect_thread is None
@@ -0,0 +1,92 @@
+"""Tests for the MQTT 5 transport mode (topic aliases, expiry, user properties)."""
+from types import SimpleNamespace
+
+import pytest
+
+import config
+import mqtt_handler
+from data_processor import DataProcessor
+from mqtt_handler import HomeNodeMQTT
+
+
+@pytest.fixture
+def v5(mocker, monkeypatch):
+    monkeypatch.setattr(config, "MQTT_PROTOCOL", "5", raising=False)
+    monkeypatch.setattr(config, "MQTT_TOPIC_ALIAS_MAXIMUM", 2, raising=False)
+    monkeypatch.setattr(config, "RTL_EXPIRE_AFTER", 600, raising=False)
+    monkeypatch.setattr(config, "RTL_THROTTLE_INTERVAL", 0, raising=False)
+    client_cls = mocker.patch("mqtt_handler.mqtt.Client")
+    client_cls.return_value.publish.return_value = SimpleNamespace(rc=mqtt_handler.mqtt.MQTT_ERR_SUCCESS)
+    h = HomeNodeMQTT()
+    h._on_connect(h.client, None, None, 0, SimpleNamespace(TopicAliasMaximum=10))
+    return h
+
+
+def _state_calls(h):
+    return [c for c in h.client.publish.call_args_list if c.kwargs.get("properties") is not None
+            and not c.args[0].startswith("homeassistant/") and c.args[0] != h.TOPIC_AVAILABILITY]
+
+
+def test_client_uses_mqttv5(mocker, monkeypatch):
+    monkeypatch.setattr(config, "MQTT_PROTOCOL", "5", raising=False)
+    monkeypatch.setattr(config, "MQTT_MAX_INFLIGHT", 5, raising=False)
+    client_cls = mocker.patch("mqtt_handler.mqtt.Client")
+    h = HomeNodeMQTT()
+    assert client_cls.call_args.kwargs["protocol"] == mqtt_handler.mqtt.MQTTv5
+    h.client.max_inflight_messages_set.assert_called_once_with(5)
+
+
+def test_v311_is_default(mocker):
+    client_cls = mocker.patch("mqtt_handler.mqtt.Client")
+    h = HomeNodeMQTT()
+    assert "protocol" not in client_cls.call_args.kwargs
+    h.send_sensor("dev1", "temperature", 70.1, "Weather", "Acurite")
+    assert all("properties" not in c.kwargs for c in h.client.publish.call_args_list)
+
+
+def test_connect_sends_receive_maximum(v5, monkeypatch):
+    monkeypatch.setattr(config, "MQTT_RECEIVE_MAXIMUM", 32, raising=False)
+    monkeypatch.setattr(mqtt_handler, "DISCOVERY_REPORT_DELAY", 3600)
+    v5.start()
+    assert v5.client.connect.call_args.kwargs["properties"].ReceiveMaximum == 32
+
+
+def test_topic_alias_replaces_repeated_topic(v5):
+    v5.send_sensor("dev1", "temperature", 70.1, "Weather", "Acurite")
+    v5.send_sensor("dev1", "temperature", 70.2, "Weather", "Acurite")
+
+    first, second = _state_calls(v5)
+    assert first.args[0] == "home/rtl_devices/dev1/temperature"
+    assert first.kwargs["properties"].TopicAlias == 1
+    assert second.args[0] == ""
+    assert second.kwargs["properties"].TopicAlias == 1
+
+
+def test_alias_limit_reuses_least_recently_used(v5):
+    for field in ("a", "b", "c"):
+        v5.send_sensor("dev1", field, 1, "Weather", "Acurite")
+    calls = _state_calls(v5)
+    # Broker allows 10, config caps at 2: "c" takes over the alias of "a".
+    assert [c.kwargs["properties"].TopicAlias for c in calls] == [1, 2, 1]
+    assert calls[2].args[0] == "home/rtl_devices/dev1/c"
+    assert "home/rtl_devices/dev1/a" not in v5._topic_aliases
+
+
+def test_reconnect_resets_aliases(v5):
+    v5.send_sensor("dev1", "temperature", 70.1, "Weather", "Acurite")
+    v5._on_connect(v5.client, None, None, 0, SimpleNamespace(TopicAliasMaximum=0))
+    v5.send_sensor("dev1", "temperature", 70.2, "Weather", "Acurite")
+    last = _state_calls(v5)[-1]
+    assert last.args[0] == "home/rtl_devices/dev1/temperature"
+    assert not hasattr(last.kwargs["properties"], "TopicAlias")
+
+
+def test_expiry_and_user_properties(v5):
+    dp = DataProcessor(v5)
+    dp.dispatch_reading("dev1", "temperature", 70.1, "Weather", "Acurite", radio_name="RTL_101", radio_freq="433.92M")
+    dp.dispatch_reading("dev1", "battery_ok", 1, "Weather", "Acurite", radio_name="RTL_101", radio_freq="433.92M")
+
+    temp, battery = _state_calls(v5)
+    assert temp.kwargs["properties"].MessageExpiryInterval == 600
+    assert battery.kwargs["properties"].MessageExpiryInterval == 86400
+    assert temp.kwargs["properties"].UserProperty == [("radio", "RTL_101"), ("freq", "433.92M")]
@@ -0,0 +1,91 @@
+"""Tests for the spike/outlier filter."""
+import pytest
+
+import config
+import data_processor
+import outlier_filter
+from outlier_filter import OutlierFilter
+
+
+def test_physical_limits_by_unit():
+    f = OutlierFilter()
+    assert f.reject("a", "humidity", 150)
+    assert f.reject("a", "temperature", -80.0)  # published in °F
+    assert f.reject("a", "temperature_C", 95.0)
+    assert f.reject("a", "temperature_C", float("nan"))
+    assert not f.reject("a", "temperature_C", 21.5)
+    assert f.rejected == 4 and f.rejected_by_device == {"a": 4}
+
+
+def test_hampel_rejects_spike_and_keeps_normal_changes():
+    f = OutlierFilter(window=7)
+    for v in (70.0, 70.5, 71.0, 70.8):
+        assert not f.reject("ws", "temperature", v)
+    assert f.reject("ws", "temperature", -40.0)
+    assert not f.reject("ws", "temperature", 72.5)  # within the 3-degree floor
+    assert f.rejected == 1
+
+
+def test_persistent_level_change_is_accepted():
+    f = OutlierFilter(window=7)
+    for _ in range(5):
+        f.reject("h", "humidity", 50)
+    results = [f.reject("h", "humidity", 80) for _ in range(5)]
+    assert results == [True, True, True, True, False]
+
+
+def test_other_fields_and_values_pass():
+    f = OutlierFilter()
+    for v in (5, 5, 5, 5):
+        f.reject("w", "wind_avg_km_h", v)
+    assert not f.reject("w", "wind_avg_km_h", 90)
+    assert not f.reject("w", "humidity", "n/a")
+    assert not f.reject("w", "model", "Acurite")
+
+
+def test_forget_drops_history():
+    f = OutlierFilter()
+    for v in (20.0, 20.0, 20.0):
+        f.reject("t", "temperature_C", v)
+    f.forget("t")
+    assert not f.reject("t", "temperature_C", 40.0)
+
+
+class DummyMQTT:
+    def __init__(self):
+        self.calls = []
+
+    def send_sensor(self, clean_id, field, value, dev_name, model, is_rtl=True):
+        self.calls.append((field, value))
+
+
+@pytest.fixture
+def filtering(monkeypatch):
+    monkeypatch.setattr(config, "RTL_OUTLIER_FILTER", True, raising=False)
+    monkeypatch.setattr(config, "RTL_THROTTLE_INTERVAL", 0, raising=False)
+    monkeypatch.setattr(outlier_filter, "_filter", None)
+    yield
+    outlier_filter._filter = None
+
+
+def test_data_processor_drops_outliers_and_reports_count(filtering):
+    mqtt = DummyMQTT()
+    dp = data_processor.DataProcessor(mqtt)
+    dp.dispatch_reading("ws", "humidity", 45, "WS", "Acurite")
+    dp.dispatch_reading("ws", "humidity", 150, "WS", "Acurite")
+    dp.dispatch_reading("ws", "humidity", 46, "WS", "Acurite")
+
+    assert mqtt.calls == [("humidity", 45), ("outliers_rejected", 1), ("humidity", 46)]
+    assert outlier_filter.get_outlier_filter().rejected == 1
+
+
+def test_rejection_count_is_throttled_like_other_fields(filtering, monkeypatch):
+    monkeypatch.setattr(config, "RTL_THROTTLE_INTERVAL", 30, raising=False)
+    mqtt = DummyMQTT()
+    dp = data_processor.DataProcessor(mqtt)
+    dp.dispatch_reading("ws", "humidity", 150, "WS", "Acurite")
+    dp.dispatch_reading("ws", "humidity", 170, "WS", "Acurite")
+
+    assert mqtt.calls == []
+    assert dp.buffer["ws"]["outliers_rejected"] == [1, 2]
+    assert "outliers_rejected" in data_processor.NON_AVERAGED_NUMERIC_FIELDS  # flushed as the last count
@@ -0,0 +1,140 @@
+"""Tests for rtl_433 decoder learning and automatic -R pruning."""
+import json
+
+import pytest
+
+import config
+import protocol_profile
+import rtl_manager as rm
+from protocol_profile import ProtocolProfileStore, radio_uses_explicit_protocols
+
+
+@pytest.fixture
+def learn_cfg(monkeypatch, tmp_path):
+    path = tmp_path / "profile.json"
+    monkeypatch.setattr(config, "RTL_PROTOCOL_LEARNING", True, raising=False)
+    monkeypatch.setattr(config, "RTL_PROTOCOL_AUTOPRUNE", True, raising=False)
+    monkeypatch.setattr(config, "RTL_PROTOCOL_LEARN_MIN_PACKETS", 3, raising=False)
+    monkeypatch.setattr(config, "RTL_PROTOCOL_MIN_COUNT", 2, raising=False)
+    monkeypatch.setattr(config, "RTL_PROTOCOL_PROBE_INTERVAL", 3600, raising=False)
+    monkeypatch.setattr(config, "RTL_PROTOCOL_PROBE_DURATION", 600, raising=False)
+    monkeypatch.setattr(config, "RTL_PROTOCOL_PROFILE_PATH", str(path), raising=False)
+    monkeypatch.setattr(protocol_profile, "_profile_store", None)
+    yield path
+    protocol_profile._profile_store = None
+
+
+def test_recommended_set_needs_min_count_and_packets(learn_cfg):
+    store = ProtocolProfileStore()
+    store.record("radio_status_101", 40)
+    store.record("radio_status_101", "40")
+    store.record("radio_status_101", None)  # no protocol metadata -> ignored
+    assert store.ready("radio_status_101") is False
+
+    store.record("radio_status_101", 104)
+    assert store.packets("radio_status_101") == 3
+    assert store.recommended("radio_status_101") == [40]
+    assert store.ready("radio_status_101") is True
+
+
+def test_profile_persists_across_instances(learn_cfg):
+    store = ProtocolProfileStore()
+    for p in (104, 104, 105):
+        store.record("radio_status_101", p)
+    assert store.save() is True
+    assert store.save() is False  # clean
+
+    saved = json.loads(learn_cfg.read_text())
+    assert saved["radios"]["radio_status_101"]["counts"] == {"104": 2, "105": 1}
+
+    reloaded = ProtocolProfileStore()
+    assert reloaded.recommended("radio_status_101", min_count=1) == [104, 105]
+
+
+def test_save_skipped_without_target_directory(tmp_path):
+    store = ProtocolProfileStore(path=str(tmp_path / "missing" / "profile.json"))
+    store.record("r", 1)
+    assert store.save(force=True) is False
+
+
+@pytest.mark.parametrize(
+    "radio,global_args,expected",
+    [
+        ({"protocols": "104,105"}, "", True),
+        ({"args": "-R 40"}, "", True),
+        ({"config_inline": "-R 40\n"}, "", True),
+        ({}, "-g 40 -R 12", True),
+        ({"args": "-g 40"}, "", False),
+    ],
+)
+def test_explicit_protocol_detection(monkeypatch, radio, global_args, expected):
+    monkeypatch.setattr(config, "RTL_433_ARGS", global_args, raising=False)
+    monkeypatch.setattr(config, "RTL_433_CONFIG_PATH", "", raising=False)
+    monkeypatch.setattr(config, "RTL_433_CONFIG_INLINE", "", raising=False)
+    assert radio_uses_explicit_protocols(radio) is expected
+
+
+def test_learning_requests_protocol_metadata(learn_cfg, monkeypatch):
+    monkeypatch.setattr(config, "RTL_433_ARGS", "", raising=False)
+    cmd = rm.build_rtl_433_command({"name": "R", "id": "101", "freq": "433.92M"})
+    assert "protocol" in [cmd[i + 1] for i, tok in enumerate(cmd[:-1]) if tok == "-M"]
+
+
+def test_rtl_loop_learns_then_restarts_pruned(learn_cfg, monkeypatch):
+    monkeypatch.setattr(config, "RTL_433_ARGS", "", raising=False)
+    monkeypatch.setattr(config, "RTL_433_CONFIG_PATH", "", raising=False)
+    monkeypatch.setattr(config, "RTL_433_CONFIG_INLINE", "", raising=False)
+
+    class DummyProcessor:
+        def dispatch_reading(self, *a, **k):
+            return None
+
+    packets = [
+        {"model": "Acurite-Tower", "id": 1, "protocol": 40, "temperature_C": 20.0},
+        {"model": "Acurite-Tower", "id": 1, "protocol": 40, "temperature_C": 20.1},
+        {"model": "Oddball", "id": 9, "protocol": 200, "temperature_C": 5.0},
+    ]
+    commands = []
+
+    class DummyProc:
+        def __init__(self, lines):
+            self._lines = lines
+
+            class _Stdout:
+                def readline(_self):
+                    return self._lines.pop(0) if self._lines else ""
+
+            self.stdout = _Stdout()
+
+        def poll(self):
+            return None if self._lines else 1
+
+        def terminate(self):
+            return None
+
+        def wait(self, timeout=None):
+            return None
+
+    def fake_popen(cmd, *a, **k):
+        commands.append(list(cmd))
+        lines = [json.dumps(p) + "\n" for p in packets] if len(commands) == 1 else []
+        return DummyProc(lines)
+
+    monkeypatch.setattr(rm.subprocess, "Popen", fake_popen)
+
+    sleeps = []
+
+    def fake_sleep(secs):
+        sleeps.append(secs)
+        if len(sleeps) >= 2:
+            raise StopIteration()
+
+    monkeypatch.setattr(rm.time, "sleep", fake_sleep)
+
+    with pytest.raises(StopIteration):
+        rm.rtl_loop({"name": "RTL_101", "id": "101", "freq": "433.92M"}, None, DummyProcessor(), "sys", "Bridge")
+
+    assert "-R" not in commands[0]
+    pruned = [commands[1][i + 1] for i, tok in enumerate(commands[1]) if tok == "-R"]
+    assert pruned == ["40"]
+    assert json.loads(learn_cfg.read_text())["radios"]["radio_status_101"]["packets"] == 3
@@ -0,0 +1,151 @@
+"""Tests for the prioritized, token-bucket publish scheduler (mqtt_rate_limit)."""
+from types import SimpleNamespace
+
+import pytest
+
+import config
+import mqtt_handler
+import publish_scheduler
+from mqtt_handler import HomeNodeMQTT
+from publish_scheduler import (
+    CLASS_DIAGNOSTIC,
+    CLASS_DISCOVERY,
+    CLASS_EVENT,
+    CLASS_STATE,
+    PublishScheduler,
+)
+
+
+class FakeClock:
+    def __init__(self, t=0.0):
+        self.t = t
+
+    def __call__(self):
+        return self.t
+
+
+def _drain(sched):
+    while sched.run_once(timeout=0):
+        pass
+
+
+def test_sends_by_priority_then_fifo():
+    sent = []
+    sched = PublishScheduler(lambda t, p, **kw: sent.append(t), msg_rate=0)
+    sched.submit(CLASS_DIAGNOSTIC, "d", "1")
+    sched.submit(CLASS_DISCOVERY, "c1", "{}")
+    sched.submit(CLASS_STATE, "s1", "1")
+    sched.submit(CLASS_EVENT, "e", "ON")
+    sched.submit(CLASS_STATE, "s2", "2")
+    _drain(sched)
+    assert sent == ["e", "s1", "s2", "c1", "d"]
+
+
+def test_states_coalesce_but_discovery_does_not():
+    sent = []
+    sched = PublishScheduler(lambda t, p, **kw: sent.append((t, p, kw.get("retain"))), msg_rate=0)
+    sched.submit(CLASS_STATE, "s", "1", retain=True)
+    sched.submit(CLASS_STATE, "s", "2", retain=True)
+    sched.submit(CLASS_DISCOVERY, "c", "")
+    sched.submit(CLASS_DISCOVERY, "c", "{}")
+    assert len(sched) == 3
+    _drain(sched)
+    assert sent == [("s", "2", True), ("c", "", None), ("c", "{}", None)]
+
+
+def test_events_are_never_coalesced():
+    sent = []
+    sched = PublishScheduler(lambda t, p, **kw: sent.append((t, p)), msg_rate=0)
+    sched.submit(CLASS_STATE, "door", "OFF")
+    sched.submit(CLASS_EVENT, "door", "ON")
+    sched.submit(CLASS_EVENT, "door", "OFF")
+    assert len(sched) == 2  # the older queued state is dropped
+    _drain(sched)
+    assert sent == [("door", "ON"), ("door", "OFF")]
+
+
+def test_full_queue_drops_oldest_lowest_priority(monkeypatch):
+    monkeypatch.setattr(publish_scheduler, "MAX_QUEUE", 3)
+    sent = []
+    sched = PublishScheduler(lambda t, p, **kw: sent.append((t, p)), msg_rate=0)
+    sched.submit(CLASS_STATE, "s1", "1")
+    sched.submit(CLASS_STATE, "s2", "1")
+    sched.submit(CLASS_EVENT, "e", "ON")
+    sched.submit(CLASS_EVENT, "e", "OFF")  # over the bound: drops s1
+    assert sched.dropped == 1 and len(sched) == 3
+    assert "s1" not in sched._pending_state
+    sched.submit(CLASS_STATE, "s1", "2")  # queued anew, not merged into the dropped item
+    assert sched.dropped == 2  # s2 is now the oldest lowest-priority entry
+    _drain(sched)
+    assert sent == [("e", "ON"), ("e", "OFF"), ("s1", "2")]
+
+
+def test_byte_budget_delays_and_stats_report_it():
+    clock = FakeClock()
+    sent = []
+    sched = PublishScheduler(lambda t, p, **kw: sent.append(t), msg_rate=0, byte_rate=10, clock=clock)
+    sched.submit(CLASS_STATE, "abcde", "12345")
+    sched.submit(CLASS_STATE, "fghij", "12345")
+
+    assert sched.run_once(timeout=0)
+    # Second message needs another 10 bytes of budget (1 s at 10 B/s).
+    assert sched.byte_bucket.delay_for(10) == pytest.approx(1.0)
+    clock.t += 1.0
+    assert sched.run_once(timeout=0)
+    assert sent == ["abcde", "fghij"]
+
+    stats = sched.take_stats()
+    assert stats[CLASS_STATE]["sent"] == 2
+    assert stats[CLASS_STATE]["max_delay_ms"] == pytest.approx(1000.0)
+    assert stats[CLASS_EVENT] == {"sent": 0, "avg_delay_ms": 0.0, "max_delay_ms": 0.0}
+    assert sched.take_stats()[CLASS_STATE]["sent"] == 0
+
+
+def test_queue_held_while_not_ready():
+    sent = []
+    ready = [False]
+    sched = PublishScheduler(lambda t, p, **kw: sent.append(t), msg_rate=0, ready=lambda: ready[0])
+    sched.submit(CLASS_STATE, "s", "1")
+    assert sched.run_once(timeout=0) is False
+    ready[0] = True
+    assert sched.run_once(timeout=0)
+    assert sent == ["s"]
+
+
+@pytest.fixture
+def limited(mocker, monkeypatch):
+    monkeypatch.setattr(config, "MQTT_RATE_LIMIT", 1000, raising=False)
+    monkeypatch.setattr(config, "MAIN_SENSORS", ["temperature"], raising=False)
+    client_cls = mocker.patch("mqtt_handler.mqtt.Client")
+    client_cls.return_value.publish.return_value = SimpleNamespace(rc=mqtt_handler.mqtt.MQTT_ERR_SUCCESS)
+    # Drive the queue by hand instead of through the worker thread.
+    mocker.patch("mqtt_handler.PublishScheduler.start")
+    h = HomeNodeMQTT()
+    h.connected = True
+    yield h
+    h.scheduler.stop()
+
+
+def test_handler_queues_by_class(limited):
+    h = limited
+    h.send_sensor("dev1", "rssi", -80, "Weather", "Acurite")
+    h.send_sensor("dev1", "temperature", 70.1, "Weather", "Acurite")
+    h.send_sensor("dev1", "tamper", 1, "Weather", "Acurite")
+    assert h.client.publish.call_args_list == []
+
+    _drain(h.scheduler)
+    topics = [c.args[0] for c in h.client.publish.call_args_list]
+    assert topics[:2] == ["home/rtl_devices/dev1/tamper", "home/rtl_devices/dev1/temperature"]
+    assert topics[-1] == "home/rtl_devices/dev1/rssi"
+    assert all(t.startswith("homeassistant/") for t in topics[2:-1])
+
+    stats = h.publish_delay_stats()
+    assert stats[CLASS_EVENT]["sent"] == 1 and stats[CLASS_DIAGNOSTIC]["sent"] == 1
+
+
+def test_handler_without_limit_publishes_directly(mocker):
+    mocker.patch("mqtt_handler.mqtt.Client")
+    h = HomeNodeMQTT()
+    assert h.scheduler is None and h.publish_delay_stats() is None
+    h.send_sensor("dev1", "temperature", 70.1, "Weather", "Acurite")
+    assert any(c.args[0] == "home/rtl_devices/dev1/temperature" for c in h.client.publish.call_args_list)
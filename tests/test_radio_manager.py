@@ -0,0 +1,185 @@
+"""Tests for the USB hotplug radio manager."""
+import builtins
+import threading
+
+import pytest
+
+import config
+import radio_manager
+import rtl_manager as rm
+import sdr_enum
+from radio_manager import RadioManager
+
+_ORIG_PRINT = builtins.print
+import main as main_mod  # noqa: E402
+
+builtins.print = _ORIG_PRINT
+
+
+def _add_dongle(root, name, serial, devnum):
+    d = root / name
+    d.mkdir(parents=True)
+    (d / "idVendor").write_text("0bda\n")
+    (d / "idProduct").write_text("2838\n")
+    (d / "serial").write_text(serial + "\n")
+    (d / "busnum").write_text("1\n")
+    (d / "devnum").write_text(f"{devnum}\n")
+
+
+class Recorder:
+    """run_radio stand-in: blocks until its stop event is set."""
+
+    def __init__(self):
+        self.started = []
+        self.stopped = []
+
+    def __call__(self, radio, stop_event):
+        self.started.append(radio["name"])
+        stop_event.wait(5)
+        self.stopped.append(radio["name"])
+
+
+def _planner(devices):
+    return [{"name": f"RTL_{d['id']}", "id": d["id"], "index": d["index"]} for d in devices]
+
+
+def test_apply_starts_and_stops_by_plan():
+    rec = Recorder()
+    mgr = RadioManager(_planner, lambda: [], rec, start_stagger=0)
+
+    started, stopped = mgr.apply([{"id": "101", "index": 0}, {"id": "102", "index": 1}])
+    assert sorted(started) == ["RTL_101", "RTL_102"]
+    assert stopped == []
+
+    # 101 unplugged -> 102 moves to index 0 (new plan), 101 stops.
+    started, stopped = mgr.apply([{"id": "102", "index": 0}])
+    assert started == ["RTL_102"]
+    assert sorted(stopped) == ["RTL_101", "RTL_102"]
+    assert sorted(rec.stopped) == ["RTL_101", "RTL_102"]
+
+    # Same plan again -> nothing to do
+    assert mgr.apply([{"id": "102", "index": 0}]) == ([], [])
+    mgr.stop()
+
+
+def test_poll_once_replans_on_sysfs_change(tmp_path, monkeypatch):
+    monkeypatch.setattr(sdr_enum, "SYSFS_USB_ROOT", str(tmp_path))
+    monkeypatch.setattr(radio_manager, "SETTLE_DELAY", 0)
+    _add_dongle(tmp_path, "1-1", "00000101", 2)
+
+    detected = [[{"id": "00000101", "index": 0}]]
+    rec = Recorder()
+    mgr = RadioManager(_planner, lambda: detected[0], rec, start_stagger=0)
+    mgr._fingerprint = sdr_enum.fingerprint(sdr_enum.scan_sysfs())
+    mgr.apply(detected[0])
+
+    assert mgr.poll_once() is False  # unchanged
+
+    _add_dongle(tmp_path, "1-2", "00000102", 3)
+    detected[0] = [{"id": "00000101", "index": 0}, {"id": "00000102", "index": 1}]
+    assert mgr.poll_once() is True
+    assert sorted(r["name"] for r, _e, _t in mgr.running.values()) == ["RTL_00000101", "RTL_00000102"]
+    mgr.stop()
+
+
+def test_plan_hotplug_radios_manual_waits_for_serial(monkeypatch):
+    monkeypatch.setattr(
+        config,
+        "RTL_CONFIG",
+        [
+            {"name": "Weather", "id": "101", "freq": "433.92M"},
+            {"name": "Utility", "id": "102", "freq": "915M"},
+            {"name": "Remote", "id": "net", "tcp_host": "10.0.0.2", "freq": "433.92M"},
+        ],
+        raising=False,
+    )
+    radios = main_mod._plan_hotplug_radios([{"id": "102", "index": 0}])
+    assert [(r["name"], r.get("index")) for r in radios] == [("Utility", 0), ("Remote", None)]
+
+
+def test_plan_hotplug_radios_reports_config_problems(monkeypatch, capsys):
+    monkeypatch.setattr(
+        config,
+        "RTL_CONFIG",
+        [
+            {"name": "Weather", "id": "101", "freq": "433.92M"},
+            {"name": "Copy", "id": "101", "freq": "915M"},
+            {"name": "Hopper", "id": "102", "freq": "433.92M", "hop_interval": 60},
+        ],
+        raising=False,
+    )
+    radios = main_mod._plan_hotplug_radios([{"id": "101", "index": 0}, {"id": "102", "index": 1}])
+    assert [r["name"] for r in radios] == ["Weather", "Hopper"]
+    out = capsys.readouterr().out
+    assert "Duplicate ID '101'" in out
+    assert "CONFIG WARNING: [Radio: Hopper]" in out
+
+
+def test_hotplug_auto_mode_waits_for_a_dongle(monkeypatch):
+    monkeypatch.setattr(config, "RTL_CONFIG", [], raising=False)
+    monkeypatch.setattr(config, "RTL_AUTO_MULTI", False, raising=False)
+    rec = Recorder()
+    mgr = RadioManager(main_mod._plan_hotplug_radios, lambda: [], rec, start_stagger=0)
+    assert mgr.apply([]) == ([], [])
+    assert mgr.running == {}
+
+    started, _stopped = mgr.apply([{"name": "RTL_101", "id": "101", "index": 0}])
+    assert len(started) == 1
+    mgr.stop()
+
+
+def test_apply_staggers_radio_starts(monkeypatch):
+    waits = []
+    rec = Recorder()
+    mgr = RadioManager(_planner, lambda: [], rec, start_stagger=3)
+    monkeypatch.setattr(mgr._stop, "wait", lambda t: waits.append(t) or False)
+    started, _stopped = mgr.apply([{"id": "101", "index": 0}, {"id": "102", "index": 1}])
+    assert len(started) == 2 and waits == [3]
+    mgr.stop()
+
+
+def test_plan_hotplug_radios_auto_primary(monkeypatch):
+    monkeypatch.setattr(config, "RTL_CONFIG", [], raising=False)
+    monkeypatch.setattr(config, "RTL_AUTO_MULTI", False, raising=False)
+    assert main_mod._plan_hotplug_radios([]) == []
+    radios = main_mod._plan_hotplug_radios([{"name": "RTL_101", "id": "101", "index": 0}])
+    assert len(radios) == 1 and radios[0]["freq"] == config.RTL_DEFAULT_FREQ
+
+
+def test_rtl_loop_exits_when_stopped(monkeypatch):
+    published = []
+
+    class DummyMQTT:
+        def send_sensor(self, sensor_id, field, value, device_name, device_model, is_rtl=True, friendly_name=None):
+            published.append(value)
+
+    class DummyProc:
+        class stdout:
+            @staticmethod
+            def readline():
+                return ""
+
+        def poll(self):
+            return 1
+
+        def terminate(self):
+            return None
+
+        def wait(self, timeout=None):
+            return None
+
+    stop = threading.Event()
+
+    def fake_popen(*a, **k):
+        stop.set()  # manager stops the radio while it runs
+        return DummyProc()
+
+    monkeypatch.setattr(rm.subprocess, "Popen", fake_popen)
+
+    def no_sleep(_secs):
+        pytest.fail("stopped radio must not back off")
+
+    monkeypatch.setattr(rm.time, "sleep", no_sleep)
+
+    rm.rtl_loop({"name": "RTL_101", "id": "101", "freq": "433.92M"}, DummyMQTT(), None, "sys", "Bridge", stop_event=stop)
+    assert published[-1] == "Disconnected"
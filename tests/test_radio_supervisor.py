@@ -0,0 +1,227 @@
+"""Tests for the per-radio rtl_433 supervisor (watchdog + restart policy)."""
+import pytest
+
+import config
+import rtl_manager as rm
+from radio_supervisor import RadioSupervisor
+
+
+class FakeClock:
+    def __init__(self, t=1000.0):
+        self.t = t
+
+    def __call__(self):
+        return self.t
+
+    def advance(self, s):
+        self.t += s
+
+
+class FakeProcess:
+    def __init__(self):
+        self.terminated = 0
+
+    def terminate(self):
+        self.terminated += 1
+
+
+@pytest.fixture
+def sup_cfg(monkeypatch):
+    monkeypatch.setattr(config, "RTL_WATCHDOG_ENABLED", True, raising=False)
+    monkeypatch.setattr(config, "RTL_WATCHDOG_FACTOR", 4, raising=False)
+    monkeypatch.setattr(config, "RTL_WATCHDOG_MIN_TIMEOUT", 30, raising=False)
+    monkeypatch.setattr(config, "RTL_WATCHDOG_MAX_TIMEOUT", 600, raising=False)
+    monkeypatch.setattr(config, "RTL_RESTART_BACKOFF_BASE", 5, raising=False)
+    monkeypatch.setattr(config, "RTL_RESTART_BACKOFF_MAX", 60, raising=False)
+    monkeypatch.setattr(config, "RTL_RESTART_JITTER", 0, raising=False)
+    monkeypatch.setattr(config, "RTL_RESTART_BUDGET", 3, raising=False)
+    monkeypatch.setattr(config, "RTL_RESTART_BUDGET_WINDOW", 600, raising=False)
+    monkeypatch.setattr(config, "RTL_RESTART_BUDGET_COOLDOWN", 500, raising=False)
+
+
+def _learn(sup, clock, gap, n):
+    for _ in range(n):
+        clock.advance(gap)
+        sup.note_packet()
+
+
+def test_watchdog_not_armed_until_interval_learned(sup_cfg):
+    clock = FakeClock()
+    sup = RadioSupervisor("R1", clock=clock)
+    sup.process_started()
+
+    _learn(sup, clock, 10, 2)  # first packet has no gap -> only 1 interval
+    assert sup.stall_timeout() is None
+    clock.advance(10_000)
+    assert sup.is_stalled() is False
+
+
+def test_watchdog_threshold_learned_and_clamped(sup_cfg):
+    clock = FakeClock()
+    sup = RadioSupervisor("R1", clock=clock)
+    sup.process_started()
+
+    _learn(sup, clock, 20, 5)
+    assert sup.stall_timeout() == pytest.approx(80)
+
+    # Very chatty radio -> clamped to min timeout
+    sup2 = RadioSupervisor("R2", clock=clock)
+    sup2.process_started()
+    _learn(sup2, clock, 1, 5)
+    assert sup2.stall_timeout() == 30
+
+
+def test_check_terminates_stalled_process(sup_cfg):
+    clock = FakeClock()
+    sup = RadioSupervisor("R1", clock=clock)
+    sup.process_started()
+    _learn(sup, clock, 20, 5)
+    proc = FakeProcess()
+
+    clock.advance(60)
+    assert sup.check(proc) is None
+    assert proc.terminated == 0
+
+    clock.advance(30)
+    assert sup.check(proc) == "stalled"
+    assert proc.terminated == 1
+    assert sup.classify_exit(-15) == "stalled"
+
+
+def test_log_lines_count_as_activity(sup_cfg):
+    clock = FakeClock()
+    sup = RadioSupervisor("R1", clock=clock)
+    sup.process_started()
+    _learn(sup, clock, 20, 5)
+
+    clock.advance(70)
+    sup.note_line()
+    clock.advance(70)
+    assert sup.is_stalled() is False
+
+
+def test_planned_restart_is_neutral(sup_cfg):
+    clock = FakeClock()
+    sup = RadioSupervisor("R1", clock=clock)
+    sup.process_started()
+    proc = FakeProcess()
+
+    sup.schedule_restart(100, reason="replan")
+    clock.advance(99)
+    assert sup.check(proc) is None
+    clock.advance(2)
+    assert sup.check(proc) == "replan"
+    assert sup.classify_exit(-15) == "replan"
+    assert sup.next_delay("replan") == 5
+    assert sup.failure_streak == 0
+
+
+@pytest.mark.parametrize(
+    "rc,status,expected",
+    [
+        (1, "Error: No RTL-SDR device found", "no_device"),
+        (1, "Error: USB busy / claimed", "usb_busy"),
+        (-11, None, "crashed"),
+        (-15, None, "terminated"),
+        (2, None, "error"),
+        (0, None, "exited"),
+    ],
+)
+def test_classify_exit(sup_cfg, rc, status, expected):
+    sup = RadioSupervisor("R1", clock=FakeClock())
+    sup.process_started()
+    assert sup.classify_exit(rc, status) == expected
+
+
+def test_backoff_doubles_and_caps(sup_cfg, monkeypatch):
+    monkeypatch.setattr(config, "RTL_RESTART_BUDGET", 0, raising=False)
+    clock = FakeClock()
+    sup = RadioSupervisor("R1", clock=clock)
+
+    delays = []
+    for _ in range(6):
+        sup.process_started()
+        clock.advance(1)
+        delays.append(sup.next_delay("error"))
+    assert delays == [5, 10, 20, 40, 60, 60]
+
+
+def test_backoff_resets_after_healthy_run(sup_cfg):
+    clock = FakeClock()
+    sup = RadioSupervisor("R1", clock=clock)
+    sup.process_started()
+    sup.next_delay("error")
+    sup.process_started()
+    assert sup.next_delay("error") == 10
+
+    sup.process_started()
+    sup.note_packet()
+    clock.advance(400)
+    assert sup.next_delay("error") == 5
+
+
+def test_backoff_jitter_bounds(sup_cfg, monkeypatch):
+    monkeypatch.setattr(config, "RTL_RESTART_JITTER", 0.2, raising=False)
+    lo = RadioSupervisor("R1", clock=FakeClock(), rng=lambda: 0.0)
+    hi = RadioSupervisor("R1", clock=FakeClock(), rng=lambda: 1.0)
+    lo.process_started()
+    hi.process_started()
+    assert lo.next_delay("error") == pytest.approx(4.0)
+    assert hi.next_delay("error") == pytest.approx(6.0)
+
+
+def test_restart_budget_triggers_cooldown(sup_cfg):
+    clock = FakeClock()
+    sup = RadioSupervisor("R1", clock=clock)
+    for expected in (5, 10, 20):
+        sup.process_started()
+        clock.advance(1)
+        assert sup.next_delay("crashed") == expected
+    sup.process_started()
+    assert sup.next_delay("crashed") == 500
+
+
+def test_planned_restarts_skip_budget_and_reset_streak(sup_cfg):
+    clock = FakeClock()
+    sup = RadioSupervisor("R1", clock=clock)
+    sup.process_started()
+    sup.next_delay("crashed")
+    for reason in ("replan", "probe", "terminated", "stopped", "replan"):
+        sup.process_started()
+        clock.advance(1)
+        assert sup.next_delay(reason) == 5
+    assert sup.failure_streak == 0
+    assert len(sup.restart_times) == 1
+
+
+def test_rtl_loop_uses_backoff_delay(monkeypatch, sup_cfg):
+    class DummyStdout:
+        def readline(self):
+            return ""
+
+    class DummyProc:
+        stdout = DummyStdout()
+
+        def poll(self):
+            return 1
+
+        def terminate(self):
+            return None
+
+        def wait(self, timeout=None):
+            return None
+
+    monkeypatch.setattr(rm.subprocess, "Popen", lambda *a, **k: DummyProc())
+
+    slept = []
+
+    def stop_sleep(secs):
+        slept.append(secs)
+        raise StopIteration()
+
+    monkeypatch.setattr(rm.time, "sleep", stop_sleep)
+
+    with pytest.raises(StopIteration):
+        rm.rtl_loop({"name": "R", "id": "1", "freq": "433.92M"}, None, None, "sys", "Bridge")
+
+    assert slept == [5]
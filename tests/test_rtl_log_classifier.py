@@ -0,0 +1,147 @@
+"""Tests for rtl_433 log-line classification and degradation counters."""
+import pytest
+
+import config
+import rtl_manager as rm
+import sdr_health
+from rtl_log_classifier import classify_log_line
+from sdr_health import SDRHealthMonitor, get_health_monitor
+
+
+@pytest.fixture(autouse=True)
+def reset_health_singleton():
+    sdr_health._health_monitor = None
+    SDRHealthMonitor._instance = None
+    yield
+    sdr_health._health_monitor = None
+    SDRHealthMonitor._instance = None
+
+
+@pytest.mark.parametrize(
+    "line,category,kind",
+    [
+        ("Detached kernel driver", "noise", "noise"),
+        ("No supported devices found.", "fatal", "no_device"),
+        ("usb_claim_interface error -6", "fatal", "usb_busy"),
+        ("Failed to open rtlsdr device #0: Permission denied", "fatal", "permission"),
+        ("Kernel driver is active, or device is claimed by second instance of librtlsdr.", "fatal", "kernel_driver"),
+        ("Segmentation fault", "fatal", "crashed"),
+        ("Lost 16384 samples", "degraded", "sample_drop"),
+        ("WARNING: samples dropped, host too slow", "degraded", "sample_drop"),
+        ("cb transfer status: 1, canceling...", "degraded", "async_buffer"),
+        ("Async read stalled, exiting!", "degraded", "async_buffer"),
+        ("[R82XX] PLL not locked!", "degraded", "pll_unlock"),
+        ("Input overload detected", "degraded", "overload"),
+    ],
+)
+def test_classify_known_lines(line, category, kind):
+    cls = classify_log_line(line)
+    assert cls is not None
+    assert (cls.category, cls.kind) == (category, kind)
+
+
+def test_classify_fatal_status_strings_and_unknown():
+    assert classify_log_line("No matching devices found").status == "Error: No RTL-SDR device found"
+    assert classify_log_line("Sample rate set to 250000 S/s.") is None
+    assert classify_log_line("") is None
+
+
+def test_noise_wins_over_status_on_same_line():
+    # Contains "kernel driver" chatter and a busy hint; noise has priority (historical behavior).
+    cls = classify_log_line("Detached kernel driver; device or resource busy")
+    assert cls.category == "noise"
+
+
+def test_health_reports_frequent_degradation(monkeypatch):
+    monkeypatch.setattr(config, "SDR_HEALTH_DEGRADATION_THRESHOLD", 3, raising=False)
+    monkeypatch.setattr(config, "SDR_HEALTH_RESTART_WINDOW", 600, raising=False)
+    health = get_health_monitor()
+
+    health.record_degradation("Radio1", "sample_drop")
+    health.record_degradation("Radio1", "sample_drop")
+    assert health.check_health() == (False, "")
+
+    health.record_degradation("Radio1", "sample_drop")
+    is_problem, reason = health.check_health()
+    assert is_problem is True
+    assert "Radio1: sample drops (3x" in reason
+    assert health.degradation_totals["Radio1"]["sample_drop"] == 3
+
+
+def test_health_degradation_threshold_zero_disables(monkeypatch):
+    monkeypatch.setattr(config, "SDR_HEALTH_DEGRADATION_THRESHOLD", 0, raising=False)
+    health = get_health_monitor()
+    for _ in range(50):
+        health.record_degradation("Radio1", "pll_unlock")
+    assert health.check_health() == (False, "")
+
+
+def test_rtl_loop_publishes_degradation_counters(monkeypatch):
+    published = []
+
+    class DummyMQTT:
+        def send_sensor(self, sensor_id, field, value, device_name, device_model, is_rtl=True, friendly_name=None):
+            published.append((field, value, friendly_name))
+
+    class DummyProcessor:
+        def dispatch_reading(self, *a, **k):
+            return None
+
+    lines = [
+        "Lost 16384 samples\n",
+        "Lost 16384 samples\n",
+        "[R82XX] PLL not locked!\n",
+    ]
+
+    class DummyStdout:
+        def readline(self):
+            return lines.pop(0) if lines else ""
+
+    class DummyProc:
+        stdout = DummyStdout()
+
+        def poll(self):
+            return None if lines else 1
+
+        def terminate(self):
+            return None
+
+        def wait(self, timeout=None):
+            return None
+
+    monkeypatch.setattr(rm.subprocess, "Popen", lambda *a, **k: DummyProc())
+
+    def stop_sleep(_secs):
+        raise StopIteration()
+
+    monkeypatch.setattr(rm.time, "sleep", stop_sleep)
+
+    with pytest.raises(StopIteration):
+        rm.rtl_loop({"name": "RTL_101", "id": "101", "freq": "433.92M"}, DummyMQTT(), DummyProcessor(), "sys", "Bridge")
+
+    final = {}
+    for field, value, friendly in published:
+        final[field] = (value, friendly)
+
+    assert final["radio_sample_drops_101"] == (2, "RTL_101 Sample Drops")
+    assert final["radio_pll_unlocks_101"][0] == 1
+    assert get_health_monitor().degradation_totals["RTL_101"] == {"sample_drop": 2, "pll_unlock": 1}
+
+
+def test_degradation_field_discovery_uses_radio_base_meta(mocker):
+    import json
+    from mqtt_handler import HomeNodeMQTT
+
+    mocker.patch("mqtt_handler.mqtt.Client")
+    h = HomeNodeMQTT()
+    h.send_sensor("sys", "radio_sample_drops_101", 4, "Bridge (sys)", "Bridge", is_rtl=False)
+
+    cfg = None
+    for call in h.client.publish.call_args_list:
+        if call.args[0].endswith("sys_radio_sample_drops_101/config"):
+            cfg = json.loads(call.args[1])
+    assert cfg is not None
+    assert cfg["name"] == "Sample Drops 101"
+    assert cfg["icon"] == "mdi:chart-line-variant"
+    assert cfg["entity_category"] == "diagnostic"
+    assert "expire_after" not in cfg
@@ -0,0 +1,107 @@
+"""Tests for sysfs-based RTL-SDR enumeration and the rtl_eeprom fallback."""
+import config
+import rtl_manager as rm
+import sdr_enum
+
+
+def _add_usb_device(root, name, vid, pid, serial=None, busnum=1, devnum=2):
+    d = root / name
+    d.mkdir(parents=True)
+    (d / "idVendor").write_text(vid + "\n")
+    (d / "idProduct").write_text(pid + "\n")
+    (d / "busnum").write_text(f"{busnum}\n")
+    (d / "devnum").write_text(f"{devnum}\n")
+    if serial is not None:
+        (d / "serial").write_text(serial + "\n")
+    # Interface directory (must be ignored)
+    (root / f"{name}:1.0").mkdir()
+
+
+def _eeprom_stub(serials_by_index, calls):
+    class _Proc:
+        def __init__(self, stdout, rc):
+            self.stdout = stdout
+            self.stderr = ""
+            self.returncode = rc
+
+    def fake_run(cmd, **kwargs):
+        idx = int(cmd[2])
+        calls.append(idx)
+        if idx in serials_by_index:
+            return _Proc(f"Serial number:  {serials_by_index[idx]}\n", 0)
+        return _Proc("No supported devices found.", 1)
+
+    return fake_run
+
+
+def test_scan_sysfs_filters_known_ids_and_sorts(tmp_path, monkeypatch):
+    _add_usb_device(tmp_path, "2-1", "0bda", "2838", "00000102", busnum=2, devnum=5)
+    _add_usb_device(tmp_path, "1-1.3", "0BDA", "2832", "00000101", busnum=1, devnum=7)
+    _add_usb_device(tmp_path, "1-1.4", "046d", "c52b", "keyboard", busnum=1, devnum=3)
+    (tmp_path / "usb1").mkdir()
+
+    devs = sdr_enum.scan_sysfs(str(tmp_path))
+    assert [d["serial"] for d in devs] == ["00000101", "00000102"]
+    assert sdr_enum.scan_sysfs(str(tmp_path / "missing")) is None
+
+
+def test_single_dongle_needs_no_probe(tmp_path, monkeypatch):
+    _add_usb_device(tmp_path, "1-1", "0bda", "2838", "00000101")
+    monkeypatch.setattr(sdr_enum, "SYSFS_USB_ROOT", str(tmp_path))
+    calls = []
+    monkeypatch.setattr(rm.subprocess, "run", _eeprom_stub({}, calls))
+
+    assert rm.discover_rtl_devices() == [{"name": "RTL_00000101", "id": "00000101", "index": 0}]
+    assert calls == []
+
+
+def test_empty_sysfs_returns_no_devices(tmp_path, monkeypatch):
+    monkeypatch.setattr(sdr_enum, "SYSFS_USB_ROOT", str(tmp_path))
+    calls = []
+    monkeypatch.setattr(rm.subprocess, "run", _eeprom_stub({0: "x"}, calls))
+    assert rm.discover_rtl_devices() == []
+    assert calls == []
+
+
+def test_multiple_dongles_probe_only_present_indices_and_cache(tmp_path, monkeypatch):
+    sysfs = tmp_path / "sys"
+    _add_usb_device(sysfs, "1-1", "0bda", "2838", "00000101", devnum=2)
+    _add_usb_device(sysfs, "1-2", "0bda", "2838", "00000102", devnum=3)
+    monkeypatch.setattr(sdr_enum, "SYSFS_USB_ROOT", str(sysfs))
+    monkeypatch.setattr(config, "RTL_SDR_CACHE_PATH", str(tmp_path / "cache.json"), raising=False)
+
+    calls = []
+    # librtlsdr order differs from sysfs order: the probe result wins.
+    monkeypatch.setattr(rm.subprocess, "run", _eeprom_stub({0: "00000102", 1: "00000101"}, calls))
+
+    devices = rm.discover_rtl_devices()
+    assert [(d["id"], d["index"]) for d in devices] == [("00000102", 0), ("00000101", 1)]
+    assert sorted(calls) == [0, 1]
+
+    # Unchanged dongle set -> cached mapping, no probes.
+    calls.clear()
+    assert rm.discover_rtl_devices() == devices
+    assert calls == []
+
+    # Replug (new devnum) -> probe again.
+    (sysfs / "1-2" / "devnum").write_text("9\n")
+    rm.discover_rtl_devices()
+    assert sorted(calls) == [0, 1]
+
+
+def test_without_sysfs_probes_in_parallel_until_no_device(monkeypatch):
+    calls = []
+    monkeypatch.setattr(rm.subprocess, "run", _eeprom_stub({0: "00000101", 1: "00000102"}, calls))
+    devices = rm.discover_rtl_devices()
+    assert [d["index"] for d in devices] == [0, 1]
+    assert len(calls) == 8
+
+
+def test_probe_timeout_is_not_fatal(monkeypatch):
+    def fake_run(cmd, **kwargs):
+        if cmd[2] == "0":
+            raise rm.subprocess.TimeoutExpired(cmd, 5)
+        return type("P", (), {"stdout": "No supported devices found.", "stderr": "", "returncode": 1})()
+
+    monkeypatch.setattr(rm.subprocess, "run", fake_run)
+    assert rm.discover_rtl_devices() == []
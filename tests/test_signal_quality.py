@@ -0,0 +1,58 @@
+"""Tests for the snr/rssi gate and per-radio signal histograms."""
+import config
+import mqtt_handler
+import rtl_manager as rm
+from signal_quality import PUBLISH_INTERVAL, SignalGate
+
+
+def test_thresholds_model_over_radio_over_global(monkeypatch):
+    monkeypatch.setattr(config, "RTL_MIN_SNR", 5.0, raising=False)
+    monkeypatch.setattr(config, "RTL_MIN_RSSI", 0.0, raising=False)
+    monkeypatch.setattr(config, "RTL_SIGNAL_THRESHOLDS", ["acurite*: snr=2, rssi=-20", "broken"], raising=False)
+
+    assert SignalGate().thresholds_for("LaCrosse") == (5.0, 0.0)
+    gate = SignalGate({"name": "RTL_0", "min_snr": 8})
+    assert gate.thresholds_for("LaCrosse") == (8.0, 0.0)
+    assert gate.thresholds_for("Acurite-Tower") == (2.0, -20.0)
+
+    assert gate.check("LaCrosse", {"snr": 9.5, "rssi": -25.0})
+    assert not gate.check("LaCrosse", {"snr": 4.0})
+    assert not gate.check("Acurite-Tower", {"snr": 3.0, "rssi": -21.0})
+    assert gate.check("LaCrosse", {"temperature_C": 20.0})  # no level metadata
+    assert gate.dropped == 2
+
+
+def test_radio_zero_disables_global_threshold(monkeypatch):
+    monkeypatch.setattr(config, "RTL_MIN_SNR", 5.0, raising=False)
+    monkeypatch.setattr(config, "RTL_MIN_RSSI", -20.0, raising=False)
+    monkeypatch.setattr(config, "RTL_SIGNAL_THRESHOLDS", [], raising=False)
+
+    assert SignalGate({"min_snr": 0, "min_rssi": 0}).thresholds_for("LaCrosse") == (0.0, 0.0)
+    assert SignalGate({"min_snr": "7", "min_rssi": None}).thresholds_for("LaCrosse") == (7.0, -20.0)
+
+
+def test_histograms_are_published_per_interval():
+    gate = SignalGate()
+    for snr in (1.0, 4.5, 4.9, 31.0):
+        gate.check("M", {"snr": snr, "rssi": -12.0})
+    assert gate.snr.total == 4 and list(gate.snr.counts)[:2] == [1, 2]
+
+    assert not gate.due(0.0)
+    assert not gate.due(PUBLISH_INTERVAL - 1)
+    assert gate.due(PUBLISH_INTERVAL)
+    stats = gate.take()
+    assert stats["radio_snr_avg"] == 10.3
+    assert stats["radio_snr_histogram"].startswith("<3:1 3..6:2 6..9:0")
+    assert stats["radio_snr_histogram"].endswith(">=30:1")
+    assert stats["radio_rssi_avg"] == -12.0
+    assert stats["radio_weak_drops"] == 0
+    assert gate.take() == {"radio_weak_drops": 0}
+
+
+def test_signal_fields_use_radio_meta(mocker):
+    assert mqtt_handler._radio_field_base("radio_snr_histogram_101") == "radio_snr_histogram"
+    handler = mocker.Mock()
+    rm._publish_signal_stats(handler, "sys", "Bridge", "radio_status_101", "Attic", {"radio_snr_avg": 12.5})
+    args, kwargs = handler.send_sensor.call_args
+    assert args[1:3] == ("radio_snr_avg_101", 12.5)
+    assert kwargs["friendly_name"] == "Attic Average SNR"
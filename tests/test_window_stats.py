@@ -0,0 +1,115 @@
+"""Tests for per-entity rolling statistics (rtl_stats_windows)."""
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import config
+import data_processor
+import mqtt_handler
+import window_stats
+from mqtt_handler import HomeNodeMQTT
+from window_stats import MAX_SAMPLES, MIN_INTERVAL, PUBLISH_INTERVAL, RingBuffer, WindowStats, parse_windows
+
+
+def test_parse_windows():
+    assert parse_windows(["1h", "24H", "90m", "3600", "2d"]) == [
+        ("1h", 3600.0), ("24h", 86400.0), ("90m", 5400.0), ("3600", 3600.0), ("2d", 172800.0),
+    ]
+    assert parse_windows(["weekly", "0h"]) == []
+
+
+def test_ring_buffer_overwrites_oldest():
+    buf = RingBuffer(3)
+    for t, v in enumerate([100.0, 1.0, 2.0, 3.0]):
+        buf.append(float(t), v)
+    assert buf.count == 3
+    lo, hi, mean, std = buf.window(0.0)
+    assert (lo, hi, mean) == (1.0, 3.0, 2.0)
+    assert std == pytest.approx(0.8165, abs=1e-4)
+    assert buf.window(2.5) == (3.0, 3.0, 3.0, 0.0)
+    assert buf.window(10.0) is None
+
+
+def test_ring_buffer_keeps_one_sample_per_slot():
+    buf = RingBuffer(3, interval=30.0)
+    for t, v in [(0.0, 1.0), (10.0, 5.0), (30.0, 2.0), (59.0, 4.0), (60.0, 3.0)]:
+        buf.append(t, v)
+    assert buf.count == 3
+    assert buf.window(0.0)[:3] == (3.0, 5.0, 4.0)
+
+
+def test_buffer_is_sized_for_the_longest_window():
+    stats = WindowStats(["1h", "24h"], fields=["temperature"], interval=30)
+    assert stats.interval == 30 and stats.capacity == 2881
+    assert WindowStats(["1h"], fields=["t"], interval=5).interval == MIN_INTERVAL
+    week = WindowStats(["7d"], fields=["t"], interval=30)
+    assert week.capacity <= MAX_SAMPLES + 1
+    assert week.capacity * week.interval >= 7 * 86400
+
+    # A full day of throttled samples: the first one is still inside the 24h window.
+    for i in range(2881):
+        stats.add("ws", "temperature", 100.0 if i == 0 else 20.0, i * 30.0)
+    assert stats._buffers[("ws", "temperature")].window(0.0)[1] == 100.0
+
+
+def test_attributes_per_window_and_publish_interval():
+    stats = WindowStats(["1h", "24h"], fields=["temperature"])
+    assert stats.add("ws", "temperature", 10.0, 0.0) == {
+        "min_1h": 10.0, "max_1h": 10.0, "mean_1h": 10.0, "stddev_1h": 0.0,
+        "min_24h": 10.0, "max_24h": 10.0, "mean_24h": 10.0, "stddev_24h": 0.0,
+    }
+    assert stats.add("ws", "temperature", 12.0, PUBLISH_INTERVAL / 2) is None  # not due yet
+    attrs = stats.add("ws", "temperature", 20.0, 3600.0 + PUBLISH_INTERVAL / 2)
+    assert attrs["min_1h"] == 12.0 and attrs["mean_1h"] == 16.0
+    assert attrs["min_24h"] == 10.0 and attrs["mean_24h"] == 14.0
+    assert stats.tracks("ws", "temperature")
+
+    stats.forget("ws")
+    assert not stats.tracks("ws", "temperature")
+
+
+def test_only_numeric_selected_fields_are_tracked():
+    assert not WindowStats(["1h"]).enabled  # opt-in per field
+    stats = WindowStats(["1h"], fields=["temp*"])
+    assert stats.add("x", "humidity", 50, 0.0) is None
+    assert stats.add("x", "temperature", "n/a", 0.0) is None
+    assert stats.add("x", "temperature", True, 0.0) is None
+    assert stats.add("x", "temperature", 21, 0.0)["max_1h"] == 21.0
+    assert not WindowStats().enabled and WindowStats().add("x", "temperature", 1, 0.0) is None
+
+
+@pytest.fixture
+def stats_config(monkeypatch):
+    monkeypatch.setattr(config, "RTL_STATS_WINDOWS", ["1h"], raising=False)
+    monkeypatch.setattr(config, "RTL_STATS_FIELDS", ["temperature", "battery_ok"], raising=False)
+    monkeypatch.setattr(config, "RTL_THROTTLE_INTERVAL", 0, raising=False)
+    monkeypatch.setattr(window_stats, "_stats", None)
+    yield
+    window_stats._stats = None
+
+
+def test_handler_publishes_attributes_topic(stats_config, mocker, monkeypatch):
+    client_cls = mocker.patch("mqtt_handler.mqtt.Client")
+    client_cls.return_value.publish.return_value = SimpleNamespace(rc=mqtt_handler.mqtt.MQTT_ERR_SUCCESS)
+    h = HomeNodeMQTT()
+    now = [0.0]
+    monkeypatch.setattr(data_processor.time, "monotonic", lambda: now[0])
+    dp = data_processor.DataProcessor(h)
+
+    dp.dispatch_reading("ws1", "temperature", 20.0, "WS", "Acurite")
+    dp.dispatch_reading("ws1", "battery_ok", 1, "WS", "Acurite")
+    now[0] = PUBLISH_INTERVAL
+    dp.dispatch_reading("ws1", "temperature", 22.0, "WS", "Acurite")
+
+    published = {}
+    for c in h.client.publish.call_args_list:
+        published.setdefault(c.args[0], []).append(c.args[1])
+    config_topic = f"homeassistant/sensor/ws1_temperature{config.ID_SUFFIX}/config"
+    discovery = json.loads(published[config_topic][-1])
+    attr_topic = "home/rtl_devices/ws1/temperature/attributes"
+    assert attr_topic in discovery.values()
+    assert json.loads(published[attr_topic][-1]) == {
+        "max_1h": 22.0, "mean_1h": 21.0, "min_1h": 20.0, "stddev_1h": 1.0,
+    }
+    assert [t for t in published if t.startswith("home/rtl_devices/ws1/battery_ok/")] == []
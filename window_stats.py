@@ -0,0 +1,174 @@
+# window_stats.py
+"""
+FILE: window_stats.py
+DESCRIPTION:
+  Rolling min / max / mean / stddev per entity (rtl_stats_windows).
+  - Opt-in per field (rtl_stats_fields): each published numeric value of a
+    selected field is appended to a fixed-size ring buffer per (device, field).
+  - The buffer keeps one sample per slot of `interval` seconds (the throttle
+    interval, at least MIN_INTERVAL, coarser for very long windows so a buffer
+    never exceeds MAX_SAMPLES) and has enough slots for the longest window, so
+    e.g. `mean_24h` really covers 24 hours. A newer value in the same slot
+    replaces the older one.
+  - Statistics over each window (e.g. 1h, 24h) are computed with a plain loop
+    over array('d') storage.
+  - The statistics are published as JSON attributes of the entity, at most
+    once per PUBLISH_INTERVAL seconds per entity.
+"""
+from __future__ import annotations
+
+import fnmatch
+import math
+import re
+import threading
+from array import array
+from typing import Iterable, Optional
+
+import config
+
+PUBLISH_INTERVAL = 60.0
+
+# Sample slot bounds (seconds / samples per buffer, 16 bytes each).
+MIN_INTERVAL = 30.0
+MAX_SAMPLES = 4096
+
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+_WINDOW = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([smhd]?)\s*$", re.IGNORECASE)
+
+
+def parse_windows(entries: Iterable[object]) -> list[tuple[str, float]]:
+    """rtl_stats_windows entries ('1h', '24h', '90m', '3600') -> [(label, seconds)]."""
+    windows = []
+    for entry in entries or ():
+        m = _WINDOW.match(str(entry))
+        seconds = float(m.group(1)) * _UNITS[(m.group(2) or "s").lower()] if m else 0.0
+        if seconds <= 0:
+            print(f"[CONFIG] Ignoring rtl_stats_windows entry {entry!r} (expected e.g. '1h', '24h', '30m').")
+            continue
+        windows.append((str(entry).strip().lower(), seconds))
+    return windows
+
+
+def _num(value) -> Optional[float]:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    value = float(value)
+    return value if math.isfinite(value) else None
+
+
+class RingBuffer:
+    """Fixed-capacity (time, value) samples, at most one per `interval` slot.
+
+    The oldest sample is overwritten when full.
+    """
+
+    __slots__ = ("capacity", "interval", "times", "values", "head", "count")
+
+    def __init__(self, capacity: int, interval: float = 0.0) -> None:
+        self.capacity = capacity
+        self.interval = interval
+        self.times = array("d", bytes(8 * capacity))
+        self.values = array("d", bytes(8 * capacity))
+        self.head = 0
+        self.count = 0
+
+    def append(self, t: float, value: float) -> None:
+        last = (self.head - 1) % self.capacity
+        if self.count and self.interval and t // self.interval == self.times[last] // self.interval:
+            # Same slot as the previous sample: keep the newest value.
+            self.times[last] = t
+            self.values[last] = value
+            return
+        self.times[self.head] = t
+        self.values[self.head] = value
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def window(self, since: float) -> Optional[tuple[float, float, float, float]]:
+        """(min, max, mean, population stddev) of the samples at or after `since`."""
+        n = self.count
+        sel = [v for t, v in zip(self.times[:n], self.values[:n]) if t >= since]
+        if not sel:
+            return None
+        mean = sum(sel) / len(sel)
+        var = sum((v - mean) ** 2 for v in sel) / len(sel)
+        return min(sel), max(sel), mean, math.sqrt(var)
+
+
+class WindowStats:
+    """Ring buffers for all tracked entities (thread-safe)."""
+
+    def __init__(self, windows: Iterable[object] = (), fields: Iterable[object] = (), interval: float = 0.0) -> None:
+        self.windows = parse_windows(windows)
+        patterns = [fnmatch.translate(str(f)) for f in fields or () if str(f)]
+        self._fields = re.compile("|".join(patterns)).match if patterns else None
+        longest = max((seconds for _label, seconds in self.windows), default=0.0)
+        self.interval = max(float(interval or 0), MIN_INTERVAL, longest / MAX_SAMPLES)
+        # Slots spanned by the longest window, including both ends.
+        self.capacity = int(math.ceil(longest / self.interval)) + 1
+        self._lock = threading.Lock()
+        self._buffers: dict[tuple[str, str], RingBuffer] = {}
+        self._next_publish: dict[tuple[str, str], float] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.windows) and self._fields is not None
+
+    def tracks(self, clean_id: str, field: str) -> bool:
+        """True once the entity has a ring buffer (its discovery gets an attributes topic)."""
+        return (clean_id, field) in self._buffers
+
+    def add(self, clean_id: str, field: str, value, now: float) -> Optional[dict[str, float]]:
+        """Record a published value; returns the attributes when they are due, else None."""
+        if not self.enabled:
+            return None
+        v = _num(value)
+        if v is None or not self._fields(field):
+            return None
+        key = (clean_id, field)
+        with self._lock:
+            buf = self._buffers.get(key)
+            if buf is None:
+                buf = self._buffers[key] = RingBuffer(self.capacity, self.interval)
+            buf.append(now, v)
+            if now < self._next_publish.get(key, now):
+                return None
+            self._next_publish[key] = now + PUBLISH_INTERVAL
+            return self._attributes(buf, now)
+
+    def _attributes(self, buf: RingBuffer, now: float) -> dict[str, float]:
+        out: dict[str, float] = {}
+        for label, seconds in self.windows:
+            stats = buf.window(now - seconds)
+            if stats is None:
+                continue
+            for name, x in zip(("min", "max", "mean", "stddev"), stats):
+                out[f"{name}_{label}"] = round(x, 2)
+        return out
+
+    def forget(self, clean_id: str, device_name: Optional[str] = None) -> None:
+        with self._lock:
+            for key in [k for k in self._buffers if k[0] == clean_id]:
+                del self._buffers[key]
+                self._next_publish.pop(key, None)
+
+
+# Module-level singleton instance (rebuilt when the stats settings change)
+_stats: Optional[WindowStats] = None
+_stats_key: Optional[tuple] = None
+
+
+def get_window_stats() -> WindowStats:
+    """Get the shared statistics for the current RTL_STATS_* / throttle settings."""
+    global _stats, _stats_key
+    key = (
+        tuple(str(w) for w in getattr(config, "RTL_STATS_WINDOWS", None) or ()),
+        tuple(str(f) for f in getattr(config, "RTL_STATS_FIELDS", None) or ()),
+        float(getattr(config, "RTL_THROTTLE_INTERVAL", 0) or 0),
+    )
+    if _stats is None or key != _stats_key:
+        _stats = WindowStats(*key)
+        _stats_key = key
+        if _stats.windows and not key[1]:
+            print("[CONFIG] rtl_stats_windows is set but rtl_stats_fields is empty; no entity gets statistics.")
+    return _stats